@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+
+from libs.progressTable import TABLE_NAME, ProgressTable, loadTable
+
+dataset = 'jester'
+results_path = '../vanno_results/' + dataset
+env_path = '../vanno_results/' + dataset + '_env'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Collect the progress of every annotator (finished, verified, '
+                                                 'start/end frames, boxes) into one table.')
+    parser.add_argument('--results', default=results_path, help='annotation results (default: %(default)s)')
+    parser.add_argument('--env', default=env_path, help='job assignment, check files and LMDB environments '
+                                                        '(default: %(default)s)')
+    parser.add_argument('--table', help='table file (default: <env>/%s)' % TABLE_NAME)
+    parser.add_argument('--refresh', action='store_true', help='only rescan results folders that changed')
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--csv', help='also write the table as CSV')
+    args = parser.parse_args(argv)
+
+    tablePath = args.table or os.path.join(args.env, TABLE_NAME)
+    if args.refresh:
+        table = loadTable(args.results, args.env, tablePath, refresh=True, processes=args.processes)
+    else:
+        table = ProgressTable.build(args.results, args.env, args.processes)
+        table.save(tablePath)
+    if args.csv:
+        table.writeCsv(args.csv)
+
+    print('%-12s %8s %8s %8s %10s' % ('annotator', 'folders', 'done', 'verified', 'boxes'))
+    for annotator, total in sorted(table.summary().items()):
+        print('%-12s %8d %8d %8d %10d' % (annotator or '-', total['folders'], total['done'],
+                                          total['verified'], total['boxes']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
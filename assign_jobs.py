@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+
+from libs.datasetIndex import INDEX_NAME, DatasetIndex, loadIndex
+from libs.jobAssign import (DIRS_PER_SESSION, assignJobs, loadAssignment, readFinished, readIds,
+                            reassignJobs, saveAssignment, sessionFrames)
+from libs.job_io import JOB_FOLDERS, JOB_JSON, JobAssignment, convertJson
+
+dataset = 'jester'
+data_path = '../vanno_data/' + dataset
+env_path = '../vanno_results/' + dataset + '_env'
+
+
+def parseWeights(pairs):
+    weights = {}
+    for pair in pairs:
+        annotator, _, weight = pair.rpartition('=')
+        if not annotator:
+            raise SystemExit('--weight expects id=weight, got %r' % pair)
+        weights[annotator] = float(weight)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Assign dataset folders to annotators, balanced by frame count.')
+    parser.add_argument('mode', choices=['assign', 'reassign', 'convert'],
+                        help='assign: split all folders from scratch; '
+                             'reassign: hand out the unfinished folders of an existing assignment again; '
+                             'convert: write the binary job file for an existing JSON assignment')
+    parser.add_argument('--data', default=data_path, help='dataset root (default: %(default)s)')
+    parser.add_argument('--env', default=env_path, help='results env directory (default: %(default)s)')
+    parser.add_argument('--ids', default='./env/ids.txt', help='annotator ids, one per line (default: %(default)s)')
+    parser.add_argument('--folders', help='only assign the folder names listed in this file, one per line')
+    parser.add_argument('--weight', action='append', default=[], metavar='ID=W',
+                        help='relative share of an annotator (default 1), may be repeated')
+    parser.add_argument('--dirs-per-session', type=int, default=DIRS_PER_SESSION)
+    parser.add_argument('--by-folders', action='store_true', help='balance by folder count instead of frame count')
+    parser.add_argument('--from-session', type=int, default=1, help='reassign: first session to change')
+    parser.add_argument('--out', default='job_assign.json', help='file name inside --env (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'convert':
+        jobs = convertJson(args.env, args.out)
+        print('%d ids, %d sessions, %d folders written to %s' % (len(jobs.ids), jobs.sessions, jobs.total(),
+                                                                 os.path.join(args.env, JOB_FOLDERS)))
+        return
+
+    ids = readIds(args.ids)
+    weights = parseWeights(args.weight)
+    outPath = os.path.join(args.env, args.out)
+
+    if args.by_folders and args.folders:
+        index = None
+    elif args.folders:
+        # A folder list does not need a full scan, use the index only if it is there.
+        index = DatasetIndex.load(os.path.join(args.env, INDEX_NAME))
+    else:
+        index = loadIndex(args.data, os.path.join(args.env, INDEX_NAME))
+    frames = {} if index is None or args.by_folders else dict(zip(index.names, index.frames))
+
+    if args.mode == 'assign':
+        if args.folders:
+            with open(args.folders, 'r') as f:
+                names = [line.strip() for line in f if line.strip()]
+            counts = [frames.get(name, 1) for name in names] if frames else None
+        else:
+            names = index.names
+            counts = index.frames if frames else None
+        assignment = assignJobs(names, ids, counts, weights, args.dirs_per_session)
+    else:
+        current = loadAssignment(outPath)
+        finished = readFinished(args.env, current)
+        assignment = reassignJobs(current, finished, ids, frames, weights, args.from_session)
+
+    saveAssignment(assignment, outPath)
+    if args.out == JOB_JSON:
+        # Keep the binary job file the annotation tool reads in step with the JSON.
+        try:
+            JobAssignment.fromDict(assignment).save(args.env)
+        except ValueError as e:
+            print('Binary job file not written: %s' % e)
+    for annotator, counts in sorted(sessionFrames(assignment, frames).items()):
+        print('%s: %d sessions, %d %s' % (annotator, len(counts), sum(counts), 'frames' if frames else 'folders'))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
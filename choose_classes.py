@@ -1,99 +1,58 @@
-import os, json
+import argparse
+import os
+import sys
+
+from libs.classSelect import readLabels, resolveClasses, selectFoldersFromFiles
+from libs.datasetIndex import INDEX_NAME, DatasetIndex
+from libs.jobAssign import DIRS_PER_SESSION, assignJobs, readIds, saveAssignment
+from libs.job_io import JOB_JSON, JobAssignment
 
 dataset = 'jester'
 label_path = '../vanno_data/' + dataset + '_label/'
-
-labels = []
-labels_selected = []
-label_no = 0
-with open(label_path + 'jester-v1-labels.csv', 'r') as f:
-    lines = f.readlines()
-    for line in lines:
-        line = line.replace('\n', '')
-        labels.append(line)
-        label_no += 1
-# print(labels)
-
-for i in range(label_no):
-    if i in [0, 1, 2, 3, 20, 21, 22, 24]:
-        labels_selected.append(labels[i])
-# print(labels_selected)
-
-dirs_train_selected = []
-with open(label_path + 'jester-v1-train.csv', 'r') as f:
-    lines = f.readlines()
-    for line in lines:
-        line = line.replace('\n', '')
-        if line.split(';')[1] in labels_selected:
-            dirs_train_selected.append(int(line.split(';')[0]))
-# dirs_train_selected.sort()
-# print(dirs_train_selected)
-
-dirs_val_selected = []
-with open(label_path + 'jester-v1-validation.csv', 'r') as f:
-    lines = f.readlines()
-    for line in lines:
-        line = line.replace('\n', '')
-        if line.split(';')[1] in labels_selected:
-            dirs_val_selected.append(int(line.split(';')[0]))
-# dirs_val_selected.sort()
-# print(dirs_val_selected)
-
-dirs_selected = dirs_train_selected + dirs_val_selected
-dirs_selected.sort()
-
-dirs_selected_str = []
-for i in dirs_selected:
-    dirs_selected_str.append(str(i))
-# print(dirs_selected_str)
-
-
-
-###
-ids = []
 env_path = '../vanno_results/' + dataset + '_env'
 
-with open('./env/ids.txt', 'r') as f:
-    lines = f.readlines()
-    for line in lines:
-        ids.append(line.replace('\n', ''))
-
-dirs = dirs_selected_str
-
-n_dir_per_sess = 5000
-n_dir = len(dirs)                                                   #148092
-n_id = len(ids)                                                     #3
-n_sess_roundown = int(n_dir / n_dir_per_sess)                       #->29
-if n_dir % n_dir_per_sess == 0:
-    n_sess = n_sess_roundown
-else:
-    n_sess = n_sess_roundown + 1                                    #->30
-
-dir_dict_all = {id: [] for id in ids}
-cnt = 0
-
-n_dir_per_sess_per_id = int(n_dir_per_sess / n_id)                  #->1666
-rem_per_sess = n_dir_per_sess - n_id * n_dir_per_sess_per_id        #->2
-
-for sess in range(n_sess):
-    ### 마지막 세션
-    if sess == n_sess - 1:
-        rem_dir = n_dir - n_dir_per_sess * n_sess_roundown          # ->3092
-        n_dir_per_sess_per_id = int(rem_dir / n_id)                 # ->1030
-        rem_per_sess = rem_dir - n_id * n_dir_per_sess_per_id       # ->2
-
-    for id in ids:
-        dir_list = []
-        if int(id[-1]) <= rem_per_sess:
-            for k in range(n_dir_per_sess_per_id + 1):
-                dir_list.append(dirs[cnt])
-                cnt += 1
-        else:
-            for k in range(n_dir_per_sess_per_id):
-                dir_list.append(dirs[cnt])
-                cnt += 1
-        dir_dict_all[id].append(dir_list)
-
-if not os.path.exists(env_path):
-    os.makedirs(env_path)
-json.dump(dir_dict_all, open(os.path.join(env_path, 'job_assign.json'), 'w'), indent=2)
\ No newline at end of file
+# Classes annotated so far, by index into jester-v1-labels.csv.
+DEFAULT_CLASSES = [0, 1, 2, 3, 20, 21, 22, 24]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Select the folders of some classes and assign them to annotators.')
+    parser.add_argument('classes', nargs='*',
+                        help='class names or indices into the labels file (default: %s)' %
+                             ' '.join(str(c) for c in DEFAULT_CLASSES))
+    parser.add_argument('--labels', default=os.path.join(label_path, 'jester-v1-labels.csv'))
+    parser.add_argument('--csv', nargs='+',
+                        default=[os.path.join(label_path, 'jester-v1-%s.csv' % split)
+                                 for split in ('train', 'validation', 'test')],
+                        help='id;label files to select from (default: train, validation and test)')
+    parser.add_argument('--env', default=env_path, help='results env directory (default: %(default)s)')
+    parser.add_argument('--ids', default='./env/ids.txt', help='annotator ids, one per line (default: %(default)s)')
+    parser.add_argument('--dirs-per-session', type=int, default=DIRS_PER_SESSION)
+    parser.add_argument('--list', help='only write the selected folder ids to this file, one per line')
+    args = parser.parse_args(argv)
+
+    labels = readLabels(args.labels)
+    selectors = args.classes or [str(c) for c in DEFAULT_CLASSES]
+    names = [s for s in selectors if not s.isdigit() or s in labels]
+    indices = [int(s) for s in selectors if s.isdigit() and s not in labels]
+    classes = resolveClasses(labels, names, indices)
+
+    dirs = [str(folder) for folder in selectFoldersFromFiles(args.csv, classes).tolist()]
+    print('%d folders of %d classes selected' % (len(dirs), len(classes)))
+    if args.list:
+        with open(args.list, 'w') as f:
+            f.write(''.join(d + '\n' for d in dirs))
+        return
+
+    ids = readIds(args.ids)
+    # Balance by frame count when the dataset index exists (see index_dataset.py), else by folder count.
+    index = DatasetIndex.load(os.path.join(args.env, INDEX_NAME))
+    frames = dict(zip(index.names, index.frames)) if index is not None else {}
+    assignment = assignJobs(dirs, ids, [frames.get(d, 1) for d in dirs], dirsPerSession=args.dirs_per_session)
+    saveAssignment(assignment, os.path.join(args.env, JOB_JSON))
+    # The annotation tool reads this memory-mapped copy instead of parsing the JSON.
+    JobAssignment.fromDict(assignment, ids).save(args.env)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
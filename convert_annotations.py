@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+from libs.bundle_io import BUNDLE_NAME, bundleToVoc, vocToBundle
+from libs.lmdb_io import STORE_NAME, LmdbAnnotationStore, lmdbToVoc, vocToLmdb
+
+dataset = 'jester'
+results_path = '../vanno_results/' + dataset
+env_path = '../vanno_results/' + dataset + '_env'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Convert annotations between one Pascal VOC file per frame, one bundle per folder '
+                    'and the LMDB annotation store.')
+    parser.add_argument('direction', choices=['voc2bundle', 'bundle2voc', 'voc2lmdb', 'lmdb2voc'])
+    parser.add_argument('folders', nargs='*', help='folder names to convert (default: all)')
+    parser.add_argument('--results', default=results_path, help='annotation root (default: %(default)s)')
+    parser.add_argument('--env', default=os.path.join(env_path, STORE_NAME),
+                        help='LMDB annotation store (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.direction in ('voc2lmdb', 'lmdb2voc'):
+        store = LmdbAnnotationStore(args.env)
+        try:
+            if args.direction == 'voc2lmdb':
+                count = vocToLmdb(store, args.results, args.folders)
+            else:
+                count = lmdbToVoc(store, args.results, args.folders)
+        finally:
+            store.close()
+        print('%d frames converted' % count)
+        return
+
+    folders = args.folders or sorted(d for d in os.listdir(args.results)
+                                     if os.path.isdir(os.path.join(args.results, d)))
+    converted = 0
+    for folder in folders:
+        folderDir = os.path.join(args.results, folder)
+        if args.direction == 'voc2bundle':
+            if len(vocToBundle(folderDir)):
+                converted += 1
+        elif os.path.exists(os.path.join(folderDir, BUNDLE_NAME)):
+            bundleToVoc(os.path.join(folderDir, BUNDLE_NAME))
+            converted += 1
+    print('%d folders converted' % converted)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import argparse
+import os
+import sys
+
+from libs.datasetIndex import DEFAULT_SCAN_THREADS, INDEX_NAME, DatasetIndex, loadIndex
+
+dataset = 'jester'
+data_path = '../vanno_data/' + dataset
+env_path = '../vanno_results/' + dataset + '_env'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or refresh the dataset index read by '
+                                                 'distribute_dir.py and the annotation tool.')
+    parser.add_argument('--data', default=data_path, help='dataset root (default: %(default)s)')
+    parser.add_argument('--index', default=os.path.join(env_path, INDEX_NAME),
+                        help='index file (default: %(default)s)')
+    parser.add_argument('--refresh', action='store_true', help='only rescan folders that changed')
+    parser.add_argument('--threads', type=int, default=DEFAULT_SCAN_THREADS)
+    args = parser.parse_args(argv)
+
+    if args.refresh:
+        index = loadIndex(args.data, args.index, refresh=True, threads=args.threads)
+    else:
+        index = DatasetIndex.build(args.data, args.threads)
+        index.save(args.index)
+    print('%d folders, %d frames indexed in %s' % (len(index), sum(index.frames), args.index))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+try:
+    from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+except ImportError:
+    from PyQt4.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from collections import OrderedDict
+from libs.labelFile import LabelFile
+import os
+import threading
+
+
+class AnnotationSaveJob(object):
+    """Everything needed to write one Pascal VOC file, captured on the GUI thread."""
+
+    def __init__(self, filename, shapes, imagePath, imageShape=None, verified=False):
+        self.filename = filename
+        self.shapes = shapes
+        self.imagePath = imagePath
+        self.imageShape = imageShape
+        self.verified = verified
+
+    def run(self):
+        dirname = os.path.dirname(self.filename)
+        if dirname and not os.path.isdir(dirname):
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                if not os.path.isdir(dirname):
+                    raise
+        labelFile = LabelFile()
+        labelFile.verified = self.verified
+        labelFile.savePascalVocFormat(self.filename, self.shapes, self.imagePath, None,
+                                      imageShape=self.imageShape)
+
+    def readerShapes(self):
+        """The shapes as PascalVocReader.getShapes() will return them once written."""
+        shapes = []
+        for shape in self.shapes:
+            xmin, ymin, xmax, ymax = LabelFile.convertPoints2BndBox(shape['points'])
+            points = [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)]
+            shapes.append((shape['label'], points, None, None, bool(int(shape['difficult']))))
+        return shapes
+
+
+class BundleSaveJob(object):
+    """Rewrite a FolderBundle from its in-memory state at the time the job runs."""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+
+    def run(self):
+        self.bundle.save()
+
+
+class AnnotationSaveTask(QRunnable):
+
+    def __init__(self, saver, path):
+        super(AnnotationSaveTask, self).__init__()
+        self.saver = saver
+        self.path = path
+
+    def run(self):
+        self.saver._process(self.path)
+
+
+class AnnotationSaver(QObject):
+    """Write-behind queue for annotation files.
+
+    Saves run on a single worker thread in the order they were requested.
+    A save queued for a path that is still waiting replaces the older one,
+    so stepping through frames never writes the same file twice in a row.
+    A job that fails is kept, with its error in failures, until a newer
+    save for its path succeeds or retry() queues it again."""
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+    queueChanged = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super(AnnotationSaver, self).__init__(parent)
+        self.failures = OrderedDict()
+        self._lock = threading.Lock()
+        self._queued = OrderedDict()
+        self._running = {}
+        self._failedJobs = {}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self.saved.connect(self._onSaved)
+        self.failed.connect(self._onFailed)
+
+    def enqueue(self, path, job):
+        with self._lock:
+            coalesced = path in self._queued
+            self._queued[path] = job
+            self._failedJobs.pop(path, None)
+            self.failures.pop(path, None)
+        if not coalesced:
+            self._pool.start(AnnotationSaveTask(self, path))
+        self.queueChanged.emit(self.pendingCount(), len(self.failures))
+
+    def pending(self, path):
+        """Return the newest job not yet on disk for path, or None."""
+        with self._lock:
+            return self._queued.get(path) or self._running.get(path)
+
+    def pendingCount(self):
+        with self._lock:
+            return len(set(self._queued) | set(self._running))
+
+    def flush(self):
+        """Block until every queued save has been written or has failed."""
+        self._pool.waitForDone()
+
+    def retry(self):
+        """Queue every failed job again; returns how many were queued."""
+        with self._lock:
+            jobs = list(self._failedJobs.items())
+        for path, job in jobs:
+            self.enqueue(path, job)
+        return len(jobs)
+
+    def _process(self, path):
+        with self._lock:
+            job = self._queued.pop(path, None)
+            if job is None:
+                return
+            self._running[path] = job
+        error = None
+        try:
+            job.run()
+        except Exception as e:
+            error = '%s' % e
+        with self._lock:
+            del self._running[path]
+            # Recorded here rather than in the slots, so that flush() sees them at once.
+            if error is None:
+                self._failedJobs.pop(path, None)
+                self.failures.pop(path, None)
+            elif path not in self._queued:
+                self._failedJobs[path] = job
+                self.failures[path] = error
+        if error is None:
+            self.saved.emit(path)
+        else:
+            self.failed.emit(path, error)
+
+    # Slots below run on the thread the saver lives in (the GUI thread).
+    def _onSaved(self, path):
+        self.queueChanged.emit(self.pendingCount(), len(self.failures))
+
+    def _onFailed(self, path, error):
+        self.queueChanged.emit(self.pendingCount(), len(self.failures))
@@ -0,0 +1,24 @@
+import os
+
+
+def atomicWrite(path, data):
+    """Replace path with the bytes in data.
+
+    The data goes to a temporary file next to path, which is then renamed over
+    it, so a reader (or a crash half-way through a write) never sees a
+    truncated file. Missing parent directories are created.
+    """
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    tmpPath = path + '.tmp'
+    try:
+        with open(tmpPath, 'wb') as f:
+            f.write(data)
+        getattr(os, 'replace', os.rename)(tmpPath, path)
+    except BaseException:
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
+        raise
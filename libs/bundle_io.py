@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+import glob
+import json
+import os
+import threading
+
+from libs.atomicFile import atomicWrite
+from libs.pascal_voc_io import PascalVocReader, PascalVocWriter, XML_EXT
+from libs.shapeCore import FrameShapes, ShapeCore
+
+BUNDLE_EXT = '.jsonl'
+BUNDLE_NAME = 'annotations' + BUNDLE_EXT
+# Frames are keyed by image basename; the extension of a frame whose file names no image.
+FRAME_EXT = '.jpg'
+ENCODE_METHOD = 'utf-8'
+# What save() starts every line with; the frame value follows.
+FRAME_PREFIX = b'{"frame": '
+
+
+class FolderBundle(object):
+    """Every frame annotation of one video folder in a single JSON-lines file.
+
+    One line per frame:
+        {"frame": "00001.jpg", "path": ..., "size": [h, w, d], "verified": false,
+         "objects": [[label, xmin, ymin, xmax, ymax, difficult], ...]}
+
+    The file is read once; an offset index maps each frame to its line so that
+    only the frames actually visited get parsed. Lines written by save()
+    start with the frame, so only that value is decoded while indexing;
+    any other line is parsed whole. Changes are kept in memory and
+    save() rewrites the whole (small) file atomically."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = b''
+        self._offsets = {}
+        self._records = {}
+
+    def load(self):
+        with self._lock:
+            self._buffer = b''
+            self._offsets = {}
+            self._records = {}
+            try:
+                with open(self.path, 'rb') as f:
+                    self._buffer = f.read()
+            except (IOError, OSError):
+                return False
+            start = 0
+            while start < len(self._buffer):
+                end = self._buffer.find(b'\n', start)
+                if end < 0:
+                    end = len(self._buffer)
+                line = self._buffer[start:end]
+                if line.startswith(FRAME_PREFIX):
+                    text = line[len(FRAME_PREFIX):].decode(ENCODE_METHOD)
+                    frame = json.JSONDecoder().raw_decode(text)[0]
+                    self._offsets[frame] = (start, end)
+                elif line.strip():
+                    record = json.loads(line.decode(ENCODE_METHOD))
+                    self._records[record['frame']] = record
+                start = end + 1
+        return True
+
+    def __contains__(self, frame):
+        return frame in self._records or frame in self._offsets
+
+    def __len__(self):
+        return len(set(self._records) | set(self._offsets))
+
+    def frames(self):
+        with self._lock:
+            return sorted(set(self._records) | set(self._offsets))
+
+    def record(self, frame):
+        with self._lock:
+            record = self._records.get(frame)
+            if record is None and frame in self._offsets:
+                start, end = self._offsets[frame]
+                record = json.loads(self._buffer[start:end].decode(ENCODE_METHOD))
+                self._records[frame] = record
+            return record
+
+    def getCores(self, frame):
+        """Shapes of frame as ShapeCores, or None if it has none."""
+        record = self.record(frame)
+        if record is None:
+            return None
+        return [ShapeCore.fromObject(obj) for obj in record['objects']]
+
+    def getShapes(self, frame):
+        """Shapes of frame in PascalVocReader.getShapes() form, or None if it has none."""
+        cores = self.getCores(frame)
+        if cores is None:
+            return None
+        return [core.toReaderShape() for core in cores]
+
+    def isVerified(self, frame):
+        record = self.record(frame)
+        return bool(record and record.get('verified'))
+
+    def put(self, frame, objects, imageSize=None, imagePath=None, verified=False):
+        """Replace the annotation of frame; objects are (label, xmin, ymin, xmax, ymax, difficult)."""
+        record = {'frame': frame, 'path': imagePath, 'size': imageSize, 'verified': bool(verified),
+                  'objects': [list(o) for o in objects]}
+        with self._lock:
+            self._records[frame] = record
+
+    def serialize(self):
+        lines = []
+        for frame in self.frames():
+            # Keep "frame" first so load() can index a line without parsing it.
+            record = dict(self.record(frame))
+            line = '{"frame": %s, ' % json.dumps(frame) + json.dumps(
+                dict((k, v) for k, v in record.items() if k != 'frame'), sort_keys=True)[1:]
+            lines.append(line.encode(ENCODE_METHOD))
+        return b'\n'.join(lines) + b'\n' if lines else b''
+
+    def save(self):
+        atomicWrite(self.path, self.serialize())
+
+
+class BundleReader:
+    """PascalVocReader look-alike over one frame of a FolderBundle."""
+
+    def __init__(self, bundle, frame):
+        self.cores = bundle.getCores(frame) or []
+        self.verified = bundle.isVerified(frame)
+        self.found = frame in bundle
+
+    def getShapes(self):
+        return [core.toReaderShape() for core in self.cores]
+
+
+def vocToRecords(xmlDir):
+    """Yield (frame, objects, size, imagePath, verified) for every Pascal VOC file of one folder."""
+    for xmlPath in sorted(glob.glob(os.path.join(xmlDir, '*' + XML_EXT))):
+        reader = PascalVocReader(xmlPath)
+        # Keys are image basenames with their extension, as MainWindow looks frames up.
+        frame = reader.filename or (reader.imagePath and os.path.basename(reader.imagePath))
+        if not frame:
+            frame = os.path.splitext(os.path.basename(xmlPath))[0] + FRAME_EXT
+        objects = FrameShapes.fromReaderShapes(reader.getShapes()).toObjects()
+        yield frame, objects, reader.imgSize, reader.imagePath, reader.verified
+
+
+def vocToBundle(xmlDir, bundlePath=None):
+    """Collect every Pascal VOC file of one folder into a bundle; returns the bundle.
+
+    Nothing is written for a folder without Pascal VOC files."""
+    bundle = FolderBundle(bundlePath or os.path.join(xmlDir, BUNDLE_NAME))
+    for record in vocToRecords(xmlDir):
+        bundle.put(*record)
+    if len(bundle):
+        bundle.save()
+    return bundle
+
+
+def recordToVoc(frame, record, xmlDir):
+    """Write one bundle record as a Pascal VOC file in xmlDir."""
+    imagePath = record.get('path')
+    folderName = os.path.basename(os.path.dirname(imagePath)) if imagePath else os.path.basename(xmlDir)
+    writer = PascalVocWriter(folderName, frame, record.get('size') or [0, 0, 3], localImgPath=imagePath)
+    writer.verified = record.get('verified', False)
+    for label, xmin, ymin, xmax, ymax, difficult in record['objects']:
+        writer.addBndBox(xmin, ymin, xmax, ymax, label, difficult)
+    writer.save(os.path.join(xmlDir, os.path.splitext(frame)[0] + XML_EXT))
+
+
+def bundleToVoc(bundlePath, xmlDir=None):
+    """Write one Pascal VOC file per frame of a bundle; returns the number of files written."""
+    bundle = FolderBundle(bundlePath)
+    bundle.load()
+    xmlDir = xmlDir or os.path.dirname(bundlePath)
+    if not os.path.isdir(xmlDir):
+        os.makedirs(xmlDir)
+    for frame in bundle.frames():
+        recordToVoc(frame, bundle.record(frame), xmlDir)
+    return len(bundle)
@@ -10,6 +10,7 @@ except ImportError:
 #from PyQt4.QtOpenGL import *
 
 from libs.shape import Shape
+from libs.shapeIndex import ShapeGrid
 from libs.lib import distance
 
 CURSOR_DEFAULT = Qt.ArrowCursor
@@ -38,6 +39,8 @@ class Canvas(QWidget):
         # Initialise local state.
         self.mode = self.EDIT
         self.shapes = []
+        # Bounds of self.shapes on a grid, kept in step with every change below.
+        self.shapeIndex = ShapeGrid(self.epsilon)
         self.current = None
         self.selectedShape = None  # save the selected shape here
         self.selectedShapeCopy = None
@@ -48,6 +51,9 @@ class Canvas(QWidget):
         self.offsets = QPointF(), QPointF()
         self.scale = 1.0
         self.pixmap = QPixmap()
+        # The frame resampled for the current zoom, with the (frame, scale) it was made for.
+        self._scaledKey = None
+        self._scaledPixmap = None
         self.visible = {}
         self._hideBackround = False
         self.hideBackround = False
@@ -60,11 +66,34 @@ class Canvas(QWidget):
         # Set widget options.
         self.setMouseTracking(True)
         self.setFocusPolicy(Qt.WheelFocus)
+        self.setAutoFillBackground(True)
+        self._verified = None
         self.verified = False
+        # Widget rects of what the last paintEvent drew, so that a change can
+        # repaint the area a shape leaves as well as the one it moves to.
+        self._painted = {}
+        self._drawingRects = []
 
         self.itemsToShapes = {}
         self.shapesToItems = {}
 
+    @property
+    def verified(self):
+        return self._verified
+
+    @verified.setter
+    def verified(self, verified):
+        # The background only changes with the flag; setPalette schedules its own repaint.
+        if verified == self._verified:
+            return
+        self._verified = verified
+        pal = self.palette()
+        if verified:
+            pal.setColor(self.backgroundRole(), QColor(184, 239, 38, 128))
+        else:
+            pal.setColor(self.backgroundRole(), QColor(232, 232, 232, 255))
+        self.setPalette(pal)
+
     def setDrawingColor(self, qColor):
         self.drawingLineColor = qColor
         self.drawingRectColor = qColor
@@ -93,16 +122,23 @@ class Canvas(QWidget):
             self.unHighlight()
             self.deSelectShape()
         self.prevPoint = QPointF()
-        self.repaint()
+        self.update()
 
     def unHighlight(self):
         if self.hShape:
             self.hShape.highlightClear()
+            self.updateShapes(self.hShape)
         self.hVertex = self.hShape = None
 
     def selectedVertex(self):
         return self.hVertex is not None
 
+    def shapesAt(self, pos):
+        """Visible shapes that may have a vertex within epsilon of pos or contain it, topmost first."""
+        if len(self.shapeIndex) != len(self.shapes):
+            self.shapeIndex.rebuild(self.shapes)
+        return [shape for shape in self.shapeIndex.at(pos) if self.isVisible(shape)]
+
     def mouseMoveEvent(self, ev):
         """Update line with last point and current coordinates."""
         pos = self.transformPos(ev.pos())
@@ -135,7 +171,7 @@ class Canvas(QWidget):
                 self.current.highlightClear()
             else:
                 self.prevPoint = pos
-            self.repaint()
+            self.updateDrawing()
             return
 
         # Polygon copy moving.
@@ -143,10 +179,10 @@ class Canvas(QWidget):
             if self.selectedShapeCopy and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
                 self.boundedMoveShape(self.selectedShapeCopy, pos)
-                self.repaint()
+                self.updateShapes(self.selectedShapeCopy)
             elif self.selectedShape:
                 self.selectedShapeCopy = self.selectedShape.copy()
-                self.repaint()
+                self.updateShapes(self.selectedShapeCopy)
             return
 
         # Polygon/Vertex moving.
@@ -154,12 +190,12 @@ class Canvas(QWidget):
             if self.selectedVertex():
                 self.boundedMoveVertex(pos)
                 self.shapeMoved.emit()
-                self.repaint()
+                self.updateShapes(self.hShape)
             elif self.selectedShape and self.prevPoint:
                 self.overrideCursor(CURSOR_MOVE)
                 self.boundedMoveShape(self.selectedShape, pos)
                 self.shapeMoved.emit()
-                self.repaint()
+                self.updateShapes(self.selectedShape)
             return
 
         # Just hovering over the canvas, 2 posibilities:
@@ -167,7 +203,8 @@ class Canvas(QWidget):
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
         self.setToolTip("Image")
-        for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
+        previous = self.hShape, self.hVertex
+        for shape in self.shapesAt(pos):
             # Look for a nearby vertex to highlight. If that fails,
             # check if we happen to be inside a shape.
             index = shape.nearestVertex(pos, self.epsilon)
@@ -179,7 +216,6 @@ class Canvas(QWidget):
                 self.overrideCursor(CURSOR_POINT)
                 self.setToolTip("Click & drag to move point")
                 self.setStatusTip(self.toolTip())
-                self.update()
                 break
             elif shape.containsPoint(pos):
                 if self.selectedVertex():
@@ -189,14 +225,15 @@ class Canvas(QWidget):
                     "Click & drag to move shape '%s'" % shape.label)
                 self.setStatusTip(self.toolTip())
                 self.overrideCursor(CURSOR_GRAB)
-                self.update()
                 break
         else:  # Nothing found, clear highlights, reset state.
             if self.hShape:
                 self.hShape.highlightClear()
-                self.update()
             self.hVertex, self.hShape = None, None
             self.overrideCursor(CURSOR_DEFAULT)
+        if (self.hShape, self.hVertex) != previous:
+            # Only the shapes gaining or losing the highlight look different.
+            self.updateShapes(previous[0], self.hShape)
 
     def mousePressEvent(self, ev):
         pos = self.transformPos(ev.pos())
@@ -207,11 +244,9 @@ class Canvas(QWidget):
             else:
                 self.selectShapePoint(pos)
                 self.prevPoint = pos
-                self.repaint()
         elif ev.button() == Qt.RightButton and self.editing():
             self.selectShapePoint(pos)
             self.prevPoint = pos
-            self.repaint()
 
     def mouseReleaseEvent(self, ev):
         if ev.button() == Qt.RightButton:
@@ -220,8 +255,8 @@ class Canvas(QWidget):
             if not menu.exec_(self.mapToGlobal(ev.pos()))\
                and self.selectedShapeCopy:
                 # Cancel the move by deleting the shadow copy.
+                self.updateShapes(self.selectedShapeCopy)
                 self.selectedShapeCopy = None
-                self.repaint()
         elif ev.button() == Qt.LeftButton and self.selectedShape:
             if self.selectedVertex():
                 self.overrideCursor(CURSOR_POINT)
@@ -239,11 +274,15 @@ class Canvas(QWidget):
         #del shape.line_color
         if copy:
             self.shapes.append(shape)
+            self.shapeIndex.add(shape)
             self.selectedShape.selected = False
+            self.updateShapes(self.selectedShape)
             self.selectedShape = shape
-            self.repaint()
         else:
             self.selectedShape.points = [p for p in shape.points]
+            self.shapeIndex.refresh(self.selectedShape)
+            self.updateShapes(self.selectedShape)
+        self.updateShapes(shape)
         self.selectedShapeCopy = None
 
     def hideBackroundShapes(self, value):
@@ -252,7 +291,7 @@ class Canvas(QWidget):
             # Only hide other shapes if there is a current selection.
             # Otherwise the user will not be able to select a shape.
             self.setHiding(True)
-            self.repaint()
+            self.update()
 
     def handleDrawing(self, pos):
         if self.current and self.current.reachMaxPoints() is False:
@@ -272,10 +311,14 @@ class Canvas(QWidget):
             self.line.points = [pos, pos]
             self.setHiding()
             self.drawingPolygon.emit(True)
-            self.update()
+            self.updateDrawing()
 
     def setHiding(self, enable=True):
-        self._hideBackround = self.hideBackround if enable else False
+        hide = self.hideBackround if enable else False
+        if hide != self._hideBackround:
+            # Every other shape appears or disappears.
+            self._hideBackround = hide
+            self.update()
 
     def canCloseShape(self):
         return self.drawing() and self.current and len(self.current) > 2
@@ -293,7 +336,7 @@ class Canvas(QWidget):
         self.selectedShape = shape
         self.setHiding()
         self.selectionChanged.emit(True)
-        self.update()
+        self.updateShapes(shape)
 
     def selectShapePoint(self, point):
         """Select the first shape created which contains this point."""
@@ -303,8 +346,8 @@ class Canvas(QWidget):
             shape.highlightVertex(index, shape.MOVE_VERTEX)
             self.selectShape(shape)
             return
-        for shape in reversed(self.shapes):
-            if self.isVisible(shape) and shape.containsPoint(point):
+        for shape in self.shapesAt(point):
+            if shape.containsPoint(point):
                 self.selectShape(shape)
                 self.calculateOffsets(shape, point)
                 return
@@ -338,6 +381,7 @@ class Canvas(QWidget):
             rshift = QPointF(0, shiftPos.y())
         shape.moveVertexBy(rindex, rshift)
         shape.moveVertexBy(lindex, lshift)
+        self.shapeIndex.refresh(shape)
 
     def boundedMoveShape(self, shape, pos):
         if self.outOfPixmap(pos):
@@ -357,24 +401,27 @@ class Canvas(QWidget):
         dp = pos - self.prevPoint
         if dp:
             shape.moveBy(dp)
+            self.shapeIndex.refresh(shape)
             self.prevPoint = pos
             return True
         return False
 
     def deSelectShape(self):
         if self.selectedShape:
+            shape = self.selectedShape
             self.selectedShape.selected = False
             self.selectedShape = None
             self.setHiding(False)
             self.selectionChanged.emit(False)
-            self.update()
+            self.updateShapes(shape)
 
     def deleteSelected(self):
         if self.selectedShape:
             shape = self.selectedShape
             self.shapes.remove(self.selectedShape)
+            self.shapeIndex.discard(shape)
             self.selectedShape = None
-            self.update()
+            self.updateShapes(shape)
             return shape
 
     def copySelectedShape(self):
@@ -382,9 +429,11 @@ class Canvas(QWidget):
             shape = self.selectedShape.copy()
             self.deSelectShape()
             self.shapes.append(shape)
+            self.shapeIndex.add(shape)
             shape.selected = True
             self.selectedShape = shape
             self.boundedShiftShape(shape)
+            self.updateShapes(shape)
             return shape
 
     def boundedShiftShape(self, shape):
@@ -397,6 +446,74 @@ class Canvas(QWidget):
         if not self.boundedMoveShape(shape, point - offset):
             self.boundedMoveShape(shape, point + offset)
 
+    def widgetRect(self, rect):
+        """Widget pixels covering rect, given in image coordinates."""
+        s = self.scale
+        offset = self.offsetToCenter()
+        return QRectF((rect.x() + offset.x()) * s, (rect.y() + offset.y()) * s,
+                      rect.width() * s, rect.height() * s).toAlignedRect().adjusted(-2, -2, 2, 2)
+
+    def shapeRect(self, shape):
+        return self.widgetRect(shape.paintRect())
+
+    def drawingRects(self):
+        """Widget rects of the shape being drawn, its rubber band and the crosshair."""
+        rects = []
+        if self.current:
+            rects.append(self.shapeRect(self.current))
+            if len(self.line) == 2:
+                rects.append(self.shapeRect(self.line))
+        if self.drawing() and not self.prevPoint.isNull() and not self.outOfPixmap(self.prevPoint):
+            point = self.widgetRect(QRectF(self.prevPoint, self.prevPoint)).center()
+            # The crosshair pen is one image pixel wide.
+            w = int(self.scale) + 4
+            rects.append(QRect(point.x() - w, 0, 2 * w, self.height()))
+            rects.append(QRect(0, point.y() - w, self.width(), 2 * w))
+        return rects
+
+    def updateShapes(self, *shapes):
+        """Schedule a repaint of where shapes were last painted and of where they are now."""
+        if not self.pixmap:
+            return
+        Shape.scale = self.scale
+        for shape in shapes:
+            if shape is None:
+                continue
+            if shape in self._painted:
+                self.update(self._painted[shape])
+            if len(shape):
+                self.update(self.shapeRect(shape))
+
+    def updateDrawing(self):
+        """Schedule a repaint of the drawing rubber band and crosshair, as painted and as they are now."""
+        if not self.pixmap:
+            return
+        Shape.scale = self.scale
+        for rect in self._drawingRects + self.drawingRects():
+            self.update(rect)
+
+    def scaledPixmap(self):
+        """The frame resampled to the current scale, or None to draw it through the painter.
+
+        Only zoomed-out views are cached: they resample the whole frame on
+        every full repaint, and their copy is smaller than the frame itself.
+        The copy is rebuilt once per frame and zoom level."""
+        if not self.pixmap or self.scale >= 1:
+            return None
+        key = (self.pixmap.cacheKey(), self.scale)
+        if key != self._scaledKey:
+            size = QSize(max(1, int(round(self.pixmap.width() * self.scale))),
+                         max(1, int(round(self.pixmap.height() * self.scale))))
+            self._scaledPixmap = self.pixmap.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            self._scaledKey = key
+        return self._scaledPixmap
+
+    def drawFrame(self, p, origin, frame):
+        if isinstance(frame, QImage):
+            p.drawImage(origin, frame)
+        else:
+            p.drawPixmap(origin, frame)
+
     def paintEvent(self, event):
         if not self.pixmap:
             return super(Canvas, self).paintEvent(event)
@@ -407,20 +524,36 @@ class Canvas(QWidget):
         p.setRenderHint(QPainter.HighQualityAntialiasing)
         p.setRenderHint(QPainter.SmoothPixmapTransform)
 
+        # The painter is clipped to the damaged region, so only the frame
+        # pixels under it are copied or resampled, and shapes outside it are skipped.
+        exposed = event.rect()
+        scaled = self.scaledPixmap()
+        if scaled is not None:
+            # Already at screen resolution: a plain blit at the widget offset.
+            self.drawFrame(p, (self.offsetToCenter() * self.scale).toPoint(), scaled)
+
         p.scale(self.scale, self.scale)
         p.translate(self.offsetToCenter())
 
-        p.drawPixmap(0, 0, self.pixmap)
+        if scaled is None:
+            self.drawFrame(p, QPoint(0, 0), self.pixmap)
         Shape.scale = self.scale
+        painted = {}
         for shape in self.shapes:
             if (shape.selected or not self._hideBackround) and self.isVisible(shape):
-                shape.fill = shape.selected or shape == self.hShape
-                shape.paint(p)
+                rect = self.shapeRect(shape)
+                painted[shape] = rect
+                if rect.intersects(exposed):
+                    shape.fill = shape.selected or shape == self.hShape
+                    shape.paint(p)
         if self.current:
             self.current.paint(p)
             self.line.paint(p)
         if self.selectedShapeCopy:
+            painted[self.selectedShapeCopy] = self.shapeRect(self.selectedShapeCopy)
             self.selectedShapeCopy.paint(p)
+        self._painted = painted
+        self._drawingRects = self.drawingRects()
 
         # Paint rect
         if self.current is not None and len(self.line) == 2:
@@ -431,22 +564,12 @@ class Canvas(QWidget):
             p.setPen(self.drawingRectColor)
             brush = QBrush(Qt.BDiagPattern)
             p.setBrush(brush)
-            p.drawRect(leftTop.x(), leftTop.y(), rectWidth, rectHeight)
+            p.drawRect(QRectF(leftTop.x(), leftTop.y(), rectWidth, rectHeight))
 
         if self.drawing() and not self.prevPoint.isNull() and not self.outOfPixmap(self.prevPoint):
             p.setPen(QColor(0, 0, 0))
-            p.drawLine(self.prevPoint.x(), 0, self.prevPoint.x(), self.pixmap.height())
-            p.drawLine(0, self.prevPoint.y(), self.pixmap.width(), self.prevPoint.y())
-
-        self.setAutoFillBackground(True)
-        if self.verified:
-            pal = self.palette()
-            pal.setColor(self.backgroundRole(), QColor(184, 239, 38, 128))
-            self.setPalette(pal)
-        else:
-            pal = self.palette()
-            pal.setColor(self.backgroundRole(), QColor(232, 232, 232, 255))
-            self.setPalette(pal)
+            p.drawLine(QLineF(self.prevPoint.x(), 0, self.prevPoint.x(), self.pixmap.height()))
+            p.drawLine(QLineF(0, self.prevPoint.y(), self.pixmap.width(), self.prevPoint.y()))
 
         p.end()
 
@@ -477,6 +600,7 @@ class Canvas(QWidget):
 
         self.current.close()
         self.shapes.append(self.current)
+        self.shapeIndex.add(self.current)
         self.current = None
         self.setHiding(False)
         self.newShape.emit()
@@ -610,30 +734,31 @@ class Canvas(QWidget):
         # print(self.selectedShape.points)
         if direction == 'Left' and not self.moveOutOfBound(QPointF(-1.0, 0)):
             # print("move Left one pixel")
-            self.selectedShape.points[0] += QPointF(-1.0, 0)
-            self.selectedShape.points[1] += QPointF(-1.0, 0)
-            self.selectedShape.points[2] += QPointF(-1.0, 0)
-            self.selectedShape.points[3] += QPointF(-1.0, 0)
+            self.selectedShape.moveVertexBy(0, QPointF(-1.0, 0))
+            self.selectedShape.moveVertexBy(1, QPointF(-1.0, 0))
+            self.selectedShape.moveVertexBy(2, QPointF(-1.0, 0))
+            self.selectedShape.moveVertexBy(3, QPointF(-1.0, 0))
         elif direction == 'Right' and not self.moveOutOfBound(QPointF(1.0, 0)):
             # print("move Right one pixel")
-            self.selectedShape.points[0] += QPointF(1.0, 0)
-            self.selectedShape.points[1] += QPointF(1.0, 0)
-            self.selectedShape.points[2] += QPointF(1.0, 0)
-            self.selectedShape.points[3] += QPointF(1.0, 0)
+            self.selectedShape.moveVertexBy(0, QPointF(1.0, 0))
+            self.selectedShape.moveVertexBy(1, QPointF(1.0, 0))
+            self.selectedShape.moveVertexBy(2, QPointF(1.0, 0))
+            self.selectedShape.moveVertexBy(3, QPointF(1.0, 0))
         elif direction == 'Up' and not self.moveOutOfBound(QPointF(0, -1.0)):
             # print("move Up one pixel")
-            self.selectedShape.points[0] += QPointF(0, -1.0)
-            self.selectedShape.points[1] += QPointF(0, -1.0)
-            self.selectedShape.points[2] += QPointF(0, -1.0)
-            self.selectedShape.points[3] += QPointF(0, -1.0)
+            self.selectedShape.moveVertexBy(0, QPointF(0, -1.0))
+            self.selectedShape.moveVertexBy(1, QPointF(0, -1.0))
+            self.selectedShape.moveVertexBy(2, QPointF(0, -1.0))
+            self.selectedShape.moveVertexBy(3, QPointF(0, -1.0))
         elif direction == 'Down' and not self.moveOutOfBound(QPointF(0, 1.0)):
             # print("move Down one pixel")
-            self.selectedShape.points[0] += QPointF(0, 1.0)
-            self.selectedShape.points[1] += QPointF(0, 1.0)
-            self.selectedShape.points[2] += QPointF(0, 1.0)
-            self.selectedShape.points[3] += QPointF(0, 1.0)
+            self.selectedShape.moveVertexBy(0, QPointF(0, 1.0))
+            self.selectedShape.moveVertexBy(1, QPointF(0, 1.0))
+            self.selectedShape.moveVertexBy(2, QPointF(0, 1.0))
+            self.selectedShape.moveVertexBy(3, QPointF(0, 1.0))
+        self.shapeIndex.refresh(self.selectedShape)
         self.shapeMoved.emit()
-        self.repaint()
+        self.updateShapes(self.selectedShape)
 
 
     def expandOnePixel(self, direction):
@@ -641,29 +766,30 @@ class Canvas(QWidget):
         if direction == 'Left' :#and not self.moveOutOfBound(QPointF(-1.0, 0)):
             # print("move Left one pixel")
             # self.selectedShape.points[0] += QPointF(-1.0, 0)
-            self.selectedShape.points[1] += QPointF(-1.0, 0)
+            self.selectedShape.moveVertexBy(1, QPointF(-1.0, 0))
             # self.selectedShape.points[2] += QPointF(-1.0, 0)
-            self.selectedShape.points[2] += QPointF(-1.0, 0)
+            self.selectedShape.moveVertexBy(2, QPointF(-1.0, 0))
         elif direction == 'Right' and not self.moveOutOfBound(QPointF(1.0, 0)):
             # print("move Right one pixel")
             # self.selectedShape.points[0] += QPointF(1.0, 0)
-            self.selectedShape.points[1] += QPointF(1.0, 0)
-            self.selectedShape.points[2] += QPointF(1.0, 0)
+            self.selectedShape.moveVertexBy(1, QPointF(1.0, 0))
+            self.selectedShape.moveVertexBy(2, QPointF(1.0, 0))
             # self.selectedShape.points[3] += QPointF(1.0, 0)
         elif direction == 'Up' and not self.moveOutOfBound(QPointF(0, -1.0)):
             # print("move Up one pixel")
-            self.selectedShape.points[0] += QPointF(0, -1.0)
-            self.selectedShape.points[1] += QPointF(0, -1.0)
+            self.selectedShape.moveVertexBy(0, QPointF(0, -1.0))
+            self.selectedShape.moveVertexBy(1, QPointF(0, -1.0))
             # self.selectedShape.points[2] += QPointF(0, -1.0)
             # self.selectedShape.points[3] += QPointF(0, -1.0)
         elif direction == 'Down':# and not self.moveOutOfBound(QPointF(0, 1.0)):
             # print("move Down one pixel")
-            self.selectedShape.points[0] += QPointF(0, 1.0)
-            self.selectedShape.points[1] += QPointF(0, 1.0)
+            self.selectedShape.moveVertexBy(0, QPointF(0, 1.0))
+            self.selectedShape.moveVertexBy(1, QPointF(0, 1.0))
             # self.selectedShape.points[2] += QPointF(0, 1.0)
             # self.selectedShape.points[3] += QPointF(0, 1.0)
+        self.shapeIndex.refresh(self.selectedShape)
         self.shapeMoved.emit()
-        self.repaint()
+        self.updateShapes(self.selectedShape)
 
     def moveOutOfBound(self, step):
         points = [p1+p2 for p1, p2 in zip(self.selectedShape.points, [step]*4)]
@@ -683,6 +809,7 @@ class Canvas(QWidget):
     def undoLastLine(self):
         assert self.shapes
         self.current = self.shapes.pop()
+        self.shapeIndex.discard(self.current)
         self.current.setOpen()
         self.line.points = [self.current[-1], self.current[0]]
         self.drawingPolygon.emit(True)
@@ -690,6 +817,7 @@ class Canvas(QWidget):
     def resetAllLines(self):
         assert self.shapes
         self.current = self.shapes.pop()
+        self.shapeIndex.discard(self.current)
         self.current.setOpen()
         self.line.points = [self.current[-1], self.current[0]]
         self.drawingPolygon.emit(True)
@@ -698,18 +826,22 @@ class Canvas(QWidget):
         self.update()
 
     def loadPixmap(self, pixmap):
+        """Set the background image, either a QPixmap or (in lean mode) the decoded QImage itself."""
         self.pixmap = pixmap
+        self._scaledKey = self._scaledPixmap = None
         self.shapes = []
-        self.repaint()
+        self.shapeIndex.clear()
+        self.update()
 
     def loadShapes(self, shapes):
         self.shapes = list(shapes)
+        self.shapeIndex.rebuild(self.shapes)
         self.current = None
-        self.repaint()
+        self.update()
 
     def setShapeVisible(self, shape, value):
         self.visible[shape] = value
-        self.repaint()
+        self.updateShapes(shape)
 
     def currentCursor(self):
         cursor = QApplication.overrideCursor()
@@ -730,4 +862,5 @@ class Canvas(QWidget):
     def resetState(self):
         self.restoreCursor()
         self.pixmap = None
+        self._scaledKey = self._scaledPixmap = None
         self.update()
@@ -0,0 +1,130 @@
+"""Select dataset folders by class from Jester style '<id>;<label>' CSV files.
+
+Files are streamed in fixed-size chunks and never split into per-line
+strings. Each chunk is viewed as a numpy byte array: line ends and the
+';' separators are located once, labels of the selected classes are
+compared as byte matrices (grouped by label length), and the ids of the
+matching rows are parsed from their digits, all without a Python loop
+per row. Several CSV files are processed in parallel, one process per file.
+"""
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 24
+ENCODE_METHOD = 'utf-8'
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+SEMICOLON = ord(';')
+MAX_ID_DIGITS = 18
+
+
+def readLabels(path):
+    """Class names of a labels CSV, one per line; the line number is the class index."""
+    with open(path, 'rb') as f:
+        return [line.rstrip(b'\r\n').decode(ENCODE_METHOD) for line in f if line.strip()]
+
+
+def resolveClasses(labels, names=None, indices=None):
+    """Set of class names from names and/or indices into labels; unknown classes raise ValueError."""
+    selected = set()
+    known = set(labels)
+    for name in names or []:
+        if name not in known:
+            raise ValueError('Unknown class %r' % name)
+        selected.add(name)
+    for index in indices or []:
+        if not 0 <= index < len(labels):
+            raise ValueError('Class index %d out of range 0..%d' % (index, len(labels) - 1))
+        selected.add(labels[index])
+    return selected
+
+
+def _matchIds(chunk, patterns):
+    """Folder ids of the rows of chunk (whole lines only) whose label is one of patterns."""
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    ends = np.flatnonzero(data == NEWLINE)
+    if len(data) and data[-1] != NEWLINE:
+        ends = np.append(ends, len(data))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # The first ';' of every line separates the id from the label.
+    semicolons = np.flatnonzero(data == SEMICOLON)
+    first = np.searchsorted(semicolons, starts)
+    valid = first < len(semicolons)
+    separators = np.zeros(len(starts), dtype=np.int64)
+    separators[valid] = semicolons[first[valid]]
+    valid &= (separators > starts) & (separators < ends) & (separators - starts <= MAX_ID_DIGITS)
+    labelEnds = ends - (data[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN)
+    lengths = labelEnds - separators - 1
+
+    matched = np.zeros(len(starts), dtype=bool)
+    for pattern in patterns:
+        rows = np.flatnonzero(valid & (lengths == len(pattern)))
+        if len(rows):
+            columns = separators[rows, None] + 1 + np.arange(len(pattern))
+            equal = (data[columns] == np.frombuffer(pattern, dtype=np.uint8)).all(axis=1)
+            matched[rows[equal]] = True
+
+    rows = np.flatnonzero(matched)
+    separators = separators[rows]
+    widths = separators - starts[rows]
+    ids = np.zeros(len(rows), dtype=np.int64)
+    digits = np.ones(len(rows), dtype=bool)
+    for k in range(int(widths.max()) if len(rows) else 0):
+        present = widths > k
+        digit = data[np.where(present, separators - 1 - k, 0)].astype(np.int64) - ord('0')
+        digits &= ~present | ((digit >= 0) & (digit <= 9))
+        ids += np.where(present, digit, 0) * 10 ** k
+    return ids[digits]
+
+
+def selectFolders(path, classes, chunkSize=CHUNK_SIZE):
+    """Sorted folder ids of path whose label is in classes, as an int64 array."""
+    patterns = [name.encode(ENCODE_METHOD) for name in classes]
+    ids = []
+    rest = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunkSize)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            cut = chunk.rfind(b'\n') + 1
+            if cut == 0:
+                rest = chunk
+                continue
+            ids.append(_matchIds(chunk[:cut], patterns))
+            rest = chunk[cut:]
+    if rest:
+        ids.append(_matchIds(rest, patterns))
+    return sortedUnique(np.concatenate(ids)) if ids else np.zeros(0, dtype=np.int64)
+
+
+def sortedUnique(ids):
+    ids = np.sort(ids)
+    if len(ids):
+        ids = ids[np.concatenate(([True], ids[1:] != ids[:-1]))]
+    return ids
+
+
+def _selectFolders(args):
+    return selectFolders(*args)
+
+
+def selectFoldersFromFiles(paths, classes, processes=None):
+    """Union of the selected folder ids of several CSV files, sorted, one worker process per file."""
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return np.zeros(0, dtype=np.int64)
+    jobs = [(path, sorted(classes)) for path in paths]
+    if len(paths) == 1 or processes == 1:
+        results = [_selectFolders(job) for job in jobs]
+    else:
+        pool = Pool(processes or len(paths))
+        try:
+            results = pool.map(_selectFolders, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    return sortedUnique(np.concatenate(results))
@@ -10,4 +10,17 @@ SETTING_WIN_STATE = 'window/state'
 SETTING_SAVE_DIR = 'savedir'
 SETTING_LAST_OPEN_DIR = 'lastOpenDir'
 SETTING_AUTO_SAVE = 'autosave'
-SETTING_SINGLE_CLASS = 'singleclass'
\ No newline at end of file
+SETTING_SINGLE_CLASS = 'singleclass'
+SETTING_PREFETCH_AHEAD = 'prefetch/ahead'
+SETTING_PREFETCH_BEHIND = 'prefetch/behind'
+SETTING_CACHE_SIZE = 'cache/size'
+SETTING_LEAN_IMAGE = 'image/lean'
+SETTING_ANNOTATION_FORMAT = 'annotation/format'
+FORMAT_PASCALVOC = 'voc'
+FORMAT_BUNDLE = 'bundle'
+FORMAT_LMDB = 'lmdb'
+SETTING_LMDB_MAP_SIZE = 'lmdb/mapSize'
+SETTING_LMDB_WRITEMAP = 'lmdb/writemap'
+SETTING_LMDB_METASYNC = 'lmdb/metasync'
+SETTING_LMDB_BATCH_INTERVAL = 'lmdb/batchInterval'
+SETTING_LMDB_BATCH_SIZE = 'lmdb/batchSize'
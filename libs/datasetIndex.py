@@ -0,0 +1,137 @@
+import json
+import os
+from multiprocessing.pool import ThreadPool
+
+from libs.atomicFile import atomicWrite
+from libs.dirManifest import IMAGE_EXTENSIONS, dirStamp
+from libs.imageSize import readImageShape
+
+INDEX_NAME = 'dataset_index.json'
+INDEX_VERSION = 1
+DEFAULT_SCAN_THREADS = 16
+
+
+def folderKey(name):
+    """Numeric folder names (Jester ids) sort as numbers, anything else after them by name."""
+    return (0, int(name), '') if name.isdigit() else (1, 0, name)
+
+
+def listFolders(root):
+    if hasattr(os, 'scandir'):
+        names = [entry.name for entry in os.scandir(root) if entry.is_dir()]
+    else:
+        names = [name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))]
+    names.sort(key=folderKey)
+    return names
+
+
+def scanFolder(path):
+    """Return (mtime, frame count, height, width) of one frame folder.
+
+    One listing of the folder and one image header read; height and width
+    are 0 when the folder has no readable frame."""
+    stamp = dirStamp(path)
+    if hasattr(os, 'scandir'):
+        names = [entry.name for entry in os.scandir(path)]
+    else:
+        names = os.listdir(path)
+    frames = sorted(name for name in names if name.lower().endswith(IMAGE_EXTENSIONS))
+    shape = readImageShape(os.path.join(path, frames[0])) if frames else None
+    height, width = shape[:2] if shape else (0, 0)
+    return stamp, len(frames), height, width
+
+
+class DatasetIndex(object):
+    """Folder id, frame count and frame size of every folder under a dataset root.
+
+    Stored column-wise in one JSON file so that distribute_dir.py and the
+    annotation tool never list the 148k folder root themselves. build()
+    scans folders on a thread pool; refresh() only rescans folders whose
+    mtime changed and lists the root again only if the root's mtime did."""
+
+    def __init__(self, root, stamp=None, names=None, mtimes=None, frames=None, heights=None, widths=None):
+        self.root = root
+        self.stamp = stamp
+        self.names = names or []
+        self.mtimes = mtimes or []
+        self.frames = frames or []
+        self.heights = heights or []
+        self.widths = widths or []
+        self._positions = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def folder(self, name):
+        """(frame count, height, width) of one folder."""
+        if self._positions is None:
+            self._positions = dict((n, i) for i, n in enumerate(self.names))
+        i = self._positions[name]
+        return self.frames[i], self.heights[i], self.widths[i]
+
+    @classmethod
+    def build(cls, root, threads=DEFAULT_SCAN_THREADS):
+        index = cls(root, dirStamp(root), listFolders(root))
+        index._scan(index.names, {}, threads)
+        return index
+
+    def refresh(self, threads=DEFAULT_SCAN_THREADS):
+        """Bring the index up to date; returns the number of folders rescanned or dropped."""
+        known = dict((name, (self.mtimes[i], self.frames[i], self.heights[i], self.widths[i]))
+                     for i, name in enumerate(self.names))
+        stamp = dirStamp(self.root)
+        names = listFolders(self.root) if stamp != self.stamp else self.names
+        pool = ThreadPool(threads)
+        try:
+            stamps = pool.map(dirStamp, [os.path.join(self.root, name) for name in names])
+        finally:
+            pool.close()
+        changed = [name for name, mtime in zip(names, stamps) if name not in known or known[name][0] != mtime]
+        dropped = len(known) - (len(names) - len([name for name in names if name not in known]))
+        self.stamp = stamp
+        self.names = names
+        self._positions = None
+        self._scan(changed, known, threads)
+        return len(changed) + dropped
+
+    def _scan(self, changed, known, threads):
+        pool = ThreadPool(threads)
+        try:
+            scanned = pool.map(scanFolder, [os.path.join(self.root, name) for name in changed])
+        finally:
+            pool.close()
+        known.update(zip(changed, scanned))
+        rows = [known[name] for name in self.names]
+        self.mtimes = [row[0] for row in rows]
+        self.frames = [row[1] for row in rows]
+        self.heights = [row[2] for row in rows]
+        self.widths = [row[3] for row in rows]
+
+    @classmethod
+    def load(cls, path):
+        """Read an index file; returns None if it is missing or from another version."""
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        return cls(data['root'], data['stamp'], data['names'], data['mtimes'],
+                   data['frames'], data['heights'], data['widths'])
+
+    def save(self, path):
+        data = {'version': INDEX_VERSION, 'root': self.root, 'stamp': self.stamp, 'names': self.names,
+                'mtimes': self.mtimes, 'frames': self.frames, 'heights': self.heights, 'widths': self.widths}
+        atomicWrite(path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def loadIndex(root, path, refresh=False, threads=DEFAULT_SCAN_THREADS):
+    """The saved index of root, built and saved first if there is none (or refreshed on request)."""
+    index = DatasetIndex.load(path)
+    if index is None or os.path.abspath(index.root) != os.path.abspath(root):
+        index = DatasetIndex.build(root, threads)
+        index.save(path)
+    elif refresh and index.refresh(threads):
+        index.save(path)
+    return index
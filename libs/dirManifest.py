@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+
+from libs.atomicFile import atomicWrite
+IMAGE_EXTENSIONS = ('.jpeg', '.jpg', '.png', '.bmp')
+DEFAULT_MANIFEST_DIR = os.path.join(os.path.expanduser('~'), '.labelImgManifests')
+
+
+def dirStamp(path):
+    """Modification time of a directory, which changes whenever an entry is added or removed."""
+    try:
+        st = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return getattr(st, 'st_mtime_ns', None) or st.st_mtime
+
+
+def listImages(folderPath):
+    """Sorted image file names directly inside folderPath.
+
+    Frame folders are flat, so this is a single directory listing: no
+    recursion and no per-file stat, only the names are looked at."""
+    if hasattr(os, 'scandir'):
+        with os.scandir(folderPath) as entries:
+            names = [entry.name for entry in entries]
+    else:
+        names = os.listdir(folderPath)
+    names = [name for name in names if name.lower().endswith(IMAGE_EXTENSIONS)]
+    names.sort(key=lambda name: name.lower())
+    return names
+
+
+class DirManifestCache(object):
+    """Frame lists of image folders, cached locally and keyed by directory mtime.
+
+    Reopening an unchanged folder costs one stat of the directory and no
+    listing, which matters when the images live on sshfs. Manifests are kept
+    in memory and in one small JSON file per folder under cacheDir; the cache
+    is best effort and a failure to write it is ignored."""
+
+    def __init__(self, cacheDir=DEFAULT_MANIFEST_DIR):
+        self.cacheDir = cacheDir
+        self.listings = 0
+        self._manifests = {}
+
+    def _manifestPath(self, folderPath):
+        digest = hashlib.sha1(folderPath.encode('utf-8')).hexdigest()
+        return os.path.join(self.cacheDir, digest + '.json')
+
+    def _load(self, folderPath):
+        manifest = self._manifests.get(folderPath)
+        if manifest is None and self.cacheDir:
+            try:
+                with open(self._manifestPath(folderPath), 'rb') as f:
+                    manifest = json.loads(f.read().decode('utf-8'))
+            except (IOError, OSError, ValueError):
+                return None
+            if manifest.get('path') != folderPath:
+                return None
+            self._manifests[folderPath] = manifest
+        return manifest
+
+    def _store(self, folderPath, manifest):
+        self._manifests[folderPath] = manifest
+        if not self.cacheDir:
+            return
+        target = self._manifestPath(folderPath)
+        try:
+            atomicWrite(target, json.dumps(manifest).encode('utf-8'))
+        except (IOError, OSError):
+            pass
+
+    def names(self, folderPath):
+        folderPath = os.path.abspath(folderPath)
+        stamp = dirStamp(folderPath)
+        if stamp is None:
+            # Missing or unreachable: no frames, and nothing worth caching.
+            return []
+        manifest = self._load(folderPath)
+        if manifest is None or manifest['stamp'] != stamp:
+            try:
+                names = listImages(folderPath)
+            except (IOError, OSError):
+                return []
+            manifest = {'path': folderPath, 'stamp': stamp, 'names': names}
+            self.listings += 1
+            self._store(folderPath, manifest)
+        return manifest['names']
+
+    def images(self, folderPath):
+        """Absolute paths of the images in folderPath, sorted case-insensitively."""
+        folderPath = os.path.abspath(folderPath)
+        return [os.path.join(folderPath, name) for name in self.names(folderPath)]
+
+    def discard(self, folderPath):
+        folderPath = os.path.abspath(folderPath)
+        self._manifests.pop(folderPath, None)
+        try:
+            os.remove(self._manifestPath(folderPath))
+        except (IOError, OSError):
+            pass
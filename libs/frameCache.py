@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import os
+
+DEFAULT_CACHE_MB = 256
+
+
+def fileStamp(path):
+    """Return a value that changes whenever the file is rewritten, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def imageBytes(image):
+    """Approximate memory held by a QImage or QPixmap."""
+    if image is None or image.isNull():
+        return 0
+    return image.width() * image.height() * max(1, image.depth() // 8)
+
+
+def shapesBytes(shapes):
+    """Rough size of a list of PascalVocReader shape tuples."""
+    return sum(256 + len(shape[0] or '') for shape in shapes)
+
+
+class FrameCache(object):
+    """Memory bounded LRU cache of decoded frames and parsed annotations.
+
+    Every entry remembers the stamp (mtime, size) of the file it was built
+    from, so a lookup with a newer stamp is treated as a miss."""
+
+    def __init__(self, maxBytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, stamp=None):
+        entry = self._entries.get(key)
+        if entry is None or (stamp is not None and entry[0] != stamp):
+            if entry is not None:
+                self.discard(key)
+            self.misses += 1
+            return None
+        self._entries[key] = self._entries.pop(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, nbytes, stamp=None):
+        self.discard(key)
+        if nbytes > self.maxBytes:
+            return
+        self._entries[key] = (stamp, value, nbytes)
+        self.currentBytes += nbytes
+        self.evict()
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.currentBytes -= entry[2]
+
+    def evict(self):
+        while self.currentBytes > self.maxBytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self.currentBytes -= nbytes
+
+    def setMaxBytes(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.evict()
+
+    def clear(self):
+        self._entries.clear()
+        self.currentBytes = 0
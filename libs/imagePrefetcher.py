@@ -0,0 +1,98 @@
+try:
+    from PyQt5.QtGui import QImage, QImageReader
+    from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+except ImportError:
+    from PyQt4.QtGui import QImage, QImageReader
+    from PyQt4.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+DEFAULT_PREFETCH_AHEAD = 3
+DEFAULT_PREFETCH_BEHIND = 1
+DEFAULT_PREFETCH_THREADS = 2
+
+
+class ImageDecodeTask(QRunnable):
+    """Read and decode one image file on a worker thread.
+
+    QImage (unlike QPixmap) may be created outside the GUI thread, so the
+    decoded image is handed back through a queued signal."""
+
+    def __init__(self, prefetcher, path):
+        super(ImageDecodeTask, self).__init__()
+        self.prefetcher = prefetcher
+        self.path = path
+
+    def run(self):
+        image = QImageReader(self.path).read()
+        self.prefetcher.decoded.emit(self.path, image)
+
+
+class ImagePrefetcher(QObject):
+    """Decode the neighbours of the current frame in the background.
+
+    Only frames inside the window [index - behind, index + ahead] are kept,
+    so memory stays bounded no matter how long the folder is."""
+    decoded = pyqtSignal(str, QImage)
+
+    def __init__(self, parent=None, ahead=DEFAULT_PREFETCH_AHEAD,
+                 behind=DEFAULT_PREFETCH_BEHIND, threads=DEFAULT_PREFETCH_THREADS):
+        super(ImagePrefetcher, self).__init__(parent)
+        self.ahead = ahead
+        self.behind = behind
+        self.hits = 0
+        self.misses = 0
+        self._ready = {}
+        self._pending = set()
+        self._wanted = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, threads))
+        self.decoded.connect(self._onDecoded)
+
+    def enabled(self):
+        return self.ahead > 0 or self.behind > 0
+
+    def take(self, path):
+        """Return the decoded image for path, or None if it is not ready yet."""
+        image = self._ready.pop(path, None)
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    def prefetch(self, paths, index):
+        """Schedule decoding of the frames around paths[index]."""
+        if not self.enabled() or index is None:
+            return
+        first = max(0, index - self.behind)
+        last = min(len(paths), index + self.ahead + 1)
+        # Nearest frames first: the next one is the most likely to be asked for.
+        order = sorted(range(first, last), key=lambda i: (abs(i - index), i < index))
+        self._wanted = set(paths[i] for i in order if i != index)
+        for path in list(self._ready):
+            if path not in self._wanted:
+                del self._ready[path]
+        for i in order:
+            path = paths[i]
+            if i == index or path in self._ready or path in self._pending:
+                continue
+            self._pending.add(path)
+            self._pool.start(ImageDecodeTask(self, path))
+
+    def clear(self):
+        self._pool.clear()
+        self._pending = set()
+        self._wanted = set()
+        self._ready.clear()
+
+    def resetCounters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hitRate(self):
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def _onDecoded(self, path, image):
+        self._pending.discard(path)
+        if path in self._wanted and not image.isNull():
+            self._ready[path] = image
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""Read image dimensions from file headers without decoding the pixels."""
+import os
+import struct
+
+try:
+    from PyQt5.QtGui import QImage, QImageReader
+except ImportError:
+    try:
+        from PyQt4.QtGui import QImage, QImageReader
+    except ImportError:
+        QImage = QImageReader = None
+
+# JPEG start-of-frame markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not.
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - set([0xC4, 0xC8, 0xCC])
+
+
+def _isGrayPalette(palette, entrySize):
+    for i in range(0, len(palette) - entrySize + 1, entrySize):
+        if not palette[i] == palette[i + 1] == palette[i + 2]:
+            return False
+    return True
+
+
+def _jpegShape(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = ord(byte)
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Stand-alone markers have no length field.
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        if marker in JPEG_SOF_MARKERS:
+            _, height, width, components = struct.unpack('>BHHB', f.read(6))
+            return [height, width, 1 if components == 1 else 3]
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _pngShape(f):
+    f.seek(8)
+    length, chunk = struct.unpack('>I4s', f.read(8))
+    if chunk != b'IHDR':
+        return None
+    width, height, bitDepth, colorType = struct.unpack('>IIBB', f.read(10))
+    if colorType == 0:
+        return [height, width, 1]
+    if colorType == 3:
+        # Indexed: grayscale only if every palette entry is gray.
+        f.seek(8 + 8 + length + 4)
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk = struct.unpack('>I4s', header)
+            if chunk == b'PLTE':
+                palette = bytearray(f.read(length))
+                return [height, width, 1 if _isGrayPalette(palette, 3) else 3]
+            if chunk == b'IDAT':
+                break
+            f.seek(length + 4, os.SEEK_CUR)
+    return [height, width, 3]
+
+
+def _bmpShape(f):
+    f.seek(14)
+    headerSize = struct.unpack('<I', f.read(4))[0]
+    if headerSize == 12:
+        width, height, _, bitCount = struct.unpack('<HhHH', f.read(8))
+        usedColors = 0
+    else:
+        width, height, _, bitCount = struct.unpack('<iiHH', f.read(12))
+        f.read(16)
+        usedColors = struct.unpack('<I', f.read(4))[0]
+    depth = 3
+    if bitCount <= 8:
+        entrySize = 3 if headerSize == 12 else 4
+        f.seek(14 + headerSize)
+        palette = bytearray(f.read(entrySize * (usedColors or 1 << bitCount)))
+        depth = 1 if _isGrayPalette(palette, entrySize) else 3
+    return [abs(height), abs(width), depth]
+
+
+def readImageShape(path):
+    """Return [height, width, depth] as written to the Pascal VOC <size> element.
+
+    Depth is 1 when the file stores gray samples (or a gray palette), 3
+    otherwise. Unlike QImage.isGrayscale() it does not look at the pixels, so
+    an RGB file that only happens to contain gray pixels still reports 3.
+    Only the file header is read; formats other than JPEG/PNG/BMP fall back
+    to QImageReader, which also avoids a full decode."""
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(8)
+            if magic[:2] == b'\xff\xd8':
+                shape = _jpegShape(f)
+            elif magic == b'\x89PNG\r\n\x1a\n':
+                shape = _pngShape(f)
+            elif magic[:2] == b'BM':
+                shape = _bmpShape(f)
+            else:
+                shape = None
+    except (IOError, OSError, struct.error, ValueError):
+        shape = None
+    if shape is None and QImageReader is not None:
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid():
+            gray = reader.imageFormat() == QImage.Format_Grayscale8 if hasattr(QImage, 'Format_Grayscale8') else False
+            shape = [size.height(), size.width(), 1 if gray else 3]
+    return shape
+
+
+def imageShapeOf(image):
+    """Shape of an image that is already decoded in memory."""
+    return [image.height(), image.width(), 1 if image.isGrayscale() else 3]
+
+
+class ImageShapeProvider(object):
+    """Per-folder cache of image shapes.
+
+    All frames of a video folder share their dimensions, so the header of
+    one frame answers for the whole folder."""
+
+    def __init__(self):
+        self.folders = {}
+
+    def shape(self, imagePath, image=None):
+        folder = os.path.dirname(imagePath)
+        if image is not None and not image.isNull():
+            shape = imageShapeOf(image)
+            self.folders[folder] = shape
+            return shape
+        shape = self.folders.get(folder)
+        if shape is None:
+            shape = readImageShape(imagePath)
+            if shape is not None:
+                self.folders[folder] = shape
+        return shape
+
+    def clear(self):
+        self.folders.clear()
@@ -0,0 +1,131 @@
+"""Split dataset folders into per-annotator sessions, balanced by frame count.
+
+An assignment has the layout of job_assign.json: {id: [session 1 folders,
+session 2 folders, ...]}. Every session is cut into one contiguous run of
+folders per annotator. Cuts are placed on the cumulative frame count with
+numpy.searchsorted, so millions of folders are split with a handful of
+vectorized operations instead of appending folder by folder.
+"""
+import json
+import os
+
+import numpy as np
+
+from libs.datasetIndex import folderKey
+
+DIRS_PER_SESSION = 5000
+
+
+def readIds(path):
+    """Annotator ids, one per line, as in env/ids.txt."""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def sessionCount(nDirs, dirsPerSession=DIRS_PER_SESSION):
+    return max(1, (nDirs + dirsPerSession - 1) // dirsPerSession)
+
+
+def cutPoints(frames, shares):
+    """Folder positions splitting frames into consecutive runs of the given relative shares.
+
+    A folder goes to the run that contains the midpoint of its frames, so every
+    run is within half a folder of its exact share."""
+    frames = np.asarray(frames, dtype=np.float64)
+    shares = np.asarray(shares, dtype=np.float64)
+    if len(frames) == 0:
+        return np.zeros(len(shares) + 1, dtype=np.int64)
+    cumulative = np.cumsum(frames)
+    midpoints = cumulative - frames / 2
+    targets = cumulative[-1] * np.concatenate(([0.0], np.cumsum(shares) / shares.sum()))
+    cuts = np.searchsorted(midpoints, targets, side='right')
+    cuts[0], cuts[-1] = 0, len(frames)
+    return cuts
+
+
+def annotatorShares(ids, weights=None):
+    weights = weights or {}
+    shares = np.array([float(weights.get(i, 1.0)) for i in ids])
+    if (shares < 0).any() or shares.sum() <= 0:
+        raise ValueError('Annotator weights must be non-negative and not all zero')
+    return shares
+
+
+def assignJobs(names, ids, frames=None, weights=None, dirsPerSession=DIRS_PER_SESSION):
+    """Assign folders (in the given order) to annotators.
+
+    The number of sessions follows from dirsPerSession as before. Every
+    session then gets the same share of the total frames, and each annotator
+    gets weights[id] (default 1) parts of every session. Without frame
+    counts each folder counts as one."""
+    names = np.asarray(names, dtype=object)
+    frames = np.ones(len(names)) if frames is None else np.asarray(frames)
+    nSess = sessionCount(len(names), dirsPerSession)
+    shares = annotatorShares(ids, weights)
+    # One run per (session, annotator), in session-major order.
+    cuts = cutPoints(frames, np.tile(shares, nSess))
+    assignment = dict((i, []) for i in ids)
+    for run in range(nSess * len(ids)):
+        assignment[ids[run % len(ids)]].append(names[cuts[run]:cuts[run + 1]].tolist())
+    return assignment
+
+
+def reassignJobs(assignment, finished, ids, frames=None, weights=None, fromSession=1):
+    """Hand the unfinished folders of sessions fromSession and later to ids.
+
+    Finished folders stay with whoever finished them and earlier sessions are
+    left untouched. In every later session the remaining folders are pooled
+    in folder order and split again by frame count and weight, so annotators
+    can be added, removed or reweighted mid-project. frames maps a folder
+    name to its frame count."""
+    shares = annotatorShares(ids, weights)
+    nSess = max(len(sessions) for sessions in assignment.values()) if assignment else 0
+    result = dict((i, [list(s) for s in sessions]) for i, sessions in assignment.items())
+    for i in ids:
+        sessions = result.setdefault(i, [])
+        sessions.extend([] for _ in range(nSess - len(sessions)))
+
+    for sess in range(fromSession - 1, nSess):
+        pool = []
+        for i, sessions in result.items():
+            if sess < len(sessions):
+                pool.extend(name for name in sessions[sess] if name not in finished)
+                sessions[sess] = [name for name in sessions[sess] if name in finished]
+        pool.sort(key=folderKey)
+        poolFrames = [frames.get(name, 1) for name in pool] if frames else np.ones(len(pool))
+        cuts = cutPoints(poolFrames, shares)
+        pool = np.asarray(pool, dtype=object)
+        for k, i in enumerate(ids):
+            result[i][sess] = sorted(result[i][sess] + pool[cuts[k]:cuts[k + 1]].tolist(), key=folderKey)
+    return result
+
+
+def readFinished(envPath, assignment):
+    """Folders marked finished by 'Save finished folders', read from <id>_<session>.txt."""
+    finished = set()
+    for i, sessions in assignment.items():
+        for sess in range(1, len(sessions) + 1):
+            path = os.path.join(envPath, '%s_%s.txt' % (i, str(sess).zfill(2)))
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    finished.update(line.strip() for line in f if line.strip())
+    return finished
+
+
+def sessionFrames(assignment, frames):
+    """Frames per annotator and session, for checking the balance: {id: [count, ...]}."""
+    return dict((i, [sum(frames.get(name, 1) for name in s) for s in sessions])
+                for i, sessions in assignment.items())
+
+
+def saveAssignment(assignment, path):
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
+    with open(path, 'w') as f:
+        json.dump(assignment, f, indent=2)
+
+
+def loadAssignment(path):
+    with open(path, 'r') as f:
+        return json.load(f)
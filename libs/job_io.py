@@ -0,0 +1,177 @@
+"""Indexed, memory-mapped form of job_assign.json.
+
+    job_assign.npy         int32 folder ids of every run, session-major:
+                           session 1 of every annotator, then session 2, ...
+    job_assign_index.json  {"version", "ids", "sessions", "offsets"}, where run
+                           r = session * len(ids) + annotator spans
+                           folders[offsets[r]:offsets[r + 1]]
+
+Opening it reads the small index and maps the array; pulling one
+annotator's session touches only that slice. Because all annotators of a
+session are stored next to each other, the verifier's per-session list
+across every id is a single slice as well.
+"""
+import io
+import json
+import os
+
+import numpy as np
+
+from libs.atomicFile import atomicWrite
+JOB_JSON = 'job_assign.json'
+JOB_FOLDERS = 'job_assign.npy'
+JOB_INDEX = 'job_assign_index.json'
+JOB_VERSION = 1
+
+
+class AnnotatorJobs(object):
+    """The sessions of one annotator, materialized one session at a time."""
+
+    def __init__(self, jobs, annotator):
+        self.jobs = jobs
+        self.annotator = annotator
+
+    def __len__(self):
+        return self.jobs.sessions
+
+    def __getitem__(self, sess):
+        if sess < 0:
+            sess += len(self)
+        if not 0 <= sess < len(self):
+            raise IndexError('session index out of range')
+        return self.jobs.folders(self.annotator, sess)
+
+
+class SessionJobs(AnnotatorJobs):
+    """Per-session folder lists of several annotators concatenated, as the verifier shows them."""
+
+    def __getitem__(self, sess):
+        if sess < 0:
+            sess += len(self)
+        if not 0 <= sess < len(self):
+            raise IndexError('session index out of range')
+        return self.jobs.sessionFolders(sess, self.annotator)
+
+
+class JobAssignment(object):
+
+    def __init__(self, ids, offsets, folders):
+        self.ids = list(ids)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.folderIds = folders
+        self.sessions = (len(self.offsets) - 1) // len(self.ids) if self.ids else 0
+        self._positions = dict((annotator, k) for k, annotator in enumerate(self.ids))
+
+    def __contains__(self, annotator):
+        return annotator in self._positions
+
+    def __getitem__(self, annotator):
+        if annotator not in self._positions:
+            raise KeyError(annotator)
+        return AnnotatorJobs(self, annotator)
+
+    def keys(self):
+        return list(self.ids)
+
+    def _slice(self, start, end):
+        return [str(folder) for folder in self.folderIds[start:end].tolist()]
+
+    def folders(self, annotator, sess):
+        """Folder names of one annotator's session (0-based)."""
+        run = sess * len(self.ids) + self._positions[annotator]
+        return self._slice(self.offsets[run], self.offsets[run + 1])
+
+    def sessionFolders(self, sess, ids=None):
+        """Folder names of a session for ids (default: all), in the order of ids."""
+        if ids is None or list(ids) == self.ids:
+            first = sess * len(self.ids)
+            return self._slice(self.offsets[first], self.offsets[first + len(self.ids)])
+        folders = []
+        for annotator in ids:
+            folders.extend(self.folders(annotator, sess))
+        return folders
+
+    def sessionsOf(self, ids):
+        return SessionJobs(self, ids)
+
+    def total(self, ids=None):
+        """Number of folders assigned to ids (default: all) over every session."""
+        if ids is None:
+            return int(self.offsets[-1])
+        sizes = np.diff(self.offsets).reshape(self.sessions, len(self.ids))
+        return int(sizes[:, [self._positions[annotator] for annotator in ids]].sum())
+
+    def toDict(self):
+        return dict((annotator, [self.folders(annotator, sess) for sess in range(self.sessions)])
+                    for annotator in self.ids)
+
+    @classmethod
+    def fromDict(cls, assignment, ids=None):
+        """Build from the {id: [session folders, ...]} layout of job_assign.json.
+
+        Numeric folder names are stored as int32; any other name keeps the
+        assignment in memory only (save() will refuse it)."""
+        ids = list(ids or assignment)
+        sessions = max(len(assignment[annotator]) for annotator in ids) if ids else 0
+        runs = []
+        for sess in range(sessions):
+            for annotator in ids:
+                runs.append(assignment[annotator][sess] if sess < len(assignment[annotator]) else [])
+        offsets = np.zeros(len(runs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(run) for run in runs])
+        names = [name for run in runs for name in run]
+        try:
+            folders = np.array([int(name) for name in names], dtype=np.int32)
+            if [str(folder) for folder in folders.tolist()] != names:
+                raise ValueError
+        except (ValueError, OverflowError):
+            folders = np.array(names, dtype=object)
+        return cls(ids, offsets, folders)
+
+    @classmethod
+    def load(cls, envPath):
+        """Open the binary job file in envPath; returns None if there is none."""
+        try:
+            with open(os.path.join(envPath, JOB_INDEX), 'r') as f:
+                index = json.load(f)
+            if index.get('version') != JOB_VERSION:
+                return None
+            folders = np.load(os.path.join(envPath, JOB_FOLDERS), mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            return None
+        # An interrupted save can leave the array of one assignment with the index of another.
+        if not index['offsets'] or index['offsets'][-1] != len(folders):
+            return None
+        return cls(index['ids'], index['offsets'], folders)
+
+    def save(self, envPath):
+        if self.folderIds.dtype != np.int32:
+            raise ValueError('Only numeric folder names can be stored in %s' % JOB_FOLDERS)
+        buf = io.BytesIO()
+        np.save(buf, np.ascontiguousarray(self.folderIds))
+        atomicWrite(os.path.join(envPath, JOB_FOLDERS), buf.getvalue())
+        index = {'version': JOB_VERSION, 'ids': self.ids, 'sessions': self.sessions,
+                 'offsets': self.offsets.tolist()}
+        atomicWrite(os.path.join(envPath, JOB_INDEX), json.dumps(index).encode('utf-8'))
+
+
+def loadJobs(envPath):
+    """The binary job file if it is up to date, else job_assign.json parsed into the same interface."""
+    jsonPath = os.path.join(envPath, JOB_JSON)
+    indexPath = os.path.join(envPath, JOB_INDEX)
+    jobs = None
+    if not os.path.exists(jsonPath) or (os.path.exists(indexPath) and
+                                        os.path.getmtime(indexPath) >= os.path.getmtime(jsonPath)):
+        jobs = JobAssignment.load(envPath)
+    if jobs is None:
+        with open(os.path.join(envPath, JOB_JSON), 'r') as f:
+            jobs = JobAssignment.fromDict(json.load(f))
+    return jobs
+
+
+def convertJson(envPath, jsonName=JOB_JSON):
+    """Write the binary job file next to an existing job_assign.json; returns the assignment."""
+    with open(os.path.join(envPath, jsonName), 'r') as f:
+        jobs = JobAssignment.fromDict(json.load(f))
+    jobs.save(envPath)
+    return jobs
@@ -1,12 +1,8 @@
 # Copyright (c) 2016 Tzutalin
 # Create by TzuTaLin <tzu.ta.lin@gmail.com>
 
-try:
-    from PyQt5.QtGui import QImage
-except ImportError:
-    from PyQt4.QtGui import QImage
-
 from base64 import b64encode, b64decode
+from libs.imageSize import ImageShapeProvider
 from libs.pascal_voc_io import PascalVocWriter
 from libs.pascal_voc_io import XML_EXT
 import os.path
@@ -21,6 +17,8 @@ class LabelFile(object):
     # It might be changed as window creates. By default, using XML ext
     # suffix = '.lif'
     suffix = XML_EXT
+    # Shared by every label file: frames of one folder have the same size.
+    shapeProvider = ImageShapeProvider()
 
     def __init__(self, filename=None):
         self.shapes = ()
@@ -29,17 +27,15 @@ class LabelFile(object):
         self.verified = False
 
     def savePascalVocFormat(self, filename, shapes, imagePath, imageData,
-                            lineColor=None, fillColor=None, databaseSrc=None):
+                            lineColor=None, fillColor=None, databaseSrc=None, imageShape=None):
         imgFolderPath = os.path.dirname(imagePath)
         imgFolderName = os.path.split(imgFolderPath)[-1]
         imgFileName = os.path.basename(imagePath)
         #imgFileNameWithoutExt = os.path.splitext(imgFileName)[0]
-        # Read from file path because self.imageData might be empty if saving to
-        # Pascal format
-        image = QImage()
-        image.load(imagePath)
-        imageShape = [image.height(), image.width(),
-                      1 if image.isGrayscale() else 3]
+        # Reuse the shape of the image in memory if the caller has it, otherwise
+        # read only the file header (cached per folder) instead of decoding it.
+        if imageShape is None:
+            imageShape = LabelFile.shapeProvider.shape(imagePath) or [0, 0, 3]
         writer = PascalVocWriter(imgFolderName, imgFileName,
                                  imageShape, localImgPath=imagePath)
         writer.verified = self.verified
@@ -55,6 +51,16 @@ class LabelFile(object):
         writer.save(targetFile=filename)
         return
 
+    def saveBundleFormat(self, bundle, shapes, imagePath, imageShape=None):
+        """Store the frame in a FolderBundle; the caller decides when bundle.save() runs."""
+        if imageShape is None:
+            imageShape = LabelFile.shapeProvider.shape(imagePath) or [0, 0, 3]
+        objects = []
+        for shape in shapes:
+            bndbox = LabelFile.convertPoints2BndBox(shape['points'])
+            objects.append((shape['label'],) + bndbox + (int(shape['difficult']),))
+        bundle.put(os.path.basename(imagePath), objects, imageShape, imagePath, self.verified)
+
     def toggleVerify(self):
         self.verified = not self.verified
 
@@ -81,3 +81,8 @@ def generateColorByText(text):
     g = int((hashCode / 65025)  % 255)
     b = int((hashCode / 16581375)  % 255)
     return QColor(r, g, b, 100)
+
+
+def indexMap(items):
+    """Map every item to its position, for O(1) lookups instead of list.index()."""
+    return dict((item, i) for i, item in enumerate(items))
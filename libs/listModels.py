@@ -0,0 +1,78 @@
+try:
+    from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+except ImportError:
+    from PyQt4.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+
+
+class PathListModel(QAbstractListModel):
+    """Read-only list model over a Python list of strings.
+
+    The view asks for rows as it paints them, so replacing a list of
+    100k paths costs one model reset instead of one item per path."""
+
+    def __init__(self, parent=None):
+        super(PathListModel, self).__init__(parent)
+        self.items = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.items):
+            return None
+        if role == Qt.DisplayRole:
+            return self.items[index.row()]
+        return None
+
+    def setItems(self, items):
+        self.beginResetModel()
+        self.items = items
+        self.endResetModel()
+
+    def clear(self):
+        self.setItems([])
+
+
+class CheckListModel(PathListModel):
+    """PathListModel whose rows carry a check box backed by a set.
+
+    A row is checked when key(item) is in the set. The set is shared with
+    the caller and toggled here when the user clicks a box, after which
+    checkToggled is emitted with the row's index."""
+    checkToggled = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super(CheckListModel, self).__init__(parent)
+        self.checked = set()
+        self.key = str
+
+    def flags(self, index):
+        flags = super(CheckListModel, self).flags(index)
+        if index.isValid():
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.CheckStateRole and index.isValid() and index.row() < len(self.items):
+            return Qt.Checked if self.key(self.items[index.row()]) in self.checked else Qt.Unchecked
+        return super(CheckListModel, self).data(index, role)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        key = self.key(self.items[index.row()])
+        if (key in self.checked) == (value == Qt.Checked):
+            # Nothing changes; emitting checkToggled would count the folder twice.
+            return True
+        if value == Qt.Checked:
+            self.checked.add(key)
+        else:
+            self.checked.discard(key)
+        self.dataChanged.emit(index, index)
+        self.checkToggled.emit(index)
+        return True
+
+    def setItems(self, items, checked=None, key=str):
+        self.checked = checked if checked is not None else set()
+        self.key = key
+        super(CheckListModel, self).setItems(items)
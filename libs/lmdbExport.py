@@ -0,0 +1,139 @@
+"""Stream the integer keys of one or more LMDB environments in numeric order.
+
+Two key layouts are understood:
+
+    ascii   decimal digits without leading zeros, as vanno_ver writes them.
+            LMDB orders keys bytewise ('10' < '2'), but within one key length
+            bytewise order is numeric, so keys are bucketed by length in a
+            single cursor pass and the buckets are emitted shortest first.
+    be32    4-byte big-endian unsigned ints; LMDB order already is numeric
+            and keys are streamed straight from the cursor.
+
+Several environments are merged with heapq.merge in one pass; the ascii
+bucketing of each environment runs in its own process.
+
+Environments are opened with LMDB's reader lock, so they may be exported
+while the annotation apps are still writing to them: every environment is
+read from one consistent snapshot. This needs write access to the lock file.
+"""
+import heapq
+import os
+import struct
+from array import array
+from multiprocessing import Pool
+
+import lmdb
+import numpy as np
+
+KEY_ASCII = 'ascii'
+KEY_BE32 = 'be32'
+FORMATS = ('txt', 'csv', 'npy')
+WRITE_BATCH = 65536
+
+
+def _open(path):
+    return lmdb.open(path, readonly=True, subdir=os.path.isdir(path))
+
+
+def loadAsciiKeys(path):
+    """Every ascii key of path as a numerically sorted int64 array, without sorting."""
+    buckets = {}
+    env = _open(path)
+    try:
+        with env.begin() as txn:
+            for key in txn.cursor().iternext(values=False):
+                if not key.isdigit() or (key[:1] == b'0' and len(key) > 1):
+                    raise ValueError('%s: key %r is not a canonical decimal id' % (path, key))
+                bucket = buckets.get(len(key))
+                if bucket is None:
+                    bucket = buckets[len(key)] = array('q')
+                bucket.append(int(key))
+    finally:
+        env.close()
+    if not buckets:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([np.frombuffer(buckets[length], dtype=np.int64) for length in sorted(buckets)])
+
+
+def iterBe32Keys(path):
+    env = _open(path)
+    try:
+        with env.begin() as txn:
+            for key in txn.cursor().iternext(values=False):
+                yield struct.unpack('>I', key)[0]
+    finally:
+        env.close()
+
+
+def iterKeys(path, keyFormat=KEY_ASCII):
+    if keyFormat == KEY_BE32:
+        return iterBe32Keys(path)
+    return iter(loadAsciiKeys(path).tolist())
+
+
+def _tagged(source, index):
+    for key in source:
+        yield key, index
+
+
+def mergeKeys(sources):
+    """Merge numerically sorted key iterators; yields (key, [indexes of the sources holding it])."""
+    tagged = [_tagged(source, i) for i, source in enumerate(sources)]
+    current, holders = None, []
+    for key, i in heapq.merge(*tagged):
+        if key != current:
+            if holders:
+                yield current, holders
+            current, holders = key, []
+        holders.append(i)
+    if holders:
+        yield current, holders
+
+
+def _sources(paths, keyFormat, processes):
+    if keyFormat == KEY_ASCII and len(paths) > 1 and processes != 1:
+        pool = Pool(min(processes or len(paths), len(paths)))
+        try:
+            return [iter(keys.tolist()) for keys in pool.map(loadAsciiKeys, paths)]
+        finally:
+            pool.close()
+            pool.join()
+    return [iterKeys(path, keyFormat) for path in paths]
+
+
+def exportKeys(paths, out, fmt='txt', keyFormat=KEY_ASCII, processes=None):
+    """Write the union of the keys of paths to out (a path or a text stream); returns the number written.
+
+    txt: one id per line. csv: 'folder,envs' with the names of the
+    environments holding the id, ';' separated. npy: int64 array."""
+    if fmt not in FORMATS:
+        raise ValueError('Unknown export format %r' % fmt)
+    names = [os.path.basename(os.path.normpath(path)) for path in paths]
+    merged = mergeKeys(_sources(paths, keyFormat, processes))
+
+    if fmt == 'npy':
+        keys = array('q', (key for key, _ in merged))
+        np.save(out, np.frombuffer(keys, dtype=np.int64) if keys else np.zeros(0, dtype=np.int64))
+        return len(keys)
+
+    stream = open(out, 'w') if isinstance(out, str) else out
+    count = 0
+    try:
+        if fmt == 'csv':
+            stream.write('folder,envs\n')
+        lines = []
+        for key, holders in merged:
+            if fmt == 'csv':
+                lines.append('%d,%s\n' % (key, ';'.join(names[i] for i in holders)))
+            else:
+                lines.append('%d\n' % key)
+            if len(lines) >= WRITE_BATCH:
+                stream.writelines(lines)
+                count += len(lines)
+                lines = []
+        stream.writelines(lines)
+        count += len(lines)
+    finally:
+        if stream is not out:
+            stream.close()
+    return count
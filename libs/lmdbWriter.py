@@ -0,0 +1,82 @@
+try:
+    from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+except ImportError:
+    from PyQt4.QtCore import QObject, QTimer, pyqtSignal
+
+from collections import OrderedDict
+import lmdb
+
+DEFAULT_MAP_SIZE_MB = 64
+DEFAULT_BATCH_INTERVAL = 2000
+DEFAULT_BATCH_SIZE = 256
+
+
+def openEnv(path, mapSizeMb=DEFAULT_MAP_SIZE_MB, writemap=False, metasync=False):
+    """Open an LMDB environment with the flags exposed in settings.
+
+    metasync=False skips the second fsync per commit; a crash can lose the
+    last commit but never corrupts the database. writemap writes through
+    the memory map instead of a copy, which is faster on local disks but
+    best left off on network mounts."""
+    return lmdb.open(path, map_size=mapSizeMb * 1024 * 1024, writemap=writemap, metasync=metasync)
+
+
+class LmdbWriteBatch(QObject):
+    """Buffers puts and deletes and commits them together in one write transaction.
+
+    A commit happens interval ms after the first buffered change, as soon
+    as threshold changes are waiting, or when flush() is called. Later
+    changes to the same key replace earlier ones. Readers that need to see
+    everything must flush() first."""
+    failed = pyqtSignal(str)
+
+    def __init__(self, env, interval=DEFAULT_BATCH_INTERVAL, threshold=DEFAULT_BATCH_SIZE, parent=None):
+        super(LmdbWriteBatch, self).__init__(parent)
+        self.env = env
+        self.interval = interval
+        self.threshold = threshold
+        self.commits = 0
+        self.lastError = None
+        self._pending = OrderedDict()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, key, value):
+        self._pending[key] = value
+        self._schedule()
+
+    def delete(self, key):
+        self._pending[key] = None
+        self._schedule()
+
+    def _schedule(self):
+        if len(self._pending) >= self.threshold:
+            self.flush()
+        elif not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Commit everything buffered; returns False (and keeps the changes) if the commit failed."""
+        self._timer.stop()
+        if not self._pending:
+            return True
+        try:
+            with self.env.begin(write=True) as txn:
+                for key, value in self._pending.items():
+                    if value is None:
+                        txn.delete(key)
+                    else:
+                        txn.put(key, value)
+        except lmdb.Error as e:
+            self.lastError = '%s' % e
+            self.failed.emit(self.lastError)
+            return False
+        self.lastError = None
+        self._pending = OrderedDict()
+        self.commits += 1
+        return True
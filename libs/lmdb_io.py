@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+import os
+import struct
+
+import lmdb
+
+from libs.bundle_io import FolderBundle, recordToVoc, vocToRecords
+
+ENCODE_METHOD = 'utf-8'
+DEFAULT_MAP_SIZE = 1 << 30
+STORE_NAME = 'annotations'
+
+# Value layout, little endian:
+#   header  version:B flags:B height:I width:I depth:B pathLength:H objectCount:H
+#   path    pathLength bytes of utf-8
+#   object  xmin:i ymin:i xmax:i ymax:i difficult:B labelLength:H, then the utf-8 label
+RECORD_VERSION = 1
+FLAG_VERIFIED = 0x01
+HEADER = struct.Struct('<BBIIBHH')
+OBJECT = struct.Struct('<iiiiBH')
+
+
+def makeKey(folder, frame):
+    return ('%s/%s' % (folder, frame)).encode(ENCODE_METHOD)
+
+
+def encodeRecord(record):
+    """Pack a bundle style record ({'objects', 'size', 'path', 'verified'}) into bytes."""
+    height, width, depth = record.get('size') or (0, 0, 3)
+    path = (record.get('path') or '').encode(ENCODE_METHOD)
+    objects = record['objects']
+    parts = [HEADER.pack(RECORD_VERSION, FLAG_VERIFIED if record.get('verified') else 0,
+                         height, width, depth, len(path), len(objects)), path]
+    for label, xmin, ymin, xmax, ymax, difficult in objects:
+        label = label.encode(ENCODE_METHOD)
+        parts.append(OBJECT.pack(xmin, ymin, xmax, ymax, int(difficult), len(label)))
+        parts.append(label)
+    return b''.join(parts)
+
+
+def decodeRecord(value, frame=None):
+    version, flags, height, width, depth, pathLength, count = HEADER.unpack_from(value, 0)
+    if version != RECORD_VERSION:
+        raise ValueError('Unsupported annotation record version %d' % version)
+    offset = HEADER.size
+    path = bytes(value[offset:offset + pathLength]).decode(ENCODE_METHOD) or None
+    offset += pathLength
+    objects = []
+    for _ in range(count):
+        xmin, ymin, xmax, ymax, difficult, labelLength = OBJECT.unpack_from(value, offset)
+        offset += OBJECT.size
+        label = bytes(value[offset:offset + labelLength]).decode(ENCODE_METHOD)
+        offset += labelLength
+        objects.append([label, xmin, ymin, xmax, ymax, difficult])
+    return {'frame': frame, 'path': path, 'size': [height, width, depth],
+            'verified': bool(flags & FLAG_VERIFIED), 'objects': objects}
+
+
+def existingKeys(txn, keys):
+    """The subset of keys present in the database, found by point lookups in key order.
+
+    Cost grows with len(keys), not with the number of entries in the database."""
+    keys = sorted(keys)
+    cursor = txn.cursor()
+    if hasattr(cursor, 'getmulti'):
+        return set(key for key, _ in cursor.getmulti(keys))
+    return set(key for key in keys if cursor.set_key(key))
+
+
+class LmdbAnnotationStore(object):
+    """Boxes of every folder in one LMDB environment, keyed by 'folder/frame'."""
+
+    def __init__(self, path, mapSize=DEFAULT_MAP_SIZE):
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.env = lmdb.open(path, map_size=mapSize)
+
+    def readFolder(self, folder):
+        """Raw values of every frame of folder, fetched in a single read transaction."""
+        prefix = makeKey(folder, '')
+        values = {}
+        with self.env.begin() as txn:
+            cursor = txn.cursor()
+            if cursor.set_range(prefix):
+                for key, value in cursor:
+                    if not key.startswith(prefix):
+                        break
+                    values[key[len(prefix):].decode(ENCODE_METHOD)] = value
+        return values
+
+    def write(self, items):
+        """Store (folder, frame, record) items in a single write transaction."""
+        with self.env.begin(write=True) as txn:
+            for folder, frame, record in items:
+                txn.put(makeKey(folder, frame), encodeRecord(record))
+
+    def folders(self):
+        """Folder names in key order, found with one seek per folder rather than a full walk."""
+        folders = []
+        with self.env.begin() as txn:
+            cursor = txn.cursor()
+            found = cursor.first()
+            while found:
+                key = cursor.key()
+                folder = key[:key.index(b'/')]
+                folders.append(folder.decode(ENCODE_METHOD))
+                # '0' is the byte after '/', so this jumps past every 'folder/...' key.
+                found = cursor.set_range(folder + b'0')
+        return folders
+
+    def close(self):
+        self.env.close()
+
+
+class LmdbFolder(FolderBundle):
+    """FolderBundle look-alike over the frames of one folder in an LmdbAnnotationStore.
+
+    load() reads the whole folder in one transaction and records are only
+    decoded when visited. put() keeps changes in memory; save() writes all
+    of them in one transaction, so a burst of saves coalesced by the
+    AnnotationSaver costs a single commit."""
+
+    def __init__(self, store, folder):
+        super(LmdbFolder, self).__init__(os.path.join(store.path, folder))
+        self.store = store
+        self.folder = folder
+        self._dirty = set()
+
+    def load(self):
+        values = self.store.readFolder(self.folder)
+        with self._lock:
+            self._offsets = values
+            self._records = {}
+            self._dirty = set()
+        return True
+
+    def record(self, frame):
+        with self._lock:
+            record = self._records.get(frame)
+            if record is None and frame in self._offsets:
+                record = decodeRecord(self._offsets[frame], frame)
+                self._records[frame] = record
+            return record
+
+    def put(self, frame, objects, imageSize=None, imagePath=None, verified=False):
+        super(LmdbFolder, self).put(frame, objects, imageSize, imagePath, verified)
+        with self._lock:
+            self._dirty.add(frame)
+
+    def save(self):
+        with self._lock:
+            items = [(self.folder, frame, self._records[frame]) for frame in self._dirty]
+            self._dirty = set()
+        try:
+            self.store.write(items)
+        except Exception:
+            with self._lock:
+                self._dirty.update(frame for _, frame, _ in items)
+            raise
+
+
+def lmdbToVoc(store, xmlRoot, folders=None):
+    """Regenerate Pascal VOC files under xmlRoot/<folder>/; returns the number of files written."""
+    written = 0
+    for folder in folders or store.folders():
+        xmlDir = os.path.join(xmlRoot, folder)
+        if not os.path.isdir(xmlDir):
+            os.makedirs(xmlDir)
+        for frame, value in sorted(store.readFolder(folder).items()):
+            recordToVoc(frame, decodeRecord(value, frame), xmlDir)
+            written += 1
+    return written
+
+
+def vocToLmdb(store, xmlRoot, folders=None):
+    """Import the Pascal VOC files of xmlRoot/<folder>/ into the store, one transaction per folder."""
+    folders = folders or sorted(d for d in os.listdir(xmlRoot) if os.path.isdir(os.path.join(xmlRoot, d)))
+    imported = 0
+    for folder in folders:
+        items = []
+        for frame, objects, size, imagePath, verified in vocToRecords(os.path.join(xmlRoot, folder)):
+            record = {'objects': objects, 'size': size, 'path': imagePath, 'verified': verified}
+            items.append((folder, frame, record))
+        store.write(items)
+        imported += len(items)
+    return imported
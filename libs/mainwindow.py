@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 import codecs
 import datetime
-import json
 import lmdb
 import os
 import os.path
@@ -27,19 +26,30 @@ except ImportError:
     from PyQt4.QtCore import *
 
 # Add internal libs
-from bisect import insort
 from collections import defaultdict
 from functools import partial
+from libs.annotationSaver import AnnotationSaver, AnnotationSaveJob, BundleSaveJob
+from libs.bundle_io import FolderBundle, BundleReader, BUNDLE_NAME
+from libs.lmdbWriter import LmdbWriteBatch, openEnv, DEFAULT_BATCH_INTERVAL, DEFAULT_BATCH_SIZE, DEFAULT_MAP_SIZE_MB
+from libs.lmdb_io import LmdbAnnotationStore, LmdbFolder, STORE_NAME
 from libs.canvas import Canvas
 from libs.colorDialog import ColorDialog
 from libs.constants import *
+from libs.datasetIndex import INDEX_NAME, loadIndex
+from libs.job_io import loadJobs
+from libs.dirManifest import DirManifestCache
+from libs.frameCache import FrameCache, DEFAULT_CACHE_MB, fileStamp, imageBytes, shapesBytes
+from libs.imageSize import imageShapeOf
+from libs.imagePrefetcher import ImagePrefetcher, DEFAULT_PREFETCH_AHEAD, DEFAULT_PREFETCH_BEHIND
 from libs.labelDialog import LabelDialog
 from libs.labelFile import LabelFile, LabelFileError
-from libs.lib import struct, newAction, newIcon, addActions, fmtShortcut, generateColorByText
+from libs.listModels import CheckListModel, PathListModel
+from libs.lib import struct, newAction, newIcon, addActions, fmtShortcut, generateColorByText, indexMap
 from libs.loginDialog import Login
 from libs.pascal_voc_io import PascalVocReader, XML_EXT
 from libs.settings import Settings
 from libs.shape import Shape, DEFAULT_LINE_COLOR, DEFAULT_FILL_COLOR
+from libs.shapeCore import ShapeCore
 from libs.toolBar import ToolBar
 from libs.ustr import ustr
 from libs.version import __version__
@@ -103,9 +113,16 @@ class MainWindow(QMainWindow, WindowMixin):
         self.defaultSaveDir = '../vanno_results/' + dataset     ###
         self.defaultSaveDir_folder= ''
         self.usingPascalVocFormat = True
+        # 'bundle' keeps all frames of a folder in one file instead of one XML per frame,
+        # 'lmdb' keeps them in one LMDB environment shared by all folders
+        self.annotationFormat = settings.get(SETTING_ANNOTATION_FORMAT, FORMAT_PASCALVOC)
+        self.folderBundle = None
+        self.annotationStore = None
         # For loading all image under a directory
         self.mImgList = []
         self.job_list_per_sess = []
+        # path -> position in mImgList, so that navigating does not scan the list
+        self.mImgIndex = {}
         self.dirname = None
         self.labelHist = []
         self.lastOpenDir = None
@@ -243,9 +260,15 @@ class MainWindow(QMainWindow, WindowMixin):
         self.dock.setObjectName(u'Labels')
         self.dock.setWidget(labelListContainer)
 
-        self.folderListWidget = QListWidget()
-        self.folderListWidget.itemDoubleClicked.connect(self.diritemDoubleClicked)
-        self.folderListWidget.itemChanged.connect(self.diritemChanged)
+        # Rows are created by the view as they are painted and laid out in batches,
+        # so switching sessions does not build one widget item per folder.
+        self.folderListModel = CheckListModel(self)
+        self.folderListModel.checkToggled.connect(self.diritemChanged)
+        self.folderListView = QListView()
+        self.folderListView.setUniformItemSizes(True)
+        self.folderListView.setLayoutMode(QListView.Batched)
+        self.folderListView.setModel(self.folderListModel)
+        self.folderListView.doubleClicked.connect(self.diritemDoubleClicked)
 
         folderlistLayout = QVBoxLayout()
         folderlistLayout.setContentsMargins(0, 0, 0, 0)
@@ -265,7 +288,7 @@ class MainWindow(QMainWindow, WindowMixin):
             self.saveButton.clicked.connect(self.saveButtonClicked)
             folderlistLayout.addWidget(self.saveButton)
 
-        folderlistLayout.addWidget(self.folderListWidget)
+        folderlistLayout.addWidget(self.folderListView)
         folderListContainer = QWidget()
         folderListContainer.setLayout(folderlistLayout)
         self.folderdock = QDockWidget(u'Folder List', self)
@@ -273,11 +296,15 @@ class MainWindow(QMainWindow, WindowMixin):
         self.folderdock.setWidget(folderListContainer)
 
         # Tzutalin 20160906 : Add file list and dock to move faster
-        self.fileListWidget = QListWidget()
-        self.fileListWidget.itemDoubleClicked.connect(self.fileitemDoubleClicked)
+        self.fileListModel = PathListModel(self)
+        self.fileListView = QListView()
+        self.fileListView.setUniformItemSizes(True)
+        self.fileListView.setLayoutMode(QListView.Batched)
+        self.fileListView.setModel(self.fileListModel)
+        self.fileListView.doubleClicked.connect(self.fileitemDoubleClicked)
         filelistLayout = QVBoxLayout()
         filelistLayout.setContentsMargins(0, 0, 0, 0)
-        filelistLayout.addWidget(self.fileListWidget)
+        filelistLayout.addWidget(self.fileListView)
         fileListContainer = QWidget()
         fileListContainer.setLayout(filelistLayout)
         self.filedock = QDockWidget(u'File List', self)
@@ -305,6 +332,25 @@ class MainWindow(QMainWindow, WindowMixin):
         self.canvas.selectionChanged.connect(self.shapeSelectionChanged)
         self.canvas.drawingPolygon.connect(self.toggleDrawingSensitive)
 
+        # Decode the neighbouring frames in the background while annotating.
+        self.prefetcher = ImagePrefetcher(self,
+                                          ahead=settings.get(SETTING_PREFETCH_AHEAD, DEFAULT_PREFETCH_AHEAD),
+                                          behind=settings.get(SETTING_PREFETCH_BEHIND, DEFAULT_PREFETCH_BEHIND))
+        # Decoded frames and parsed annotations, capped at 'cache/size' megabytes.
+        self.frameCache = FrameCache(settings.get(SETTING_CACHE_SIZE, DEFAULT_CACHE_MB) * 1024 * 1024)
+        # Frame lists of the folders already opened, valid while their directory mtime is unchanged.
+        self.manifests = DirManifestCache()
+        # Lean mode keeps a single decoded QImage per frame, shared by the cache,
+        # self.image and the canvas, instead of raw bytes + QImage + QPixmap.
+        self.leanImage = settings.get(SETTING_LEAN_IMAGE, True)
+        # Annotation files are written behind the UI, so navigation never waits on the mount.
+        self.annotationSaver = AnnotationSaver(self)
+        self.annotationSaver.saved.connect(self.annotationSaved)
+        self.annotationSaver.failed.connect(self.annotationSaveFailed)
+        self.annotationSaver.queueChanged.connect(self.updateSaveQueue)
+        # (annotation path, image path) of the last save queued, to tell whether a failure hit the open frame.
+        self.lastSave = None
+
         self.setCentralWidget(scroll)
         self.addDockWidget(Qt.RightDockWidgetArea, self.dock)
         # Tzutalin 20160906 : Add file list and dock to move faster
@@ -319,13 +365,21 @@ class MainWindow(QMainWindow, WindowMixin):
 
         ###
         self.n_folder = 0
-        self.checkList = []
+        # Finished folder ids of the current session; sorted only when written out.
+        self.checkList = set()
         self.start_img_file = ''
         self.end_img_file = ''
         ####
-        self.lmdb = lmdb.open(os.path.join(env_path, self.logged_id))
+        self.lmdb = openEnv(os.path.join(env_path, self.logged_id),
+                            settings.get(SETTING_LMDB_MAP_SIZE, DEFAULT_MAP_SIZE_MB),
+                            settings.get(SETTING_LMDB_WRITEMAP, False),
+                            settings.get(SETTING_LMDB_METASYNC, False))
+        # Verification toggles are committed together instead of one fsync'ed transaction per click.
+        self.lmdbBatch = LmdbWriteBatch(self.lmdb,
+                                        settings.get(SETTING_LMDB_BATCH_INTERVAL, DEFAULT_BATCH_INTERVAL),
+                                        settings.get(SETTING_LMDB_BATCH_SIZE, DEFAULT_BATCH_SIZE), self)
+        self.lmdbBatch.failed.connect(self.lmdbBatchFailed)
         self.checknum = 0
-        self.job_list_total = []
         self.job_list_total_no = 0
 
         # Actions
@@ -598,6 +652,8 @@ class MainWindow(QMainWindow, WindowMixin):
         # Display cursor coordinates at the right of status bar
         self.labelCoordinates = QLabel('')
         self.statusBar().addPermanentWidget(self.labelCoordinates)
+        self.labelSaveQueue = QLabel('')
+        self.statusBar().addPermanentWidget(self.labelSaveQueue)
 
         # Open Dir if default file
         if self.filePath and os.path.isdir(self.filePath):
@@ -641,6 +697,19 @@ class MainWindow(QMainWindow, WindowMixin):
         return not self.beginner()
 
 
+    def annotationSaveFailed(self, path, error):
+        self.status('Error saving %s: %s' % (path, error), 0)
+        if self.lastSave == (path, self.filePath):
+            # setClean() ran when the save was queued; the edits are only on screen now.
+            self.setDirty()
+
+
+    def annotationSaved(self, path):
+        # mtime granularity may hide a rewrite within the same second.
+        self.frameCache.discard(path)
+        self.status('Saved to %s' % path)
+
+
     def beginner(self):
         return self._beginner
 
@@ -726,6 +795,17 @@ class MainWindow(QMainWindow, WindowMixin):
 
         if not self.mayContinue():
             event.ignore()
+            return
+        # Nothing may be left in the write-behind queue when the window goes away.
+        self.annotationSaver.flush()
+        if self.annotationSaver.retry():
+            self.annotationSaver.flush()
+        if self.annotationSaver.failures and not self.saveFailedDialog():
+            event.ignore()
+            return
+        if not self.lmdbBatch.flush() and not self.lmdbFailedDialog():
+            event.ignore()
+            return
         settings = self.settings
         # If it loads images from dir, don't load it at the begining
         if self.dirname is None:
@@ -752,7 +832,21 @@ class MainWindow(QMainWindow, WindowMixin):
 
         settings[SETTING_AUTO_SAVE] = self.autoSaving.isChecked()
         settings[SETTING_SINGLE_CLASS] = self.singleClassMode.isChecked()
+        settings[SETTING_PREFETCH_AHEAD] = self.prefetcher.ahead
+        settings[SETTING_PREFETCH_BEHIND] = self.prefetcher.behind
+        settings[SETTING_CACHE_SIZE] = self.frameCache.maxBytes // (1024 * 1024)
+        settings[SETTING_LEAN_IMAGE] = self.leanImage
+        settings[SETTING_ANNOTATION_FORMAT] = self.annotationFormat
+        # The environment flags only take effect on the next start; store them so they can be edited.
+        settings[SETTING_LMDB_MAP_SIZE] = settings.get(SETTING_LMDB_MAP_SIZE, DEFAULT_MAP_SIZE_MB)
+        settings[SETTING_LMDB_WRITEMAP] = settings.get(SETTING_LMDB_WRITEMAP, False)
+        settings[SETTING_LMDB_METASYNC] = settings.get(SETTING_LMDB_METASYNC, False)
+        settings[SETTING_LMDB_BATCH_INTERVAL] = self.lmdbBatch.interval
+        settings[SETTING_LMDB_BATCH_SIZE] = self.lmdbBatch.threshold
         settings.save()
+        self.prefetcher.clear()
+        if self.annotationStore is not None:
+            self.annotationStore.close()
 
 
     def closeFile(self, _value=False):
@@ -804,18 +898,15 @@ class MainWindow(QMainWindow, WindowMixin):
                 action.setEnabled(False)
 
     ###
-    def diritemChanged(self, item=None):
+    def diritemChanged(self, index=None):
         # QMessageBox.warning(self, u'changed', msg, yes | no)
+        # folderListModel has already toggled the folder in self.checkList.
         self.savebtn_label.setText('Not saved')
-        if int(item.text()) in self.checkList:
-            self.checkList.remove(int(item.text()))
-        else:
-            insort(self.checkList, int(item.text()))
         self.savebtncnt_label.setText('{0}/{1}'.format(len(self.checkList), self.n_folder))
 
 
-    def diritemDoubleClicked(self, item=None):
-        currIndex = self.job_list_per_sess.index(ustr(item.text()))
+    def diritemDoubleClicked(self, index=None):
+        currIndex = index.row()
         if currIndex < len(self.job_list_per_sess):
             foldername = self.job_list_per_sess[currIndex]
             if foldername:
@@ -823,9 +914,19 @@ class MainWindow(QMainWindow, WindowMixin):
                 self.filePath = os.path.join(self.imageDirPath, foldername)
                 self.defaultSaveDir_folder = os.path.join(self.defaultSaveDir, foldername)
                 self.imageDirPath_folder = os.path.join(self.defaultSaveDir, foldername)
+                self.folderBundle = None
+                if self.annotationFormat == FORMAT_BUNDLE:
+                    # One read for the whole folder; frames are looked up in memory afterwards.
+                    self.folderBundle = FolderBundle(os.path.join(self.defaultSaveDir_folder, BUNDLE_NAME))
+                    self.folderBundle.load()
+                elif self.annotationFormat == FORMAT_LMDB:
+                    if self.annotationStore is None:
+                        self.annotationStore = LmdbAnnotationStore(os.path.join(env_path, STORE_NAME))
+                    self.folderBundle = LmdbFolder(self.annotationStore, foldername)
+                    self.folderBundle.load()
                 self.importDirImages(os.path.join(self.imageDirPath, foldername))
                 self.save_label.setText('Save DIR: ' + self.imageDirPath_folder)
-                self.fileListWidget.setFocus(True)
+                self.fileListView.setFocus(True)
 
                 filedir = os.path.join(results_path, foldername)
                 file = QFile(os.path.join(filedir, 'start_end.txt'))
@@ -868,8 +969,8 @@ class MainWindow(QMainWindow, WindowMixin):
 
 
     # Tzutalin 20160906 : Add file list and dock to move faster
-    def fileitemDoubleClicked(self, item=None):
-        currIndex = self.mImgList.index(ustr(item.text()))
+    def fileitemDoubleClicked(self, index=None):
+        currIndex = index.row()
         if currIndex < len(self.mImgList):
             filename = self.mImgList[currIndex]
             if filename:
@@ -883,13 +984,12 @@ class MainWindow(QMainWindow, WindowMixin):
         # self.lastOpenDir = dirpath
         self.dirname = dirpath
         self.filePath = None
-        self.fileListWidget.clear()
+        self.prefetcher.clear()
         self.mImgList = self.scanAllImages(dirpath)
+        self.mImgIndex = indexMap(self.mImgList)
+        self.fileListModel.setItems(self.mImgList)
         self.openNextImg()
-        self.fileListWidget.setFocus(True)
-        for imgPath in self.mImgList:
-            item = QListWidgetItem(imgPath)
-            self.fileListWidget.addItem(item)
+        self.fileListView.setFocus(True)
         self.edit_label.setText('Image DIR: ' + dirpath)
 
     ###
@@ -903,12 +1003,12 @@ class MainWindow(QMainWindow, WindowMixin):
         if not self.mayContinue():
             return
 
-        self.checkList = []
+        self.checkList = set()
         file = QFile(env_path + '/' + self.logged_id + '_' + str(int(self.curSessLineEdit.text())).zfill(2) + '.txt')
         if file.open(QFile.ReadOnly | QFile.Text):
             while not file.atEnd():
                 line = int(bytearray(file.readLine()).decode().strip())
-                insort(self.checkList, line)
+                self.checkList.add(line)
         file.close()
 
         if int(self.curSessLineEdit.text()) > self.sess_no or int(self.curSessLineEdit.text()) <= 0:
@@ -917,25 +1017,17 @@ class MainWindow(QMainWindow, WindowMixin):
         ###
         self.lastOpenDir = os.path.join(self.imageDirPath, str(self.curSession))
         self.curSession = int(self.curSessLineEdit.text())
-        self.folderListWidget.clear()
-        self.n_folder = 0
         self.job_list_per_sess = self.job_list[self.curSession - 1]
-        for folder_path in self.job_list_per_sess:
-            self.n_folder += 1
-            item = QListWidgetItem(folder_path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            if int(item.text()) in self.checkList:
-                item.setCheckState(Qt.Checked)
-            else:
-                item.setCheckState(Qt.Unchecked)
-            self.folderListWidget.addItem(item)
+        self.n_folder = len(self.job_list_per_sess)
+        self.folderListModel.setItems(self.job_list_per_sess, self.checkList, int)
 
         self.savebtncnt_label.setText('{0}/{1}'.format(len(self.checkList), self.n_folder))
         self.edit_label.setText('Image DIR: ' + self.imageDirPath)
 
 
     def importJobs(self):
-        return json.load(open(os.path.join(env_path, 'job_assign.json')))
+        # Memory-mapped job file when there is one; sessions are only read when opened.
+        return loadJobs(env_path)
 
 
     def labelItemChanged(self, item):
@@ -959,6 +1051,17 @@ class MainWindow(QMainWindow, WindowMixin):
             self.diffcButton.setChecked(shape.difficult)
 
 
+    def lmdbBatchFailed(self, error):
+        self.status('Error writing %s: %s' % (self.lmdb.path(), error), 0)
+
+
+    def lmdbFailedDialog(self):
+        yes, no = QMessageBox.Yes, QMessageBox.No
+        msg = u'%d check list changes could not be written to %s:\n%s\nClose anyway and lose them?' % (
+            len(self.lmdbBatch), self.lmdb.path(), self.lmdbBatch.lastError)
+        return yes == QMessageBox.warning(self, u'Attention', msg, yes | no)
+
+
     def loadFile(self, filePath=None):
         """Load the specified file, or the last opened file if None."""
         self.resetState()
@@ -972,10 +1075,11 @@ class MainWindow(QMainWindow, WindowMixin):
         unicodeFilePath = ustr(filePath)
         # Tzutalin 20160906 : Add file list and dock to move faster
         # Highlight the file item
-        if unicodeFilePath and self.fileListWidget.count() > 0:
-            index = self.mImgList.index(unicodeFilePath)
-            fileWidgetItem = self.fileListWidget.item(index)
-            fileWidgetItem.setSelected(True)
+        index = None
+        if unicodeFilePath and self.fileListModel.rowCount() > 0:
+            index = self.mImgIndex.get(unicodeFilePath)
+        if index is not None:
+            self.fileListView.setCurrentIndex(self.fileListModel.index(index))
 
         if unicodeFilePath and os.path.exists(unicodeFilePath):
             if LabelFile.isLabelFile(unicodeFilePath):
@@ -991,24 +1095,36 @@ class MainWindow(QMainWindow, WindowMixin):
                 self.imageData = self.labelFile.imageData
                 self.lineColor = QColor(*self.labelFile.lineColor)
                 self.fillColor = QColor(*self.labelFile.fillColor)
+                image = QImage.fromData(self.imageData)
+                if self.leanImage:
+                    self.imageData = None
             else:
                 # Load image:
-                # read data first and store for saving into label file.
-                self.imageData = read(unicodeFilePath, None)
+                # use the cached or prefetched frame if there is one, otherwise
+                # decode straight from the file without keeping its raw bytes.
+                stamp = fileStamp(unicodeFilePath)
+                image = self.frameCache.get(unicodeFilePath, stamp)
+                if image is None:
+                    image = self.prefetcher.take(unicodeFilePath)
+                if image is None:
+                    image = QImageReader(unicodeFilePath).read()
+                if not image.isNull():
+                    self.frameCache.put(unicodeFilePath, image, imageBytes(image), stamp)
                 self.labelFile = None
 
-            image = QImage.fromData(self.imageData)
             if image.isNull():
                 self.errorMessage(u'Error opening file',
                                   u"<p>Make sure <i>%s</i> is a valid image file." % unicodeFilePath)
                 self.status("Error reading %s" % unicodeFilePath)
                 return False
-            self.status("Loaded %s" % os.path.basename(unicodeFilePath))
+            self.status("Loaded %s (prefetch hits %d/%d)" % (os.path.basename(unicodeFilePath), self.prefetcher.hits,
+                                                             self.prefetcher.hits + self.prefetcher.misses))
             self.image = image
             self.filePath = unicodeFilePath
-            self.canvas.loadPixmap(QPixmap.fromImage(image))
+            self.canvas.loadPixmap(image if self.leanImage else QPixmap.fromImage(image))
+            self.prefetcher.prefetch(self.mImgList, index)
             if self.labelFile:
-                self.loadLabels(self.labelFile.shapes)
+                self.loadLabels([ShapeCore.fromReaderShape(shape) for shape in self.labelFile.shapes])
             self.setClean()
             self.canvas.setEnabled(True)
             self.adjustScale(initial=True)
@@ -1019,7 +1135,10 @@ class MainWindow(QMainWindow, WindowMixin):
 
             # Label xml file and show bound box according to its filename
             if self.usingPascalVocFormat is True:
-                if self.defaultSaveDir_folder is not None:
+                if self.folderBundle is not None:
+                    xmlPath = self.folderBundle.path
+                    bsuccess = self.loadBundleByFilename(self.filePath)
+                elif self.defaultSaveDir_folder is not None:
                     basename = os.path.basename(
                         os.path.splitext(self.filePath)[0]) + XML_EXT
                     xmlPath = os.path.join(self.defaultSaveDir_folder, basename)
@@ -1042,7 +1161,10 @@ class MainWindow(QMainWindow, WindowMixin):
                     self.diffcButton.setChecked(False)
 
                     if not self.canvas.verified:
-                        bsuccess = self.loadPascalXMLByFilename(xmlPath_old, False)
+                        if self.folderBundle is not None:
+                            bsuccess = self.loadBundleByFilename(self.old_Filepath, False)
+                        else:
+                            bsuccess = self.loadPascalXMLByFilename(xmlPath_old, False)
                         self.diffcButton.setChecked(False)
                         if bsuccess is True:
                             self.actions.save.setEnabled(True)
@@ -1064,25 +1186,40 @@ class MainWindow(QMainWindow, WindowMixin):
         return False
 
 
-    def loadLabels(self, shapes):
+    def loadBundleByFilename(self, imagePath, current=True):
+        if self.filePath is None or self.folderBundle is None:
+            return False
+        frame = os.path.basename(imagePath)
+        if frame not in self.folderBundle:
+            return False
+
+        reader = BundleReader(self.folderBundle, frame)
+        self.loadLabels(reader.cores)
+        if current:
+            self.canvas.verified = reader.verified
+        else:
+            self.canvas.verified = False
+
+        return True
+
+
+    def loadLabels(self, cores):
         s = []
-        for label, points, line_color, fill_color, difficult in shapes:
-            shape = Shape(label=label)
-            for x, y in points:
-                shape.addPoint(QPointF(x, y))
-            shape.difficult = difficult
+        for core in cores:
+            # No QPointF is built until the canvas paints or hit-tests the shape.
+            shape = Shape.fromCore(core)
             shape.close()
             s.append(shape)
 
-            if line_color:
-                shape.line_color = QColor(*line_color)
+            if core.lineColor:
+                shape.line_color = QColor(*core.lineColor)
             else:
-                shape.line_color = generateColorByText(label)
+                shape.line_color = generateColorByText(core.label)
 
-            if fill_color:
-                shape.fill_color = QColor(*fill_color)
+            if core.fillColor:
+                shape.fill_color = QColor(*core.fillColor)
             else:
-                shape.fill_color = generateColorByText(label)
+                shape.fill_color = generateColorByText(core.label)
 
             self.addLabel(shape)
 
@@ -1092,16 +1229,26 @@ class MainWindow(QMainWindow, WindowMixin):
     def loadPascalXMLByFilename(self, xmlPath, current=True):
         if self.filePath is None:
             return False
-        if os.path.isfile(xmlPath) is False:
+        # A save still in the write-behind queue is newer than the file on disk.
+        job = self.annotationSaver.pending(xmlPath)
+        stamp = fileStamp(xmlPath) if job is None else None
+        if job is None and stamp is None:
             return False
 
-        tVocParseReader = PascalVocReader(xmlPath)
-        shapes = tVocParseReader.getShapes()
-        self.loadLabels(shapes)
+        if job is not None:
+            annotation = (job.readerShapes(), job.verified)
+        else:
+            annotation = self.frameCache.get(xmlPath, stamp)
+        if annotation is None:
+            tVocParseReader = PascalVocReader(xmlPath)
+            annotation = (tVocParseReader.getShapes(), tVocParseReader.verified)
+            self.frameCache.put(xmlPath, annotation, shapesBytes(annotation[0]), stamp)
+        shapes, verified = annotation
+        self.loadLabels([ShapeCore.fromReaderShape(shape) for shape in shapes])
 
         # self.canvas.verified = tVocParseReader.verified
         if current:
-            self.canvas.verified = tVocParseReader.verified
+            self.canvas.verified = verified
         else:
             self.canvas.verified = False
 
@@ -1223,7 +1370,7 @@ class MainWindow(QMainWindow, WindowMixin):
         self.imageDirPath = ustr(QFileDialog.getExistingDirectory(self, '%s - Open Directory' % __appname__, defaultOpenDirPath,
                                                  QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks))
         if self.imageDirPath == '':
-            self.folderListWidget.clear()
+            self.folderListModel.clear()
         else:
             self.lastOpenDir = self.imageDirPath
             self.job_list_dict = self.importJobs()
@@ -1276,7 +1423,7 @@ class MainWindow(QMainWindow, WindowMixin):
         if self.filePath is None:
             filename = self.mImgList[0]
         else:
-            currIndex = self.mImgList.index(self.filePath)
+            currIndex = self.mImgIndex[self.filePath]
             if currIndex + 1 < len(self.mImgList):
                 filename = self.mImgList[currIndex + 1]
 
@@ -1315,7 +1462,7 @@ class MainWindow(QMainWindow, WindowMixin):
         if self.filePath is None:
             filename = self.mImgList[0]
         else:
-            currIndex = self.mImgList.index(self.filePath)
+            currIndex = self.mImgIndex[self.filePath]
             if currIndex - 1 >= 0:
                 filename = self.mImgList[currIndex - 1]
 
@@ -1406,8 +1553,7 @@ class MainWindow(QMainWindow, WindowMixin):
         self.savebtn_label.setText('')
         file = QFile(env_path + '/'+ self.logged_id + '_' + str(self.curSession).zfill(2) + '.txt')
         if file.open(QFile.WriteOnly | QFile.Text):
-            for check in self.checkList:
-                file.write(bytearray(str(check) + '\n', 'utf8'))
+            file.write(bytearray(''.join(str(check) + '\n' for check in sorted(self.checkList)), 'utf8'))
         file.close()
         file = QFile(env_path + '/' + 'Statistics.txt')
         if file.open(QFile.Append | QFile.Text):
@@ -1415,15 +1561,24 @@ class MainWindow(QMainWindow, WindowMixin):
         file.close()
 
 
+    def saveFailedDialog(self):
+        yes, no = QMessageBox.Yes, QMessageBox.No
+        failures = self.annotationSaver.failures
+        msg = u'%d annotation files could not be saved:\n%s\nClose anyway and lose these changes?' % (
+            len(failures), u'\n'.join(u'%s: %s' % item for item in list(failures.items())[:5]))
+        return yes == QMessageBox.warning(self, u'Attention', msg, yes | no)
+
+
     def saveFile(self, _value=False):
         if self.defaultSaveDir_folder is not None and len(ustr(self.defaultSaveDir_folder)):
             if self.filePath:
                 imgFileName = os.path.basename(self.filePath)
                 savedFileName = os.path.splitext(imgFileName)[0] + XML_EXT
                 savedPath = os.path.join(ustr(self.defaultSaveDir_folder), savedFileName)
+                if self.folderBundle is not None:
+                    savedPath = self.folderBundle.path
                 ###
-                if not os.path.exists(self.defaultSaveDir_folder):
-                    os.makedirs(self.defaultSaveDir_folder)
+                # The save job creates defaultSaveDir_folder on the worker thread.
                 self._saveFile(savedPath)
         else:
             imgFileDir = os.path.dirname(self.filePath)
@@ -1436,8 +1591,10 @@ class MainWindow(QMainWindow, WindowMixin):
 
     def _saveFile(self, annotationFilePath):
         if annotationFilePath and self.saveLabels(annotationFilePath):
+            self.lastSave = (ustr(annotationFilePath), self.filePath)
+            self.frameCache.discard(ustr(annotationFilePath))
             self.setClean()
-            self.statusBar().showMessage('Saved to  %s' % annotationFilePath)
+            self.statusBar().showMessage('Saving to  %s' % annotationFilePath)
             self.statusBar().show()
 
 
@@ -1471,17 +1628,23 @@ class MainWindow(QMainWindow, WindowMixin):
             return dict(label=s.label,
                         line_color=s.line_color.getRgb(),
                         fill_color=s.fill_color.getRgb(),
-                        points=[(p.x(), p.y()) for p in s.points],
+                        points=list(zip(s.coords[0::2], s.coords[1::2])),
                        # add chris
                         difficult = s.difficult)
 
         shapes = [format_shape(shape) for shape in self.canvas.shapes]
+        # The decoded frame already knows its size; a QPixmap cannot tell grayscale.
+        imageShape = imageShapeOf(self.image) if isinstance(self.image, QImage) and not self.image.isNull() else None
         # Can add differrent annotation formats here
         try:
-            if self.usingPascalVocFormat is True:
+            if self.folderBundle is not None:
+                # The bundle is updated now; the saver writes it out once per burst of saves.
+                self.labelFile.saveBundleFormat(self.folderBundle, shapes, self.filePath, imageShape)
+                self.annotationSaver.enqueue(annotationFilePath, BundleSaveJob(self.folderBundle))
+            elif self.usingPascalVocFormat is True:
                 # print ('Img: ' + self.filePath + ' -> Its xml: ' + annotationFilePath)
-                self.labelFile.savePascalVocFormat(annotationFilePath, shapes, self.filePath, self.imageData,
-                                                   self.lineColor.getRgb(), self.fillColor.getRgb())
+                self.annotationSaver.enqueue(annotationFilePath, AnnotationSaveJob(
+                    annotationFilePath, shapes, self.filePath, imageShape, self.labelFile.verified))
             else:
                 self.labelFile.save(annotationFilePath, shapes, self.filePath, self.imageData,
                                     self.lineColor.getRgb(), self.fillColor.getRgb())
@@ -1511,35 +1674,12 @@ class MainWindow(QMainWindow, WindowMixin):
 
 
     def scanAllImages(self, folderPath):
-        extensions = ['.jpeg', '.jpg', '.png', '.bmp']
-        images = []
-
-        for root, dirs, files in os.walk(folderPath):
-            for file in files:
-                if file.lower().endswith(tuple(extensions)):
-                    relativePath = os.path.join(root, file)
-                    path = ustr(os.path.abspath(relativePath))
-                    images.append(path)
-        images.sort(key=lambda x: x.lower())
-        return images
+        return [ustr(path) for path in self.manifests.images(folderPath)]
 
     ###
     def scanAllDirs(self, folderPath):
-
-        pre_dirs = os.listdir(folderPath)
-
-        # for root, dirs, files in os.walk(folderPath):
-        #     for file in files:
-        #         if file.lower().endswith(tuple(extensions)):
-        #             relativePath = os.path.join(root, file)
-        #             path = ustr(os.path.abspath(relativePath))
-        #             images.append(path)
-
-        # pre_dirs.sort(key=lambda x: x.lower())
-        pre_dirs_int = [int(dir) for dir in pre_dirs]
-        pre_dirs_int.sort()
-        pre_dirs = [ str(x) for x in pre_dirs_int]
-        return pre_dirs
+        # Read the folder list from the dataset index instead of listing the dataset root.
+        return loadIndex(folderPath, os.path.join(env_path, INDEX_NAME)).names
 
 
     def scrollRequest(self, delta, orientation):
@@ -1740,6 +1880,14 @@ class MainWindow(QMainWindow, WindowMixin):
             menu.addAction(action)
 
 
+    def updateSaveQueue(self, pending, failed):
+        text = 'Saving: %d' % pending if pending else ''
+        if failed:
+            text += ' Failed: %d' % failed
+        self.labelSaveQueue.setText(text.strip())
+        self.labelSaveQueue.setStyleSheet('color: red' if failed else '')
+
+
     def zoomRequest(self, delta):
         # get the current scrollbar positions
         # calculate the percentages ~ coordinates
@@ -1,10 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf8 -*-
+import os
 import sys
 from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, SubElement
 from lxml import etree
-import codecs
+from lxml.etree import Element, SubElement
+
+from libs.atomicFile import atomicWrite
 
 XML_EXT = '.xml'
 ENCODE_METHOD = 'utf-8'
@@ -22,14 +24,15 @@ class PascalVocWriter:
 
     def prettify(self, elem):
         """
-            Return a pretty-printed XML string for the Element.
+            Return a tab-indented XML string for the lxml Element.
         """
-        rough_string = ElementTree.tostring(elem, 'utf8')
-        root = etree.fromstring(rough_string)
-        return etree.tostring(root, pretty_print=True, encoding=ENCODE_METHOD).replace("  ".encode(), "\t".encode())
-        # minidom does not support UTF-8
-        '''reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="\t", encoding=ENCODE_METHOD)'''
+        # The tree is built with lxml, so it is indented in place and serialized
+        # once; no ElementTree -> bytes -> lxml round-trip and no byte replace.
+        if hasattr(etree, 'indent'):
+            etree.indent(elem, space='\t')
+            return etree.tostring(elem, pretty_print=True, encoding=ENCODE_METHOD)
+        # lxml < 4.5 has no indent(): pretty-print with spaces and swap them for tabs.
+        return etree.tostring(elem, pretty_print=True, encoding=ENCODE_METHOD).replace("  ".encode(), "\t".encode())
 
     def genXML(self):
         """
@@ -113,16 +116,10 @@ class PascalVocWriter:
     def save(self, targetFile=None):
         root = self.genXML()
         self.appendObjects(root)
-        out_file = None
         if targetFile is None:
-            out_file = codecs.open(
-                self.filename + XML_EXT, 'w', encoding=ENCODE_METHOD)
-        else:
-            out_file = codecs.open(targetFile, 'w', encoding=ENCODE_METHOD)
+            targetFile = self.filename + XML_EXT
 
-        prettifyResult = self.prettify(root)
-        out_file.write(prettifyResult.decode('utf8'))
-        out_file.close()
+        atomicWrite(targetFile, self.prettify(root))
 
 
 class PascalVocReader:
@@ -133,6 +130,9 @@ class PascalVocReader:
         self.shapes = []
         self.filepath = filepath
         self.verified = False
+        self.filename = None
+        self.imagePath = None
+        self.imgSize = None
         try:
             self.parseXML()
         except:
@@ -153,7 +153,14 @@ class PascalVocReader:
         assert self.filepath.endswith(XML_EXT), "Unsupport file format"
         parser = etree.XMLParser(encoding=ENCODE_METHOD)
         xmltree = ElementTree.parse(self.filepath, parser=parser).getroot()
-        filename = xmltree.find('filename').text
+        filename = xmltree.find('filename')
+        self.filename = filename.text if filename is not None else None
+        if xmltree.find('path') is not None:
+            self.imagePath = xmltree.find('path').text
+        size = xmltree.find('size')
+        if size is not None:
+            self.imgSize = [int(size.find('height').text), int(size.find('width').text),
+                            int(size.find('depth').text)]
         try:
             verified = xmltree.attrib['verified']
             if verified == 'yes':
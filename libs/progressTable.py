@@ -0,0 +1,295 @@
+"""Progress of every folder over all annotators, as one columnar table.
+
+Sources, all under the dataset's results and env directories:
+
+    job assignment         annotator and session of each folder (job_io.loadJobs)
+    <env>/<id>_<sess>.txt  folders marked finished with 'Save finished folders'
+    <env>/vdo_ver          LMDB of verified folders, keyed by folder id
+    <results>/<folder>/    start_end.txt and the annotation files (box count)
+    <env>/annotations      LMDB annotation store of the 'lmdb' annotation format
+"""
+import json
+import os
+from multiprocessing import Pool
+
+import lmdb
+
+from libs.atomicFile import atomicWrite
+from libs.bundle_io import BUNDLE_NAME, ENCODE_METHOD
+from libs.datasetIndex import folderKey, listFolders
+from libs.job_io import loadJobs
+from libs.lmdb_io import HEADER, STORE_NAME
+from libs.pascal_voc_io import XML_EXT
+
+TABLE_NAME = 'progress_table.json'
+TABLE_VERSION = 2
+VERIFY_ENV = 'vdo_ver'
+START_END = 'start_end.txt'
+SCAN_CHUNK = 256
+
+
+def frameNumber(path):
+    """Frame number of an image path as written to start_end.txt, -1 if there is none."""
+    stem = os.path.splitext(os.path.basename(path.strip()))[0]
+    return int(stem) if stem.isdigit() else -1
+
+
+def mtimeNs(path):
+    st = os.stat(path)
+    return getattr(st, 'st_mtime_ns', None) or int(st.st_mtime * 1e9)
+
+
+def folderStamp(path):
+    """[folder mtime, start_end.txt mtime] in ns, or None if the folder has no results.
+
+    Annotation files are replaced by rename, which touches the folder;
+    start_end.txt is rewritten in place, so it is stamped on its own."""
+    try:
+        folderMtime = mtimeNs(path)
+    except OSError:
+        return None
+    try:
+        startEndMtime = mtimeNs(os.path.join(path, START_END))
+    except OSError:
+        startEndMtime = 0
+    return [folderMtime, startEndMtime]
+
+
+def countBoxes(path, names):
+    """Objects in the annotation files of one results folder.
+
+    A folder converted to a bundle keeps its Pascal VOC files next to it, so
+    the bundle, when there is one, is the only source counted."""
+    if BUNDLE_NAME in names:
+        with open(os.path.join(path, BUNDLE_NAME), 'rb') as f:
+            return sum(len(json.loads(line.decode(ENCODE_METHOD))['objects']) for line in f if line.strip())
+    boxes = 0
+    for name in names:
+        if name.endswith(XML_EXT):
+            with open(os.path.join(path, name), 'rb') as f:
+                boxes += f.read().count(b'<object>')
+    return boxes
+
+
+def scanResultFolder(path):
+    """(stamp, start frame, end frame, box count) of one results folder."""
+    stamp = folderStamp(path)
+    if stamp is None:
+        return None, -1, -1, 0
+    start = end = -1
+    if stamp[1]:
+        with open(os.path.join(path, START_END), 'r') as f:
+            lines = f.read().split('\n')
+        start = frameNumber(lines[0]) if lines else -1
+        end = frameNumber(lines[1]) if len(lines) > 1 else -1
+    return stamp, start, end, countBoxes(path, os.listdir(path))
+
+
+def assignedFolders(envPath):
+    """{folder: (annotator, 1-based session)} of the job assignment, empty if there is none."""
+    try:
+        jobs = loadJobs(envPath)
+    except (IOError, OSError, ValueError):
+        return {}
+    assigned = {}
+    for sess in range(jobs.sessions):
+        for annotator in jobs.ids:
+            for folder in jobs.folders(annotator, sess):
+                assigned[folder] = (annotator, sess + 1)
+    return assigned
+
+
+def finishedFolders(envPath, annotators):
+    finished = set()
+    for annotator, sessions in annotators.items():
+        for sess in range(1, sessions + 1):
+            path = os.path.join(envPath, '%s_%s.txt' % (annotator, str(sess).zfill(2)))
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    finished.update(line.strip() for line in f if line.strip())
+    return finished
+
+
+def _openReadOnly(path):
+    # vanno_ver and the annotation store write to these while the table is
+    # built; only a locking reader keeps its pages from being reused under it.
+    return lmdb.open(path, readonly=True) if os.path.isdir(path) else None
+
+
+def verifiedFolders(envPath):
+    env = _openReadOnly(os.path.join(envPath, VERIFY_ENV))
+    if env is None:
+        return set()
+    try:
+        with env.begin() as txn:
+            return set(key.decode('ascii') for key in txn.cursor().iternext(values=False))
+    finally:
+        env.close()
+
+
+def storeStamp(envPath):
+    try:
+        return mtimeNs(os.path.join(envPath, STORE_NAME, 'data.mdb'))
+    except OSError:
+        return None
+
+
+def storeBoxes(envPath):
+    """{folder: object count} of the LMDB annotation store; only record headers are decoded."""
+    boxes = {}
+    env = _openReadOnly(os.path.join(envPath, STORE_NAME))
+    if env is None:
+        return boxes
+    try:
+        with env.begin() as txn:
+            for key, value in txn.cursor():
+                folder = key[:key.index(b'/')].decode(ENCODE_METHOD)
+                boxes[folder] = boxes.get(folder, 0) + HEADER.unpack_from(value, 0)[6]
+    finally:
+        env.close()
+    return boxes
+
+
+class ProgressTable(object):
+    """One row per folder that is assigned or has results, stored column-wise.
+
+    Columns: names, annotators ('' if unassigned), sessions (1-based, 0 if
+    unassigned), done, verified, starts and ends (frame numbers, -1 if
+    unset) and boxes. build() scans every results folder on a process pool;
+    refresh() re-reads the cheap sources (assignment, check files, vdo_ver)
+    and rescans only the folders whose stamp changed, and the annotation
+    store only if its file did."""
+
+    def __init__(self, resultsPath, envPath, stamps=None, storeStamp=None, storeBoxes=None, names=None,
+                 annotators=None, sessions=None, done=None, verified=None, starts=None, ends=None, boxes=None,
+                 fileBoxes=None):
+        self.resultsPath = resultsPath
+        self.envPath = envPath
+        self.stamps = stamps or []
+        self.storeStamp = storeStamp
+        self.storeBoxes = storeBoxes or {}
+        self.names = names or []
+        self.annotators = annotators or []
+        self.sessions = sessions or []
+        self.done = done or []
+        self.verified = verified or []
+        self.starts = starts or []
+        self.ends = ends or []
+        self.boxes = boxes or []
+        # Boxes in the folder's own annotation files, kept so refresh() can skip unchanged folders.
+        self.fileBoxes = fileBoxes or []
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def build(cls, resultsPath, envPath, processes=None):
+        table = cls(resultsPath, envPath)
+        table._update({}, processes)
+        return table
+
+    def refresh(self, processes=None):
+        """Bring the table up to date; returns the number of results folders rescanned."""
+        known = dict((name, (self.stamps[i], self.starts[i], self.ends[i], self.fileBoxes[i]))
+                     for i, name in enumerate(self.names))
+        return self._update(known, processes)
+
+    def _update(self, known, processes):
+        assigned = assignedFolders(self.envPath)
+        names = set(assigned)
+        if os.path.isdir(self.resultsPath):
+            names.update(listFolders(self.resultsPath))
+        names = sorted(names, key=folderKey)
+        paths = [os.path.join(self.resultsPath, name) for name in names]
+        pool = Pool(processes)
+        try:
+            stamps = pool.map(folderStamp, paths, SCAN_CHUNK)
+            changed = [i for i, stamp in enumerate(stamps)
+                       if stamp is not None and (names[i] not in known or known[names[i]][0] != stamp)]
+            scanned = pool.map(scanResultFolder, [paths[i] for i in changed], SCAN_CHUNK)
+        finally:
+            pool.close()
+            pool.join()
+        for i, stamp in enumerate(stamps):
+            if stamp is None:
+                known[names[i]] = (None, -1, -1, 0)
+        known.update((names[i], row) for i, row in zip(changed, scanned))
+
+        stamp = storeStamp(self.envPath)
+        if stamp != self.storeStamp:
+            self.storeStamp = stamp
+            self.storeBoxes = storeBoxes(self.envPath)
+
+        sessions = {}
+        for annotator, sess in assigned.values():
+            sessions[annotator] = max(sess, sessions.get(annotator, 0))
+        finished = finishedFolders(self.envPath, sessions)
+        verified = verifiedFolders(self.envPath)
+        rows = [known[name] for name in names]
+        self.names = names
+        self.annotators = [assigned.get(name, ('', 0))[0] for name in names]
+        self.sessions = [assigned.get(name, ('', 0))[1] for name in names]
+        self.done = [name in finished for name in names]
+        self.verified = [name in verified for name in names]
+        self.stamps = [row[0] for row in rows]
+        self.starts = [row[1] for row in rows]
+        self.ends = [row[2] for row in rows]
+        self.fileBoxes = [row[3] for row in rows]
+        # vocToLmdb leaves the Pascal VOC files behind: a folder in the store is counted from the store only.
+        self.boxes = [self.storeBoxes.get(name, row[3]) for name, row in zip(names, rows)]
+        return len(changed)
+
+    def summary(self):
+        """{annotator: {'folders', 'done', 'verified', 'boxes'}} for every annotator, '' for unassigned."""
+        totals = {}
+        for annotator, done, verified, boxes in zip(self.annotators, self.done, self.verified, self.boxes):
+            total = totals.get(annotator)
+            if total is None:
+                total = totals[annotator] = {'folders': 0, 'done': 0, 'verified': 0, 'boxes': 0}
+            total['folders'] += 1
+            total['done'] += done
+            total['verified'] += verified
+            total['boxes'] += boxes
+        return totals
+
+    def writeCsv(self, path):
+        with open(path, 'w') as f:
+            f.write('folder,annotator,session,done,verified,start,end,boxes\n')
+            f.writelines('%s,%s,%d,%d,%d,%d,%d,%d\n' % row for row in zip(
+                self.names, self.annotators, self.sessions, self.done, self.verified,
+                self.starts, self.ends, self.boxes))
+
+    @classmethod
+    def load(cls, path):
+        """Read a table file; returns None if it is missing or from another version."""
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('version') != TABLE_VERSION:
+            return None
+        return cls(data['results'], data['env'], data['stamps'], data['storeStamp'], data['storeBoxes'],
+                   data['names'], data['annotators'], data['sessions'], data['done'], data['verified'],
+                   data['starts'], data['ends'], data['boxes'], data['fileBoxes'])
+
+    def save(self, path):
+        data = {'version': TABLE_VERSION, 'results': self.resultsPath, 'env': self.envPath,
+                'stamps': self.stamps, 'storeStamp': self.storeStamp, 'storeBoxes': self.storeBoxes,
+                'names': self.names, 'annotators': self.annotators, 'sessions': self.sessions,
+                'done': self.done, 'verified': self.verified, 'starts': self.starts, 'ends': self.ends,
+                'boxes': self.boxes, 'fileBoxes': self.fileBoxes}
+        atomicWrite(path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def loadTable(resultsPath, envPath, path, refresh=False, processes=None):
+    """The saved table, built and saved first if there is none (or refreshed on request)."""
+    table = ProgressTable.load(path)
+    if table is None or os.path.abspath(table.resultsPath) != os.path.abspath(resultsPath) \
+            or os.path.abspath(table.envPath) != os.path.abspath(envPath):
+        table = ProgressTable.build(resultsPath, envPath, processes)
+        table.save(path)
+    elif refresh:
+        table.refresh(processes)
+        table.save(path)
+    return table
@@ -10,7 +10,7 @@ except ImportError:
     from PyQt4.QtCore import *
 
 from libs.lib import distance
-import sys
+from array import array
 
 DEFAULT_LINE_COLOR = QColor(0, 255, 0, 128)
 DEFAULT_FILL_COLOR = QColor(255, 0, 0, 128)
@@ -36,20 +36,25 @@ class Shape(object):
     point_type = P_ROUND
     point_size = 8
     scale = 1.0
+    _highlightSettings = {
+        NEAR_VERTEX: (4, P_ROUND),
+        MOVE_VERTEX: (1.5, P_SQUARE),
+    }
+    # Shared by every label; created on first paint, once a QGuiApplication exists.
+    label_font = None
+    label_ascent = 0.0
 
     def __init__(self, label=None, line_color=None,difficult = False):
         self.label = label
-        self.points = []
+        self._labelText = None
+        self._pen = None
+        self.coords = array('d')
         self.fill = False
         self.selected = False
         self.difficult = difficult
 
         self._highlightIndex = None
         self._highlightMode = self.NEAR_VERTEX
-        self._highlightSettings = {
-            self.NEAR_VERTEX: (4, self.P_ROUND),
-            self.MOVE_VERTEX: (1.5, self.P_SQUARE),
-        }
 
         self._closed = False
 
@@ -59,21 +64,69 @@ class Shape(object):
             # is used for drawing the pending line a different color.
             self.line_color = line_color
 
+    @classmethod
+    def fromCore(cls, core):
+        """A shape over the geometry of a ShapeCore; its QPointFs are only built once needed."""
+        shape = cls(label=core.label, difficult=core.difficult)
+        shape.coords = array('d', core.coords)
+        return shape
+
+    @property
+    def coords(self):
+        """Corner coordinates as a flat array('d'), x0, y0, x1, y1, ..."""
+        return self._coords
+
+    @coords.setter
+    def coords(self, coords):
+        self._coords = coords
+        self._points = None
+        self._invalidate()
+
+    @property
+    def points(self):
+        """The corners as QPointFs, built on first use and moved in place afterwards.
+
+        The list is a view: change the shape through its methods or by
+        assigning a new list, not by editing the list itself."""
+        if self._points is None:
+            coords = self._coords
+            self._points = [QPointF(coords[i], coords[i + 1]) for i in range(0, len(coords), 2)]
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        self.coords = array('d', [c for p in points for c in (p.x(), p.y())])
+
+    def _invalidate(self):
+        # Paths and bounds depend on the points only; the vertex path also on
+        # scale and highlight, which are part of its cache key instead.
+        self._path = None
+        self._linePath = None
+        self._vertexPath = None
+        self._bounds = None
+
     def close(self):
         self._closed = True
+        self._linePath = None
 
     def reachMaxPoints(self):
-        if len(self.points) >= 4:
+        if len(self) >= 4:
             return True
         return False
 
     def addPoint(self, point):
         if not self.reachMaxPoints():
-            self.points.append(point)
+            self._coords.extend((point.x(), point.y()))
+            self._points = None
+            self._invalidate()
 
     def popPoint(self):
-        if self.points:
-            return self.points.pop()
+        if len(self):
+            point = QPointF(self._coords[-2], self._coords[-1])
+            del self._coords[-2:]
+            self._points = None
+            self._invalidate()
+            return point
         return None
 
     def isClosed(self):
@@ -81,53 +134,87 @@ class Shape(object):
 
     def setOpen(self):
         self._closed = False
+        self._linePath = None
 
     def paint(self, painter):
-        if self.points:
+        if len(self):
             color = self.select_line_color if self.selected else self.line_color
-            pen = QPen(color)
             # Try using integer sizes for smoother drawing(?)
-            pen.setWidth(max(1, int(round(2.0 / self.scale))))
-            painter.setPen(pen)
+            width = max(1, int(round(2.0 / self.scale)))
+            if self._pen is None or self._pen[0] != (color.rgba(), width):
+                pen = QPen(color)
+                pen.setWidth(width)
+                self._pen = ((color.rgba(), width), pen)
+            painter.setPen(self._pen[1])
 
-            line_path = QPainterPath()
-            vrtx_path = QPainterPath()
-
-            line_path.moveTo(self.points[0])
-            # Uncommenting the following line will draw 2 paths
-            # for the 1st vertex, and make it non-filled, which
-            # may be desirable.
-            #self.drawVertex(vrtx_path, 0)
-
-            for i, p in enumerate(self.points):
-                line_path.lineTo(p)
-                self.drawVertex(vrtx_path, i)
-            if self.isClosed():
-                line_path.lineTo(self.points[0])
+            line_path = self.linePath()
+            vrtx_path = self.vertexPath()
 
             painter.drawPath(line_path)
             painter.drawPath(vrtx_path)
             painter.fillPath(vrtx_path, self.vertex_fill_color)
 
             # Draw text at the top-left
-            min_x = sys.maxsize
-            min_y = sys.maxsize
-            for point in self.points:
-                min_x = min(min_x, point.x())
-                min_y = min(min_y, point.y())
-            if min_x != sys.maxsize and min_y != sys.maxsize:
-                font = QFont()
-                font.setPointSize(8)
-                font.setBold(True)
-                painter.setFont(font)
-                if(self.label == None):
-                    self.label = ""
-                painter.drawText(min_x, min_y, self.label)
+            labelText = self.labelText()
+            painter.setFont(Shape.label_font)
+            # drawText() placed the baseline at the top-left corner; static text is placed by its top.
+            bounds = self.bounds()
+            painter.drawStaticText(QPointF(bounds[0], bounds[1] - Shape.label_ascent), labelText)
 
             if self.fill:
                 color = self.select_fill_color if self.selected else self.fill_color
                 painter.fillPath(line_path, color)
 
+    def labelText(self):
+        """The label as a QStaticText, laid out once per label."""
+        if(self.label == None):
+            self.label = ""
+        if Shape.label_font is None:
+            font = QFont()
+            font.setPointSize(8)
+            font.setBold(True)
+            Shape.label_font = font
+            Shape.label_ascent = QFontMetricsF(font).ascent()
+        if self._labelText is None or self._labelText[0] != self.label:
+            text = QStaticText(self.label)
+            text.prepare(QTransform(), Shape.label_font)
+            self._labelText = (self.label, text)
+        return self._labelText[1]
+
+    def paintRect(self):
+        """Everything paint() may draw on at the current scale, in image coordinates."""
+        min_x, min_y, max_x, max_y = self.bounds()
+        # The largest vertex marker (a highlighted round one) plus the pen.
+        m = self.point_size * 2.0 / self.scale + max(1, int(round(2.0 / self.scale)))
+        rect = QRectF(min_x - m, min_y - m, max_x - min_x + 2 * m, max_y - min_y + 2 * m)
+        size = self.labelText().size()
+        return rect.united(QRectF(min_x, min_y - Shape.label_ascent, size.width(), size.height()))
+
+    def linePath(self):
+        """Outline through every point, closed back to the first one once the shape is closed."""
+        if self._linePath is None:
+            line_path = QPainterPath()
+            line_path.moveTo(self.points[0])
+            for p in self.points:
+                line_path.lineTo(p)
+            if self.isClosed():
+                line_path.lineTo(self.points[0])
+            self._linePath = line_path
+        return self._linePath
+
+    def vertexPath(self):
+        key = (self.scale, self.point_size, self.point_type, self._highlightIndex, self._highlightMode)
+        if self._vertexPath is None or self._vertexPath[0] != key:
+            vrtx_path = QPainterPath()
+            # Uncommenting the following line will draw 2 paths
+            # for the 1st vertex, and make it non-filled, which
+            # may be desirable.
+            #self.drawVertex(vrtx_path, 0)
+            for i in range(len(self)):
+                self.drawVertex(vrtx_path, i)
+            self._vertexPath = (key, vrtx_path)
+        return self._vertexPath[1]
+
     def drawVertex(self, path, i):
         d = self.point_size / self.scale
         shape = self.point_type
@@ -156,19 +243,39 @@ class Shape(object):
         return self.makePath().contains(point)
 
     def makePath(self):
-        path = QPainterPath(self.points[0])
-        for p in self.points[1:]:
-            path.lineTo(p)
-        return path
+        """The open outline of the points; cached, so callers must not modify it."""
+        if self._path is None:
+            path = QPainterPath(self.points[0])
+            for p in self.points[1:]:
+                path.lineTo(p)
+            self._path = path
+        return self._path
+
+    def bounds(self):
+        """(min_x, min_y, max_x, max_y) of the points."""
+        if self._bounds is None:
+            xs, ys = self._coords[0::2], self._coords[1::2]
+            self._bounds = (min(xs), min(ys), max(xs), max(ys))
+        return self._bounds
 
     def boundingRect(self):
-        return self.makePath().boundingRect()
+        min_x, min_y, max_x, max_y = self.bounds()
+        return QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
 
     def moveBy(self, offset):
-        self.points = [p + offset for p in self.points]
+        dx, dy = offset.x(), offset.y()
+        coords = self._coords
+        for i in range(0, len(coords), 2):
+            coords[i] += dx
+            coords[i + 1] += dy
+        if self._points is not None:
+            for p in self._points:
+                p.setX(p.x() + dx)
+                p.setY(p.y() + dy)
+        self._invalidate()
 
     def moveVertexBy(self, i, offset):
-        self.points[i] = self.points[i] + offset
+        self[i] = QPointF(self._coords[2 * i] + offset.x(), self._coords[2 * i + 1] + offset.y())
 
     def highlightVertex(self, i, action):
         self._highlightIndex = i
@@ -179,7 +286,7 @@ class Shape(object):
 
     def copy(self):
         shape = Shape("%s" % self.label)
-        shape.points = [p for p in self.points]
+        shape.coords = array('d', self._coords)
         shape.fill = self.fill
         shape.selected = self.selected
         shape._closed = self._closed
@@ -191,10 +298,17 @@ class Shape(object):
         return shape
 
     def __len__(self):
-        return len(self.points)
+        return len(self._coords) // 2
 
     def __getitem__(self, key):
         return self.points[key]
 
     def __setitem__(self, key, value):
-        self.points[key] = value
+        if key < 0:
+            key += len(self)
+        self._coords[2 * key] = value.x()
+        self._coords[2 * key + 1] = value.y()
+        if self._points is not None:
+            # A copy, so the caller's point never moves along with the shape.
+            self._points[key] = QPointF(value)
+        self._invalidate()
@@ -0,0 +1,91 @@
+"""Qt-free shape geometry for bulk work on annotations.
+
+ShapeCore is one shape as __slots__ with its corners in a flat array('d')
+(x0, y0, x1, y1, ...); bundle and LMDB frames are loaded as ShapeCores, and
+Shape.fromCore() hands one to the canvas, which builds the Qt points when
+the shape is first painted or hit-tested. FrameShapes keeps every box of
+a frame in a single (n, 4, 2) float64 block for whole-folder conversions
+such as Pascal VOC to bundle or LMDB. Neither creates a QPointF.
+"""
+from array import array
+
+import numpy as np
+
+
+def boxCorners(xmin, ymin, xmax, ymax):
+    """Corners in the clockwise order Canvas and PascalVocReader use."""
+    return (xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax)
+
+
+class ShapeCore(object):
+    __slots__ = ('label', 'coords', 'difficult', 'lineColor', 'fillColor')
+
+    def __init__(self, label=None, coords=(), difficult=False, lineColor=None, fillColor=None):
+        self.label = label
+        self.coords = array('d', coords)
+        self.difficult = difficult
+        # (r, g, b, a) tuples as stored in the annotation files, or None for the label's colour.
+        self.lineColor = lineColor
+        self.fillColor = fillColor
+
+    def __len__(self):
+        return len(self.coords) // 2
+
+    def points(self):
+        coords = self.coords
+        return [(coords[i], coords[i + 1]) for i in range(0, len(coords), 2)]
+
+    def bounds(self):
+        """(xmin, ymin, xmax, ymax) of the corners."""
+        xs, ys = self.coords[0::2], self.coords[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def moveBy(self, dx, dy):
+        coords = self.coords
+        for i in range(0, len(coords), 2):
+            coords[i] += dx
+            coords[i + 1] += dy
+
+    @classmethod
+    def fromReaderShape(cls, shape):
+        """From a (label, points, line_color, fill_color, difficult) tuple of PascalVocReader/FolderBundle."""
+        label, points, lineColor, fillColor, difficult = shape
+        return cls(label, [c for point in points for c in point], difficult, lineColor, fillColor)
+
+    def toReaderShape(self):
+        return self.label, self.points(), self.lineColor, self.fillColor, self.difficult
+
+    @classmethod
+    def fromObject(cls, obj):
+        """From a [label, xmin, ymin, xmax, ymax, difficult] bundle/LMDB object."""
+        label, xmin, ymin, xmax, ymax, difficult = obj
+        return cls(label, boxCorners(xmin, ymin, xmax, ymax), bool(difficult))
+
+
+class FrameShapes(object):
+    """Every box of one frame: labels, difficult flags and one (n, 4, 2) corner block."""
+    __slots__ = ('labels', 'corners', 'difficult')
+
+    def __init__(self, labels, corners, difficult):
+        self.labels = labels
+        self.corners = corners
+        self.difficult = difficult
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def fromReaderShapes(cls, shapes):
+        corners = np.array([shape[1] for shape in shapes], dtype=np.float64).reshape(-1, 4, 2)
+        return cls([shape[0] for shape in shapes], corners,
+                   np.array([bool(shape[4]) for shape in shapes], dtype=bool))
+
+    def bounds(self):
+        """(n, 4) array of xmin, ymin, xmax, ymax."""
+        return np.concatenate([self.corners.min(axis=1), self.corners.max(axis=1)], axis=1)
+
+    def toObjects(self):
+        boxes = self.bounds().astype(np.int64).tolist()
+        return [[label] + box + [int(difficult)]
+                for label, box, difficult in zip(self.labels, boxes, self.difficult.tolist())]
+
@@ -0,0 +1,85 @@
+"""Uniform grid over shape bounds, for finding the shapes under the cursor."""
+import math
+
+GRID_CELL = 64.0
+
+
+class ShapeGrid(object):
+    """Shapes bucketed by the grid cells their bounds, grown by margin, overlap.
+
+    A lookup only looks at the cell under the point, so its cost depends on
+    how many shapes overlap there rather than on how many the frame has.
+    The margin is the vertex hit radius: a point within margin of a vertex
+    always falls inside the grown bounds. Shapes come back topmost first,
+    i.e. in reverse order of add(), which is the order Canvas paints them."""
+
+    def __init__(self, margin=0.0, cellSize=GRID_CELL):
+        self.margin = margin
+        self.cellSize = cellSize
+        self._cells = {}
+        self._entries = {}
+        self._order = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, shape):
+        return shape in self._entries
+
+    def clear(self):
+        self._cells = {}
+        self._entries = {}
+        self._order = 0
+
+    def rebuild(self, shapes):
+        self.clear()
+        for shape in shapes:
+            self.add(shape)
+
+    def add(self, shape):
+        """Index shape on top of every shape already indexed."""
+        self.discard(shape)
+        self._place(shape, self._order)
+        self._order += 1
+
+    def refresh(self, shape):
+        """Re-index an indexed shape after its points changed, keeping its stacking order."""
+        entry = self._entries.get(shape)
+        if entry is not None:
+            self.discard(shape)
+            self._place(shape, entry[0])
+
+    def discard(self, shape):
+        entry = self._entries.pop(shape, None)
+        if entry is not None:
+            for cell in entry[2]:
+                bucket = self._cells[cell]
+                bucket.remove(shape)
+                if not bucket:
+                    del self._cells[cell]
+
+    def _place(self, shape, order):
+        bounds = shape.bounds() if len(shape) else None
+        cells = []
+        if bounds is not None:
+            m, size = self.margin, self.cellSize
+            bounds = (bounds[0] - m, bounds[1] - m, bounds[2] + m, bounds[3] + m)
+            for cx in range(int(math.floor(bounds[0] / size)), int(math.floor(bounds[2] / size)) + 1):
+                for cy in range(int(math.floor(bounds[1] / size)), int(math.floor(bounds[3] / size)) + 1):
+                    self._cells.setdefault((cx, cy), []).append(shape)
+                    cells.append((cx, cy))
+        self._entries[shape] = (order, bounds, cells)
+
+    def at(self, point):
+        """Shapes whose grown bounds contain point, topmost first."""
+        x, y = point.x(), point.y()
+        bucket = self._cells.get((int(math.floor(x / self.cellSize)), int(math.floor(y / self.cellSize))))
+        if not bucket:
+            return []
+        hits = []
+        for shape in bucket:
+            order, (x0, y0, x1, y1), _ = self._entries[shape]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append((order, shape))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [shape for _, shape in hits]
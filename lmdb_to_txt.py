@@ -1,26 +1,40 @@
-import lmdb
+import argparse
 import os
+import sys
 
-from bisect import insort
+from libs.lmdbExport import FORMATS, KEY_ASCII, KEY_BE32, exportKeys
 
 dataset = 'jester'
 db_path = '../vanno_results/' + dataset + '_env/vdo_ver'
 # db_path = '/home/dokyoung/Desktop/server/vanno_results/jester_env/vdo_ver'
 
-db = lmdb.open(db_path) if os.path.exists(db_path) else None
-checkList_int = []
-checknum = 0
-if db is not None:
-    with db.begin() as txn:
-        cursor = txn.cursor()
-        for key, value in cursor:
-            insort(checkList_int, int(key.decode('ascii')))
-        checknum = len(checkList_int)
 
-    checkList = []
-    for i in range(checknum):
-        checkList.append(str(checkList_int[i]))
-    print(checkList)
-    print(checknum)
-else:
-    print('No lmdb file!')
\ No newline at end of file
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the folder ids stored as keys of one or more LMDB '
+                                                 'environments, merged and in numeric order. Each '
+                                                 'environment is read from one snapshot, so it may be '
+                                                 'exported while vanno_ver is writing to it.')
+    parser.add_argument('envs', nargs='*', default=[db_path], help='LMDB environments (default: %s)' % db_path)
+    parser.add_argument('-o', '--output', help="output file, '-' for stdout (default: verified.<format>)")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='txt')
+    parser.add_argument('--keys', choices=[KEY_ASCII, KEY_BE32], default=KEY_ASCII,
+                        help='key layout: decimal ascii as written by vanno_ver, or 4-byte big-endian ints')
+    parser.add_argument('--processes', type=int, help='worker processes for reading several environments')
+    args = parser.parse_args(argv)
+
+    envs = [env for env in args.envs if os.path.exists(env)]
+    if not envs:
+        print('No lmdb file!')
+        return 1
+    output = args.output or 'verified.' + args.format
+    if output == '-':
+        if args.format == 'npy':
+            parser.error('npy output needs a file')
+        output = sys.stdout
+    count = exportKeys(envs, output, args.format, args.keys, args.processes)
+    if output is not sys.stdout:
+        print('%d ids from %d environments written to %s' % (count, len(envs), output))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Cost of finding the shape under the cursor, linear scan vs ShapeGrid.
+
+Usage: python tests/bench_canvas_hover.py [--sizes 10,100,1000] [--moves N]
+
+Canvas.mouseMoveEvent used to test every visible shape on each move; it
+now asks the grid for the few shapes whose bounds cover the cursor.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+try:
+    from PyQt5.QtCore import QPointF
+except ImportError:
+    from PyQt4.QtCore import QPointF
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.shape import Shape
+from libs.shapeIndex import ShapeGrid
+
+EPSILON = 11.0
+
+
+def makeShapes(count, width, height, rng):
+    shapes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, width - 120), rng.uniform(0, height - 120)
+        w, h = rng.uniform(20, 120), rng.uniform(20, 120)
+        shape = Shape('hand')
+        for px, py in ((x, y), (x + w, y), (x + w, y + h), (x, y + h)):
+            shape.addPoint(QPointF(px, py))
+        shape.close()
+        shapes.append(shape)
+    return shapes
+
+
+def hit(shapes, pos):
+    for shape in shapes:
+        if shape.nearestVertex(pos, EPSILON) is not None or shape.containsPoint(pos):
+            return shape
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10,100,1000')
+    parser.add_argument('--moves', type=int, default=500)
+    args = parser.parse_args()
+
+    print('%8s %14s %14s %14s' % ('shapes', 'linear scan', 'grid', 'build grid'))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        rng = random.Random(size)
+        shapes = makeShapes(size, 1920, 1080, rng)
+        moves = [QPointF(rng.uniform(0, 1920), rng.uniform(0, 1080)) for _ in range(args.moves)]
+        grid = ShapeGrid(EPSILON)
+        grid.rebuild(shapes)
+
+        scan = min(timeit.repeat(lambda: [hit(reversed(shapes), pos) for pos in moves], number=1, repeat=3))
+        lookup = min(timeit.repeat(lambda: [hit(grid.at(pos), pos) for pos in moves], number=1, repeat=3))
+        build = min(timeit.repeat(lambda: grid.rebuild(shapes), number=1, repeat=3))
+        print('%8d %11.1f us %11.1f us %11.2f ms' % (size, scan / args.moves * 1e6,
+                                                     lookup / args.moves * 1e6, build * 1e3))
+
+
+if __name__ == '__main__':
+    main()
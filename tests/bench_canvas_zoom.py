@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Cost of a full canvas repaint at fit-window zoom, resampled per paint vs cached.
+
+Usage: python tests/bench_canvas_zoom.py [--width W] [--height H] [--scales 0.25,0.5,0.75] [--paints N]
+
+Canvas.paintEvent used to draw the full-size frame through the scaled
+painter on every paint; zoomed-out views now blit a copy resampled once
+per frame and zoom level.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    from PyQt4.QtGui import QApplication, QColor, QImage, QPainter, QPixmap
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.canvas import Canvas
+
+
+class ResamplingCanvas(Canvas):
+    """The canvas as it painted before the scaled copy existed."""
+
+    def scaledPixmap(self):
+        return None
+
+
+def makeFrame(width, height):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(90, 120, 60))
+    p = QPainter(image)
+    for x in range(0, width, 40):
+        p.fillRect(x, 0, 20, height, QColor(200, x % 256, 30))
+    p.end()
+    return image
+
+
+def paintTime(canvas, target, paints):
+    return min(timeit.repeat(lambda: canvas.render(target), number=paints, repeat=3)) / paints
+
+
+def buildTime(canvas):
+    def rebuild():
+        canvas._scaledKey = None
+        canvas.scaledPixmap()
+    return min(timeit.repeat(rebuild, number=1, repeat=3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--scales', default='0.25,0.5,0.75')
+    parser.add_argument('--paints', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    image = makeFrame(args.width, args.height)
+    frames = (('pixmap', QPixmap.fromImage(image)), ('image', image))
+    print('%-7s %6s %14s %14s %14s' % ('frame', 'scale', 'resampled', 'cached blit', 'build copy'))
+    for name, frame in frames:
+        for scale in [float(s) for s in args.scales.split(',')]:
+            times = []
+            for cls in (ResamplingCanvas, Canvas):
+                canvas = cls()
+                canvas.loadPixmap(frame)
+                canvas.scale = scale
+                canvas.resize(int(args.width * scale), int(args.height * scale))
+                target = QImage(canvas.size(), QImage.Format_ARGB32_Premultiplied)
+                times.append(paintTime(canvas, target, args.paints))
+            build = buildTime(canvas)
+            print('%-7s %6.2f %11.2f ms %11.2f ms %11.2f ms' % (name, scale, times[0] * 1e3,
+                                                                times[1] * 1e3, build * 1e3))
+
+
+if __name__ == '__main__':
+    main()
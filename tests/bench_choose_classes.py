@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Select 8 of 27 classes from a synthetic '<id>;<label>' CSV, old readlines loop vs classSelect.
+
+Usage: python tests/bench_choose_classes.py [--rows 10000000] [--files 2]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.classSelect import selectFoldersFromFiles
+
+LABELS = ['Swiping Left', 'Swiping Right', 'Swiping Down', 'Swiping Up', 'Pushing Hand Away',
+          'Pulling Hand In', 'Sliding Two Fingers Left', 'Sliding Two Fingers Right',
+          'Sliding Two Fingers Down', 'Sliding Two Fingers Up', 'Pushing Two Fingers Away',
+          'Pulling Two Fingers In', 'Rolling Hand Forward', 'Rolling Hand Backward', 'Turning Hand Clockwise',
+          'Turning Hand Counterclockwise', 'Zooming In With Full Hand', 'Zooming Out With Full Hand',
+          'Zooming In With Two Fingers', 'Zooming Out With Two Fingers', 'Thumb Up', 'Thumb Down',
+          'Shaking Hand', 'Stop Sign', 'Drumming Fingers', 'No gesture', 'Doing other things']
+SELECTED = [0, 1, 2, 3, 20, 21, 22, 24]
+
+
+def writeCsv(path, first, rows, rng):
+    with open(path, 'w') as f:
+        for start in range(0, rows, 1000000):
+            count = min(1000000, rows - start)
+            labels = rng.randint(0, len(LABELS), size=count)
+            f.write(''.join('%d;%s\n' % (first + start + i, LABELS[l]) for i, l in enumerate(labels.tolist())))
+
+
+def legacySelect(paths, labelsSelected):
+    dirs = []
+    for path in paths:
+        with open(path, 'r') as f:
+            lines = f.readlines()
+            for line in lines:
+                line = line.replace('\n', '')
+                if line.split(';')[1] in labelsSelected:
+                    dirs.append(int(line.split(';')[0]))
+    dirs.sort()
+    return dirs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000000)
+    parser.add_argument('--files', type=int, default=2)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        rng = np.random.RandomState(0)
+        perFile = args.rows // args.files
+        paths = [os.path.join(folder, 'part%d.csv' % i) for i in range(args.files)]
+        for i, path in enumerate(paths):
+            writeCsv(path, i * perFile + 1, perFile, rng)
+        selected = [LABELS[i] for i in SELECTED]
+
+        start = time.time()
+        legacy = legacySelect(paths, selected)
+        legacyTime = time.time() - start
+        start = time.time()
+        folders = selectFoldersFromFiles(paths, set(selected))
+        newTime = time.time() - start
+
+        assert folders.tolist() == legacy
+        print('%d rows in %d files, %d selected' % (perFile * args.files, args.files, len(legacy)))
+        print('readlines loop: %6.2f s' % legacyTime)
+        print('classSelect:    %6.2f s' % newTime)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
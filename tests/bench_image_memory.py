@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Peak RSS per loaded frame, legacy (bytes + QImage + QPixmap) vs lean (one QImage).
+
+Usage: python tests/bench_image_memory.py [--frames N] [--width W] [--height H]
+
+Each mode runs in its own process so that ru_maxrss is not shared.
+"""
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PyQt5.QtGui import QColor, QImage, QImageReader, QPixmap
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    from PyQt4.QtGui import QApplication, QColor, QImage, QImageReader, QPixmap
+
+
+def peakRssKb():
+    # Linux reports kilobytes, macOS bytes.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def makeFrames(folder, count, width, height):
+    for i in range(count):
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(QColor((i * 37) % 256, (i * 11) % 256, 128))
+        image.save(os.path.join(folder, '%05d.jpg' % (i + 1)))
+
+
+def loadFrames(folder, mode):
+    app = QApplication([])
+    held = []
+    baseline = peakRssKb()
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if mode == 'legacy':
+            with open(path, 'rb') as f:
+                data = f.read()
+            image = QImage.fromData(data)
+            held.append((data, image, QPixmap.fromImage(image)))
+        else:
+            image = QImageReader(path).read()
+            held.append((image,))
+    return (peakRssKb() - baseline) / float(len(held))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--mode', choices=['legacy', 'lean'])
+    parser.add_argument('--folder')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(loadFrames(args.folder, args.mode))
+        return
+
+    app = QApplication([])
+    folder = tempfile.mkdtemp()
+    try:
+        makeFrames(folder, args.frames, args.width, args.height)
+        for mode in ('legacy', 'lean'):
+            out = subprocess.check_output([sys.executable, __file__, '--mode', mode, '--folder', folder])
+            print('%-6s peak RSS per frame: %8.1f KiB' % (mode, float(out.decode().strip())))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""Time to assign N folders with random frame counts to annotators.
+
+Usage: python tests/bench_job_assign.py [--folders 2000000] [--ids 12]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.jobAssign import assignJobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--folders', type=int, default=2000000)
+    parser.add_argument('--ids', type=int, default=12)
+    args = parser.parse_args()
+
+    names = [str(i) for i in range(1, args.folders + 1)]
+    frames = np.random.RandomState(0).randint(12, 70, size=args.folders)
+    ids = ['vdo_data%d' % (i + 1) for i in range(args.ids)]
+    weights = dict((i, 1.0 + (k % 3) * 0.5) for k, i in enumerate(ids))
+
+    start = time.time()
+    assignment = assignJobs(names, ids, frames, weights)
+    elapsed = time.time() - start
+
+    sessions = len(assignment[ids[0]])
+    print('%d folders, %d annotators, %d sessions: %.2f s' % (args.folders, args.ids, sessions, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Time to fill the folder list for one session, QListWidget items vs CheckListModel.
+
+Usage: python tests/bench_list_models.py [--sizes 1600,5000,20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem
+except ImportError:
+    from PyQt4.QtCore import Qt
+    from PyQt4.QtGui import QApplication, QListView, QListWidget, QListWidgetItem
+
+from libs.listModels import CheckListModel
+
+
+def fillWidget(widget, folders, checked):
+    widget.clear()
+    for folder in folders:
+        item = QListWidgetItem(folder)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked if int(folder) in checked else Qt.Unchecked)
+        widget.addItem(item)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1600,5000,20000')
+    args = parser.parse_args()
+
+    app = QApplication([])
+    widget = QListWidget()
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched)
+    model = CheckListModel()
+    view.setModel(model)
+    widget.show()
+    view.show()
+
+    print('%8s %14s %14s' % ('folders', 'QListWidget', 'model'))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        folders = [str(i) for i in range(1, size + 1)]
+        checked = set(range(1, size + 1, 3))
+        start = time.time()
+        fillWidget(widget, folders, checked)
+        app.processEvents()
+        filled = time.time()
+        model.setItems(folders, checked, int)
+        app.processEvents()
+        done = time.time()
+        print('%8d %11.1f ms %11.1f ms' % (size, (filled - start) * 1e3, (done - filled) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
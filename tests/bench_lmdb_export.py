@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Export the keys of verification environments: legacy insort loop vs libs.lmdbExport.
+
+Usage: python tests/bench_lmdb_export.py [--keys N] [--envs E]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from bisect import insort
+
+import lmdb
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.lmdbExport import exportKeys
+
+
+def makeEnvs(folder, keys, envs):
+    paths = []
+    ids = list(range(1, keys * 2))
+    for i in range(envs):
+        path = os.path.join(folder, 'vdo_%d' % i)
+        env = lmdb.open(path, map_size=1 << 30)
+        with env.begin(write=True) as txn:
+            for key in random.sample(ids, keys):
+                txn.put(str(key).encode('ascii'), b'1')
+        env.close()
+        paths.append(path)
+    return paths
+
+
+def legacy(paths, out):
+    checkList_int = []
+    for path in paths:
+        env = lmdb.open(path, readonly=True, lock=False)
+        with env.begin() as txn:
+            for key, _ in txn.cursor():
+                insort(checkList_int, int(key.decode('ascii')))
+        env.close()
+    checkList = [str(i) for i in checkList_int]
+    with open(out, 'w') as f:
+        print(checkList, file=f)
+        print(len(checkList), file=f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--envs', type=int, default=3)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        paths = makeEnvs(folder, args.keys, args.envs)
+        out = os.path.join(folder, 'out.txt')
+        start = time.time()
+        legacy(paths, out)
+        print('legacy   %7.3f s' % (time.time() - start))
+        for processes in (1, None):
+            start = time.time()
+            count = exportKeys(paths, out, 'txt', processes=processes)
+            print('export   %7.3f s  processes=%s  %d ids' % (time.time() - start, processes or 'auto', count))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""Cost of finding the current frame when stepping through a list, list.index vs indexMap.
+
+Usage: python tests/bench_navigation.py [--sizes 1000,10000,100000] [--steps N]
+
+openNextImg/openPrevImg/fileitemDoubleClicked/loadFile and
+diritemDoubleClicked used to call list.index() on every keypress; they
+now look the position up in a map built once per folder or session.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.lib import indexMap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+
+    print('%8s %14s %14s %14s' % ('entries', 'list.index', 'indexMap', 'build map'))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        paths = ['/data/jester/%d/%05d.jpg' % (i // 40, i % 40) for i in range(size)]
+        rng = random.Random(size)
+        visits = [paths[rng.randrange(size)] for _ in range(args.steps)]
+        index = indexMap(paths)
+
+        scan = min(timeit.repeat(lambda: [paths.index(p) for p in visits], number=1, repeat=3))
+        lookup = min(timeit.repeat(lambda: [index[p] for p in visits], number=1, repeat=3))
+        build = min(timeit.repeat(lambda: indexMap(paths), number=1, repeat=3))
+        print('%8d %11.2f us %11.3f us %11.2f ms' % (size, scan / args.steps * 1e6,
+                                                     lookup / args.steps * 1e6, build * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Saves per second of PascalVocWriter against the former round-trip writer.
+
+Usage: python tests/bench_pascal_voc_writer.py [--saves N] [--boxes K]
+"""
+import argparse
+import codecs
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from xml.etree import ElementTree
+
+dir_name = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(dir_name, '..'))
+sys.path.insert(0, os.path.join(dir_name, '..', 'libs'))
+import pascal_voc_io
+from lxml import etree
+from pascal_voc_io import PascalVocWriter, ENCODE_METHOD
+
+
+def makeWriter(boxes):
+    writer = PascalVocWriter('12345', '00001.jpg', (100, 176, 3), localImgPath='/data/12345/00001.jpg')
+    for i in range(boxes):
+        writer.addBndBox(10 + i, 20, 60 + i, 90, 'hand', 0)
+    return writer
+
+
+def legacySave(writer, targetFile):
+    """The writer as it was: ElementTree tree -> bytes -> lxml -> pretty bytes -> str -> codecs."""
+    lxmlElement, lxmlSubElement = pascal_voc_io.Element, pascal_voc_io.SubElement
+    pascal_voc_io.Element, pascal_voc_io.SubElement = ElementTree.Element, ElementTree.SubElement
+    try:
+        root = writer.genXML()
+        writer.appendObjects(root)
+    finally:
+        pascal_voc_io.Element, pascal_voc_io.SubElement = lxmlElement, lxmlSubElement
+    rough_string = ElementTree.tostring(root, 'utf8')
+    result = etree.tostring(etree.fromstring(rough_string), pretty_print=True,
+                            encoding=ENCODE_METHOD).replace("  ".encode(), "\t".encode())
+    out_file = codecs.open(targetFile, 'w', encoding=ENCODE_METHOD)
+    out_file.write(result.decode('utf8'))
+    out_file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=2000)
+    parser.add_argument('--boxes', type=int, default=2)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        legacyPath = os.path.join(folder, 'legacy.xml')
+        currentPath = os.path.join(folder, 'current.xml')
+        legacy = timeit.timeit(lambda: legacySave(makeWriter(args.boxes), legacyPath), number=args.saves)
+        current = timeit.timeit(lambda: makeWriter(args.boxes).save(currentPath), number=args.saves)
+        with open(legacyPath, 'rb') as a, open(currentPath, 'rb') as b:
+            identical = a.read() == b.read()
+        print('legacy : %8.0f saves/s' % (args.saves / legacy))
+        print('current: %8.0f saves/s (%.2fx)' % (args.saves / current, legacy / current))
+        print('byte-identical output: %s' % identical)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
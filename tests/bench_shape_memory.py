@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Memory and build time of 10k boxes: Qt shapes, lazy shapes, ShapeCore and FrameShapes.
+
+Usage: python tests/bench_shape_memory.py [--shapes N]
+
+    qt     Shape with its QPointFs built, as loadLabels used to produce
+    lazy   Shape.fromCore(), QPointFs not built until painted
+    core   ShapeCore per box
+    frame  FrameShapes, one (n, 4, 2) block
+
+Each mode runs in its own process so that ru_maxrss is not shared.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MODES = ('qt', 'lazy', 'core', 'frame')
+
+
+def peakRssKb():
+    # Linux reports kilobytes, macOS bytes.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def readerShapes(count):
+    shapes = []
+    for i in range(count):
+        x, y = i % 1000, i // 1000
+        shapes.append(('hand', [(x, y), (x + 40, y), (x + 40, y + 60), (x, y + 60)], None, None, False))
+    return shapes
+
+
+def build(mode, shapes):
+    from libs.shapeCore import FrameShapes, ShapeCore
+    if mode == 'frame':
+        return FrameShapes.fromReaderShapes(shapes)
+    if mode == 'core':
+        return [ShapeCore.fromReaderShape(shape) for shape in shapes]
+    from libs.shape import Shape
+    built = []
+    for shape in shapes:
+        s = Shape.fromCore(ShapeCore.fromReaderShape(shape))
+        s.close()
+        if mode == 'qt':
+            s.points
+        built.append(s)
+    return built
+
+
+def run(mode, count):
+    shapes = readerShapes(count)
+    # Import everything first so that module memory is not counted.
+    from libs import shape, shapeCore
+    baseline = peakRssKb()
+    start = time.time()
+    held = build(mode, shapes)
+    elapsed = time.time() - start
+    return (peakRssKb() - baseline) * 1024.0 / count, elapsed * 1e3, len(held)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shapes', type=int, default=10000)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        print('%f %f' % run(args.mode, args.shapes)[:2])
+        return
+
+    print('%-6s %14s %12s' % ('mode', 'bytes/shape', 'build'))
+    for mode in MODES:
+        out = subprocess.check_output([sys.executable, __file__, '--mode', mode, '--shapes', str(args.shapes)])
+        perShape, ms = [float(v) for v in out.decode().split()]
+        print('%-6s %14.0f %9.1f ms' % (mode, perShape, ms))
+
+
+if __name__ == '__main__':
+    main()
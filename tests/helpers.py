@@ -0,0 +1,25 @@
+"""Fixtures shared by the Qt tests."""
+import os
+import sys
+
+try:
+    from PyQt5.QtCore import QPointF
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    from PyQt4.QtCore import QPointF
+    from PyQt4.QtGui import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from libs.shape import Shape
+
+# A full QApplication, so that every test painting text can share it in one run.
+app = QApplication.instance() or QApplication([])
+
+
+def makeBox(x, y, w, h, label='hand'):
+    """A closed rectangular Shape with corners in canvas order."""
+    shape = Shape(label)
+    for px, py in ((x, y), (x + w, y), (x + w, y + h), (x, y + h)):
+        shape.addPoint(QPointF(px, py))
+    shape.close()
+    return shape
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.annotationSaver import AnnotationSaver
+
+
+class FlakyJob(object):
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.runs = 0
+
+    def run(self):
+        self.runs += 1
+        if self.runs <= self.failures:
+            raise IOError('disk full')
+
+
+class TestAnnotationSaver(unittest.TestCase):
+
+    def test_failed_job_kept_until_retried(self):
+        saver = AnnotationSaver()
+        job = FlakyJob(1)
+        saver.enqueue('a.xml', job)
+        saver.flush()
+        # Known right after flush(), before any queued signal is delivered.
+        self.assertEqual(list(saver.failures), ['a.xml'])
+
+        self.assertEqual(saver.retry(), 1)
+        saver.flush()
+        self.assertEqual(job.runs, 2)
+        self.assertFalse(saver.failures)
+        self.assertEqual(saver.retry(), 0)
+
+    def test_newer_save_clears_failure(self):
+        saver = AnnotationSaver()
+        saver.enqueue('a.xml', FlakyJob(1))
+        saver.flush()
+        saver.enqueue('a.xml', FlakyJob(0))
+        saver.flush()
+        self.assertFalse(saver.failures)
+        self.assertEqual(saver.retry(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.atomicFile import atomicWrite
+
+
+class TestAtomicWrite(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'nested', 'out.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_write_and_replace(self):
+        atomicWrite(self.path, b'first')
+        atomicWrite(self.path, b'second')
+        self.assertEqual(self.read(), b'second')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['out.json'])
+
+    def test_failed_write_keeps_old_file(self):
+        atomicWrite(self.path, b'first')
+        self.assertRaises(TypeError, atomicWrite, self.path, u'not bytes')
+        self.assertEqual(self.read(), b'first')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['out.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.bundle_io import FolderBundle, BUNDLE_NAME, bundleToVoc, vocToBundle
+from libs.pascal_voc_io import PascalVocReader
+
+
+class TestFolderBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, BUNDLE_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_roundtrip(self):
+        bundle = FolderBundle(self.path)
+        bundle.put('00002.jpg', [('hand', 10, 20, 30, 40, 0)], [100, 176, 3], '/data/1/00002.jpg', True)
+        bundle.put(u'얼굴.jpg', [('face', 1, 2, 3, 4, 1)], [100, 176, 3])
+        bundle.save()
+
+        loaded = FolderBundle(self.path)
+        self.assertTrue(loaded.load())
+        self.assertEqual(len(loaded), 2)
+        self.assertIn(u'얼굴.jpg', loaded)
+        self.assertTrue(loaded.isVerified('00002.jpg'))
+        self.assertEqual(loaded.getShapes('00002.jpg'),
+                         [('hand', [(10, 20), (30, 20), (30, 40), (10, 40)], None, None, False)])
+        self.assertIsNone(loaded.getShapes('00003.jpg'))
+
+    def test_load_any_frame_name_and_key_order(self):
+        bundle = FolderBundle(self.path)
+        bundle.put('a "quoted" \\ name.jpg', [('hand', 1, 2, 3, 4, 0)])
+        bundle.save()
+        # A line written by another serializer, with "frame" not first.
+        with open(self.path, 'ab') as f:
+            f.write(b'{"objects": [["face", 5, 6, 7, 8, 1]], "frame": "00009.jpg"}\n')
+
+        loaded = FolderBundle(self.path)
+        loaded.load()
+        self.assertEqual(loaded.frames(), ['00009.jpg', 'a "quoted" \\ name.jpg'])
+        self.assertEqual(loaded.getShapes('a "quoted" \\ name.jpg')[0][0], 'hand')
+        self.assertEqual(loaded.getShapes('00009.jpg')[0][0], 'face')
+
+    def test_voc_conversion(self):
+        bundle = FolderBundle(self.path)
+        bundle.put('00001.jpg', [('hand', 10, 20, 30, 40, 1)], [100, 176, 3], '/data/1/00001.jpg')
+        bundle.save()
+        self.assertEqual(bundleToVoc(self.path), 1)
+
+        reader = PascalVocReader(os.path.join(self.dir, '00001.xml'))
+        self.assertEqual(reader.getShapes()[0][0], 'hand')
+        self.assertEqual(reader.imgSize, [100, 176, 3])
+
+        os.remove(self.path)
+        converted = vocToBundle(self.dir)
+        self.assertEqual(converted.frames(), ['00001.jpg'])
+        self.assertEqual(FolderBundle(self.path).load(), True)
+
+    def test_voc_without_filename_keyed_by_image(self):
+        with open(os.path.join(self.dir, '00007.xml'), 'w') as f:
+            f.write('<annotation><path>/data/1/00007.png</path></annotation>')
+        with open(os.path.join(self.dir, '00008.xml'), 'w') as f:
+            f.write('<annotation><filename></filename></annotation>')
+        self.assertEqual(vocToBundle(self.dir).frames(), ['00007.png', '00008.jpg'])
+
+    def test_no_bundle_for_folder_without_voc(self):
+        self.assertEqual(len(vocToBundle(self.dir)), 0)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
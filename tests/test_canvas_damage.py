@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+try:
+    from PyQt5.QtCore import QPointF
+    from PyQt5.QtGui import QColor, QImage, QPixmap, QRegion
+except ImportError:
+    from PyQt4.QtCore import QPointF
+    from PyQt4.QtGui import QColor, QImage, QPixmap, QRegion
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.canvas import Canvas
+from helpers import makeBox
+
+def pixels(image):
+    data = image.constBits().asstring(image.bytesPerLine() * image.height())
+    return np.frombuffer(data, dtype=np.uint8).astype(np.int16)
+
+
+class RecordingCanvas(Canvas):
+    """Canvas that remembers the areas it asks to repaint."""
+
+    def __init__(self):
+        super(RecordingCanvas, self).__init__()
+        self.damage = None
+
+    def update(self, *args):
+        if self.damage is not None:
+            self.damage = self.damage.united(QRegion(args[0]) if args else QRegion(self.rect()))
+
+
+class TestCanvasDamage(unittest.TestCase):
+
+    def setUp(self):
+        image = QImage(320, 240, QImage.Format_RGB32)
+        image.fill(QColor(40, 40, 40))
+        for y in range(image.height()):
+            for x in range(0, image.width(), 8):
+                image.setPixel(x, y, QColor(x % 256, y % 256, 90).rgb())
+        self.canvas = RecordingCanvas()
+        self.canvas.loadPixmap(QPixmap.fromImage(image))
+        self.canvas.resize(320, 240)
+        self.shapes = [makeBox(20, 30, 60, 40), makeBox(150, 100, 50, 70, 'face'),
+                       makeBox(60, 50, 40, 40)]
+        self.canvas.loadShapes(self.shapes)
+
+    def render(self, image=None, region=None):
+        if image is None:
+            image = QImage(self.canvas.size(), QImage.Format_ARGB32)
+            image.fill(0)
+        region = region or QRegion(self.canvas.rect())
+        # render() places the top-left of the region at the target offset.
+        self.canvas.render(image, region.boundingRect().topLeft(), region)
+        return image
+
+    def assertDamageCovers(self, change):
+        before = self.render()
+        self.canvas.damage = QRegion()
+        change()
+        damage, self.canvas.damage = self.canvas.damage, None
+        self.assertFalse(damage.isEmpty())
+        self.assertNotEqual(damage, QRegion(self.canvas.rect()))
+        # Qt resamples a scaled frame slightly differently when clipped; a
+        # missed area would leave whole stale shape edges behind instead.
+        difference = np.abs(pixels(self.render(before, damage)) - pixels(self.render()))
+        self.assertLessEqual(difference.max(), 2)
+
+    def test_edits_repaint_only_what_changed(self):
+        for scale in (1.0, 0.5, 1.7):
+            self.canvas.scale = scale
+            self.canvas.resize(int(320 * scale), int(240 * scale))
+            self.render()
+            canvas = self.canvas
+            self.assertDamageCovers(lambda: canvas.selectShape(self.shapes[0]))
+            self.assertDamageCovers(lambda: canvas.moveOnePixel('Right'))
+            self.assertDamageCovers(lambda: canvas.expandOnePixel('Down'))
+            self.assertDamageCovers(lambda: canvas.setShapeVisible(self.shapes[1], False))
+            self.assertDamageCovers(lambda: canvas.setShapeVisible(self.shapes[1], True))
+            self.assertDamageCovers(canvas.deSelectShape)
+
+    def test_crosshair(self):
+        canvas = self.canvas
+        canvas.setEditing(False)
+        canvas.prevPoint = QPointF(100.5, 80.5)
+        self.render()
+
+        def move():
+            canvas.prevPoint = QPointF(140.25, 60.5)
+            canvas.updateDrawing()
+        self.assertDamageCovers(move)
+
+    def test_palette_follows_verified(self):
+        self.canvas.verified = True
+        color = self.canvas.palette().color(self.canvas.backgroundRole())
+        self.assertEqual(color.getRgb(), (184, 239, 38, 128))
+        self.canvas.verified = False
+        color = self.canvas.palette().color(self.canvas.backgroundRole())
+        self.assertEqual(color.getRgb(), (232, 232, 232, 255))
+
+
+if __name__ == '__main__':
+    unittest.main()
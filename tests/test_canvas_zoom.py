@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+try:
+    from PyQt5.QtGui import QColor, QImage, QPixmap
+except ImportError:
+    from PyQt4.QtGui import QColor, QImage, QPixmap
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.canvas import Canvas
+from helpers import app
+
+def makeFrame(width, height, block=32):
+    """A frame of flat blocks, so that resampling only changes pixels near block edges."""
+    image = QImage(width, height, QImage.Format_RGB32)
+    for by in range(0, height, block):
+        for bx in range(0, width, block):
+            color = QColor((bx * 3) % 256, (by * 5) % 256, 90).rgb()
+            for y in range(by, min(by + block, height)):
+                for x in range(bx, min(bx + block, width)):
+                    image.setPixel(x, y, color)
+    return image
+
+
+class TestScaledFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.image = makeFrame(256, 192)
+        self.canvas = Canvas()
+
+    def render(self):
+        image = QImage(self.canvas.size(), QImage.Format_ARGB32)
+        image.fill(0)
+        self.canvas.render(image)
+        return image
+
+    def test_built_once_per_frame_and_scale(self):
+        canvas = self.canvas
+        canvas.loadPixmap(QPixmap.fromImage(self.image))
+        canvas.scale = 0.5
+        scaled = canvas.scaledPixmap()
+        self.assertEqual((scaled.width(), scaled.height()), (128, 96))
+        self.assertIs(canvas.scaledPixmap(), scaled)
+
+        canvas.scale = 0.25
+        self.assertEqual(canvas.scaledPixmap().width(), 64)
+        canvas.loadPixmap(QPixmap.fromImage(self.image))
+        self.assertIsNone(canvas._scaledPixmap)
+
+    def test_not_cached_at_or_above_full_size(self):
+        self.canvas.loadPixmap(QPixmap.fromImage(self.image))
+        for scale in (1.0, 2.0):
+            self.canvas.scale = scale
+            self.assertIsNone(self.canvas.scaledPixmap())
+
+    def test_lean_mode_keeps_an_image(self):
+        self.canvas.loadPixmap(self.image)
+        self.canvas.scale = 0.5
+        self.assertIsInstance(self.canvas.scaledPixmap(), QImage)
+
+    def test_paints_frame_in_place(self):
+        for frame in (QPixmap.fromImage(self.image), self.image):
+            canvas = self.canvas
+            canvas.loadPixmap(frame)
+            canvas.scale = 0.5
+            # Larger than the frame, so that it is drawn centred.
+            canvas.resize(200, 150)
+            offset = canvas.offsetToCenter() * canvas.scale
+            rendered = self.render()
+            for bx in range(0, 256, 32):
+                for by in range(0, 192, 32):
+                    # The middle of every block keeps its colour.
+                    x, y = int(offset.x() + (bx + 16) * 0.5), int(offset.y() + (by + 16) * 0.5)
+                    self.assertEqual(rendered.pixel(x, y), self.image.pixel(bx + 16, by + 16))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.classSelect import readLabels, resolveClasses, selectFolders, selectFoldersFromFiles
+
+
+class TestClassSelect(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.labels = os.path.join(self.dir, 'labels.csv')
+        with open(self.labels, 'w') as f:
+            f.write('Swiping Left\nSwiping Left Hand\nNo gesture\n')
+        self.train = os.path.join(self.dir, 'train.csv')
+        with open(self.train, 'wb') as f:
+            f.write(b'34870;Swiping Left\n56557;Swiping Left Hand\n1;No gesture\r\n9;Swiping Left')
+        self.val = os.path.join(self.dir, 'val.csv')
+        with open(self.val, 'wb') as f:
+            f.write(b'7;No gesture\n34870;Swiping Left\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_resolve(self):
+        labels = readLabels(self.labels)
+        self.assertEqual(resolveClasses(labels, ['No gesture'], [0]), set(['No gesture', 'Swiping Left']))
+        self.assertRaises(ValueError, resolveClasses, labels, ['Stop Sign'])
+        self.assertRaises(ValueError, resolveClasses, labels, None, [3])
+
+    def test_select(self):
+        for chunkSize in (7, 1 << 20):
+            self.assertEqual(selectFolders(self.train, ['Swiping Left'], chunkSize).tolist(), [9, 34870])
+            self.assertEqual(selectFolders(self.train, ['No gesture', 'Swiping Left Hand'], chunkSize).tolist(),
+                             [1, 56557])
+
+    def test_files(self):
+        folders = selectFoldersFromFiles([self.train, self.val, os.path.join(self.dir, 'test.csv')],
+                                         ['Swiping Left', 'No gesture'], processes=2)
+        self.assertEqual(folders.tolist(), [1, 7, 9, 34870])
+
+
+if __name__ == '__main__':
+    unittest.main()
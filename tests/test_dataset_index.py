@@ -0,0 +1,61 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.datasetIndex import DatasetIndex, loadIndex
+
+
+class TestDatasetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.dir, 'jester')
+        self.image = os.path.join(root_path, 'demo', 'demo.jpg')
+        for name, count in (('10', 2), ('2', 1), ('1', 3)):
+            self.addFolder(name, count)
+        self.indexPath = os.path.join(self.dir, 'env', 'dataset_index.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def addFolder(self, name, count):
+        folder = os.path.join(self.root, name)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        for i in range(count):
+            shutil.copy(self.image, os.path.join(folder, '%05d.jpg' % (i + 1)))
+
+    def test_build(self):
+        index = loadIndex(self.root, self.indexPath, threads=2)
+        self.assertEqual(index.names, ['1', '2', '10'])
+        self.assertEqual(index.frames, [3, 1, 2])
+        self.assertEqual(index.folder('10'), (2, 324, 576))
+
+        loaded = DatasetIndex.load(self.indexPath)
+        self.assertEqual(loaded.names, index.names)
+        self.assertEqual(loaded.widths, [576, 576, 576])
+
+    def test_refresh(self):
+        index = loadIndex(self.root, self.indexPath, threads=2)
+        self.assertEqual(index.refresh(threads=2), 0)
+
+        self.addFolder('3', 1)
+        shutil.rmtree(os.path.join(self.root, '2'))
+        folder = os.path.join(self.root, '1')
+        stat = os.stat(folder)
+        shutil.copy(self.image, os.path.join(folder, '00004.jpg'))
+        os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 10))
+        rootStat = os.stat(self.root)
+        os.utime(self.root, ns=(rootStat.st_atime_ns, rootStat.st_mtime_ns + 10 ** 10))
+
+        self.assertEqual(index.refresh(threads=2), 3)
+        self.assertEqual(index.names, ['1', '3', '10'])
+        self.assertEqual(index.frames, [4, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
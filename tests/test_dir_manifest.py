@@ -0,0 +1,55 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.dirManifest import DirManifestCache
+
+
+class TestDirManifestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.folder = os.path.join(self.dir, 'frames')
+        os.mkdir(self.folder)
+        for name in ('00002.jpg', '00001.JPG', 'notes.txt', 'b.png'):
+            open(os.path.join(self.folder, name), 'w').close()
+        os.mkdir(os.path.join(self.folder, 'nested'))
+        open(os.path.join(self.folder, 'nested', '00003.jpg'), 'w').close()
+        self.cacheDir = os.path.join(self.dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_images(self):
+        images = DirManifestCache(self.cacheDir).images(self.folder)
+        self.assertEqual([os.path.basename(p) for p in images], ['00001.JPG', '00002.jpg', 'b.png'])
+        self.assertTrue(all(os.path.isabs(p) for p in images))
+
+    def test_missing_folder(self):
+        cache = DirManifestCache(self.cacheDir)
+        self.assertEqual(cache.images(os.path.join(self.dir, 'gone')), [])
+        self.assertFalse(os.path.exists(self.cacheDir))
+
+    def test_cached_by_mtime(self):
+        cache = DirManifestCache(self.cacheDir)
+        cache.names(self.folder)
+        stat = os.stat(self.folder)
+        open(os.path.join(self.folder, '00004.jpg'), 'w').close()
+        os.utime(self.folder, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        # An unchanged directory mtime is answered from the local manifest, also by a new cache.
+        fresh = DirManifestCache(self.cacheDir)
+        self.assertNotIn('00004.jpg', fresh.names(self.folder))
+        self.assertEqual(fresh.listings, 0)
+
+        os.utime(self.folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 10))
+        self.assertIn('00004.jpg', fresh.names(self.folder))
+        self.assertEqual(fresh.listings, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
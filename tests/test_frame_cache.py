@@ -0,0 +1,40 @@
+import unittest
+from unittest import TestCase
+import sys
+import os
+
+dir_name = os.path.abspath(os.path.dirname(__file__))
+libs_path = os.path.join(dir_name, '..', 'libs')
+sys.path.insert(0, libs_path)
+from frameCache import FrameCache
+
+
+class TestFrameCache(TestCase):
+
+    def test_lru_eviction(self):
+        cache = FrameCache(maxBytes=100)
+        cache.put('a', 'A', 40)
+        cache.put('b', 'B', 40)
+        self.assertEqual(cache.get('a'), 'A')
+        cache.put('c', 'C', 40)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual(cache.get('c'), 'C')
+        self.assertEqual(cache.currentBytes, 80)
+
+    def test_stamp_invalidation(self):
+        cache = FrameCache(maxBytes=100)
+        cache.put('a', 'A', 10, stamp=(1.0, 5))
+        self.assertEqual(cache.get('a', (1.0, 5)), 'A')
+        self.assertIsNone(cache.get('a', (2.0, 5)))
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.currentBytes, 0)
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = FrameCache(maxBytes=10)
+        cache.put('a', 'A', 11)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from unittest import TestCase
+import sys
+import os
+
+dir_name = os.path.abspath(os.path.dirname(__file__))
+libs_path = os.path.join(dir_name, '..', 'libs')
+sys.path.insert(0, libs_path)
+from imageSize import readImageShape, ImageShapeProvider
+
+
+class TestImageSize(TestCase):
+
+    def test_header_shapes(self):
+        demo = os.path.join(dir_name, '..', 'demo')
+        self.assertEqual(readImageShape(os.path.join(dir_name, 'test.bmp')), [512, 512, 3])
+        self.assertEqual(readImageShape(os.path.join(demo, 'demo.jpg')), [324, 576, 3])
+        self.assertEqual(readImageShape(os.path.join(demo, 'demo4.png')), [1079, 1919, 3])
+
+    def test_provider_caches_per_folder(self):
+        provider = ImageShapeProvider()
+        shape = provider.shape(os.path.join(dir_name, 'test.bmp'))
+        # Another frame of the same folder is answered from the cache.
+        self.assertEqual(provider.shape(os.path.join(dir_name, 'missing.bmp')), shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
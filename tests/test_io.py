@@ -28,5 +28,61 @@ class TestPascalVocRW(TestCase):
         self.assertEqual(face[0], 'face')
         self.assertEqual(face[1], [(113, 40), (450, 40), (450, 403), (113, 403)])
 
+    def test_byte_identical(self):
+        dir_name = os.path.abspath(os.path.dirname(__file__))
+        libs_path = os.path.join(dir_name, '..', 'libs')
+        sys.path.insert(0, libs_path)
+        from pascal_voc_io import PascalVocWriter
+
+        # Output of the former ElementTree -> lxml round-trip writer for the same boxes.
+        expected = (
+            b'<annotation verified="yes">\n'
+            b'\t<folder>tests</folder>\n'
+            b'\t<filename>test</filename>\n'
+            b'\t<path>tests/test.bmp</path>\n'
+            b'\t<source>\n'
+            b'\t\t<database>Unknown</database>\n'
+            b'\t</source>\n'
+            b'\t<size>\n'
+            b'\t\t<width>512</width>\n'
+            b'\t\t<height>512</height>\n'
+            b'\t\t<depth>1</depth>\n'
+            b'\t</size>\n'
+            b'\t<segmented>0</segmented>\n'
+            b'\t<object>\n'
+            b'\t\t<name>person</name>\n'
+            b'\t\t<pose>Unspecified</pose>\n'
+            b'\t\t<truncated>0</truncated>\n'
+            b'\t\t<difficult>1</difficult>\n'
+            b'\t\t<bndbox>\n'
+            b'\t\t\t<xmin>60</xmin>\n'
+            b'\t\t\t<ymin>40</ymin>\n'
+            b'\t\t\t<xmax>430</xmax>\n'
+            b'\t\t\t<ymax>504</ymax>\n'
+            b'\t\t</bndbox>\n'
+            b'\t</object>\n'
+            b'\t<object>\n'
+            b'\t\t<name>face</name>\n'
+            b'\t\t<pose>Unspecified</pose>\n'
+            b'\t\t<truncated>0</truncated>\n'
+            b'\t\t<difficult>1</difficult>\n'
+            b'\t\t<bndbox>\n'
+            b'\t\t\t<xmin>113</xmin>\n'
+            b'\t\t\t<ymin>40</ymin>\n'
+            b'\t\t\t<xmax>450</xmax>\n'
+            b'\t\t\t<ymax>403</ymax>\n'
+            b'\t\t</bndbox>\n'
+            b'\t</object>\n'
+            b'</annotation>\n')
+
+        writer = PascalVocWriter('tests', 'test', (512, 512, 1), localImgPath='tests/test.bmp')
+        writer.verified = True
+        writer.addBndBox(60, 40, 430, 504, 'person', 1)
+        writer.addBndBox(113, 40, 450, 403, 'face', 1)
+        writer.save('tests/test.xml')
+        with open('tests/test.xml', 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+
 if __name__ == '__main__':
     unittest.main()
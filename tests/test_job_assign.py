@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.jobAssign import assignJobs, reassignJobs, sessionFrames
+
+
+class TestJobAssign(unittest.TestCase):
+
+    def test_folder_count(self):
+        names = [str(i) for i in range(1, 10001)]
+        ids = ['vdo_data%d' % i for i in range(1, 13)]
+        assignment = assignJobs(names, ids)
+        self.assertEqual(sorted(assignment), sorted(ids))
+        self.assertTrue(all(len(sessions) == 2 for sessions in assignment.values()))
+        # Every folder exactly once, in order, across sessions and annotators.
+        flat = [name for sess in range(2) for i in ids for name in assignment[i][sess]]
+        self.assertEqual(flat, names)
+        sizes = [len(s) for sessions in assignment.values() for s in sessions]
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_frames_and_weights(self):
+        names = [str(i) for i in range(1, 101)]
+        frames = [10 if i % 2 else 50 for i in range(100)]
+        assignment = assignJobs(names, ['a', 'b'], frames, {'a': 1, 'b': 3}, dirsPerSession=100)
+        counts = sessionFrames(assignment, dict(zip(names, frames)))
+        self.assertAlmostEqual(counts['b'][0] / float(counts['a'][0]), 3, delta=0.2)
+
+    def test_reassign(self):
+        names = [str(i) for i in range(1, 13)]
+        assignment = assignJobs(names, ['a', 'b'], dirsPerSession=6)
+        finished = set(['1', '2', '7'])
+        result = reassignJobs(assignment, finished, ['b', 'c'], fromSession=2)
+        # Session 1 is untouched, finished folders stay with their annotator.
+        self.assertEqual(result['a'][0], assignment['a'][0])
+        self.assertEqual(result['a'][1], ['7'])
+        self.assertEqual(sorted(result['b'][1] + result['c'][1], key=int), ['8', '9', '10', '11', '12'])
+        self.assertLessEqual(abs(len(result['b'][1]) - len(result['c'][1])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.job_io import JOB_FOLDERS, JOB_JSON, JobAssignment, convertJson, loadJobs
+
+
+class TestJobAssignment(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.assignment = {'vdo_data2': [['4', '5'], ['9']], 'vdo_data1': [['1', '2', '3'], ['6', '7', '8']]}
+        with open(os.path.join(self.dir, JOB_JSON), 'w') as f:
+            json.dump(self.assignment, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_convert(self):
+        convertJson(self.dir)
+        jobs = JobAssignment.load(self.dir)
+        self.assertEqual(jobs.ids, ['vdo_data2', 'vdo_data1'])
+        self.assertEqual(len(jobs['vdo_data1']), 2)
+        self.assertEqual(jobs['vdo_data1'][1], ['6', '7', '8'])
+        self.assertEqual(jobs.toDict(), self.assignment)
+        self.assertEqual(jobs.sessionFolders(0), ['4', '5', '1', '2', '3'])
+        self.assertEqual(jobs.sessionsOf(['vdo_data1', 'vdo_data2'])[1], ['6', '7', '8', '9'])
+        self.assertEqual(jobs.total(['vdo_data2']), 3)
+        self.assertEqual(jobs.total(), 9)
+
+    def test_stale_binary(self):
+        convertJson(self.dir)
+        time.sleep(0.01)
+        self.assignment['vdo_data1'][0] = ['1']
+        with open(os.path.join(self.dir, JOB_JSON), 'w') as f:
+            json.dump(self.assignment, f)
+        os.utime(os.path.join(self.dir, JOB_JSON), (time.time() + 5, time.time() + 5))
+        self.assertEqual(loadJobs(self.dir)['vdo_data1'][0], ['1'])
+
+    def test_index_without_array(self):
+        convertJson(self.dir)
+        os.remove(os.path.join(self.dir, JOB_FOLDERS))
+        self.assertIsNone(JobAssignment.load(self.dir))
+        self.assertEqual(loadJobs(self.dir).toDict(), self.assignment)
+
+    def test_non_numeric(self):
+        jobs = JobAssignment.fromDict({'a': [['x1', '2']]})
+        self.assertEqual(jobs['a'][0], ['x1', '2'])
+        self.assertRaises(ValueError, jobs.save, self.dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import unittest
+
+try:
+    from PyQt5.QtCore import Qt
+except ImportError:
+    from PyQt4.QtCore import Qt
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.listModels import CheckListModel
+from helpers import app
+
+
+class TestCheckListModel(unittest.TestCase):
+
+    def test_toggle_emitted_only_on_change(self):
+        model = CheckListModel()
+        model.setItems(['1', '2', '3'], set(['2']))
+        toggled = []
+        model.checkToggled.connect(lambda index: toggled.append(index.row()))
+
+        self.assertTrue(model.setData(model.index(1), Qt.Checked, Qt.CheckStateRole))
+        self.assertTrue(model.setData(model.index(0), Qt.Checked, Qt.CheckStateRole))
+        self.assertTrue(model.setData(model.index(0), Qt.Checked, Qt.CheckStateRole))
+        self.assertTrue(model.setData(model.index(1), Qt.Unchecked, Qt.CheckStateRole))
+        self.assertEqual(toggled, [0, 1])
+        self.assertEqual(model.checked, set(['1']))
+
+
+if __name__ == '__main__':
+    unittest.main()
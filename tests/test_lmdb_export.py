@@ -0,0 +1,68 @@
+import io
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+import lmdb
+import numpy as np
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.lmdbExport import KEY_BE32, exportKeys, iterKeys, loadAsciiKeys
+
+
+class TestLmdbExport(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def makeEnv(self, name, keys):
+        path = os.path.join(self.dir, name)
+        env = lmdb.open(path, map_size=1 << 20)
+        with env.begin(write=True) as txn:
+            for key in keys:
+                txn.put(key, b'1')
+        env.close()
+        return path
+
+    def test_ascii_numeric_order(self):
+        ids = [1, 2, 9, 10, 11, 99, 100, 148092, 7, 30000]
+        path = self.makeEnv('a', [str(i).encode('ascii') for i in ids])
+        self.assertEqual(loadAsciiKeys(path).tolist(), sorted(ids))
+
+        bad = self.makeEnv('bad', [b'007'])
+        self.assertRaises(ValueError, loadAsciiKeys, bad)
+
+    def test_be32(self):
+        ids = [3, 256, 70000, 1]
+        path = self.makeEnv('b', [struct.pack('>I', i) for i in ids])
+        self.assertEqual(list(iterKeys(path, KEY_BE32)), sorted(ids))
+
+    def test_merge_formats(self):
+        first = self.makeEnv('vdo_a', [b'2', b'10', b'3'])
+        second = self.makeEnv('vdo_b', [b'3', b'100', b'1'])
+
+        out = io.StringIO()
+        self.assertEqual(exportKeys([first, second], out, 'txt', processes=1), 5)
+        self.assertEqual(out.getvalue(), '1\n2\n3\n10\n100\n')
+
+        csvPath = os.path.join(self.dir, 'out.csv')
+        exportKeys([first, second], csvPath, 'csv', processes=2)
+        with open(csvPath) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'folder,envs')
+        self.assertEqual(lines[3], '3,vdo_a;vdo_b')
+
+        npyPath = os.path.join(self.dir, 'out.npy')
+        exportKeys([first, second], npyPath, 'npy')
+        self.assertEqual(np.load(npyPath).tolist(), [1, 2, 3, 10, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.lmdb_io import (LmdbAnnotationStore, LmdbFolder, decodeRecord, encodeRecord, existingKeys,
+                          lmdbToVoc, vocToLmdb)
+from libs.pascal_voc_io import PascalVocReader
+
+
+class TestLmdbAnnotationStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = LmdbAnnotationStore(os.path.join(self.dir, 'env'), mapSize=1 << 20)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.dir)
+
+    def test_encoding(self):
+        record = {'objects': [[u'손', 1, 2, 3, 4, 1], ['hand', 10, 20, 30, 40, 0]],
+                  'size': [100, 176, 3], 'path': '/data/1/00001.jpg', 'verified': True}
+        decoded = decodeRecord(encodeRecord(record), '00001.jpg')
+        self.assertEqual(decoded['objects'], record['objects'])
+        self.assertEqual(decoded['size'], [100, 176, 3])
+        self.assertEqual(decoded['path'], '/data/1/00001.jpg')
+        self.assertTrue(decoded['verified'])
+
+    def test_folder_roundtrip(self):
+        for name in ('1', '10', '2'):
+            folder = LmdbFolder(self.store, name)
+            folder.load()
+            folder.put('00001.jpg', [('hand', 1, 2, 3, 4, 0)], [100, 176, 3])
+            folder.put('00002.jpg', [], [100, 176, 3])
+            folder.save()
+        self.assertEqual(self.store.folders(), ['1', '10', '2'])
+
+        folder = LmdbFolder(self.store, '1')
+        folder.load()
+        self.assertEqual(folder.frames(), ['00001.jpg', '00002.jpg'])
+        self.assertEqual(folder.getShapes('00001.jpg'),
+                         [('hand', [(1, 2), (3, 2), (3, 4), (1, 4)], None, None, False)])
+        self.assertEqual(folder.getShapes('00002.jpg'), [])
+        self.assertNotIn('00003.jpg', folder)
+
+    def test_voc_export(self):
+        folder = LmdbFolder(self.store, '7')
+        folder.put('00001.jpg', [('hand', 1, 2, 3, 4, 1)], [100, 176, 3], '/data/7/00001.jpg', True)
+        folder.save()
+        xmlRoot = os.path.join(self.dir, 'xml')
+        self.assertEqual(lmdbToVoc(self.store, xmlRoot), 1)
+        reader = PascalVocReader(os.path.join(xmlRoot, '7', '00001.xml'))
+        self.assertTrue(reader.verified)
+        self.assertEqual(reader.getShapes()[0][0], 'hand')
+
+        other = LmdbAnnotationStore(os.path.join(self.dir, 'other'), mapSize=1 << 20)
+        self.assertEqual(vocToLmdb(other, xmlRoot), 1)
+        self.assertEqual(other.folders(), ['7'])
+        other.close()
+
+    def test_existing_keys(self):
+        with self.store.env.begin(write=True) as txn:
+            for key in (b'1', b'10', b'12', b'3'):
+                txn.put(key, b'1')
+        with self.store.env.begin() as txn:
+            self.assertEqual(existingKeys(txn, [b'12', b'2', b'1', b'100']), set([b'1', b'12']))
+            self.assertEqual(existingKeys(txn, []), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.lmdbWriter import LmdbWriteBatch, openEnv
+from helpers import app
+
+
+class TestLmdbWriteBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.env = openEnv(os.path.join(self.dir, 'env'), mapSizeMb=1)
+
+    def tearDown(self):
+        self.env.close()
+        shutil.rmtree(self.dir)
+
+    def keys(self):
+        with self.env.begin() as txn:
+            return [key for key in txn.cursor().iternext(values=False)]
+
+    def test_threshold_and_flush(self):
+        batch = LmdbWriteBatch(self.env, interval=60000, threshold=3)
+        batch.put(b'1', b'1')
+        batch.put(b'2', b'1')
+        batch.delete(b'2')
+        self.assertEqual(self.keys(), [])
+        batch.put(b'3', b'1')
+        # Three distinct keys reached the threshold: one commit, the delete of '2' is a no-op.
+        self.assertEqual(batch.commits, 1)
+        self.assertEqual(self.keys(), [b'1', b'3'])
+
+        batch.delete(b'1')
+        self.assertTrue(batch.flush())
+        self.assertEqual(self.keys(), [b'3'])
+        self.assertEqual(len(batch), 0)
+
+    def test_failed_commit_keeps_changes(self):
+        batch = LmdbWriteBatch(self.env, interval=60000, threshold=100)
+        batch.put(b'big', b'x' * (2 << 20))
+        self.assertFalse(batch.flush())
+        self.assertTrue(batch.lastError)
+        self.assertEqual(len(batch), 1)
+        batch.put(b'big', b'1')
+        self.assertTrue(batch.flush())
+        self.assertIsNone(batch.lastError)
+
+    def test_timer(self):
+        batch = LmdbWriteBatch(self.env, interval=10, threshold=100)
+        batch.put(b'7', b'1')
+        deadline = time.time() + 2
+        while batch.commits == 0 and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+        self.assertEqual(self.keys(), [b'7'])
+
+
+if __name__ == '__main__':
+    unittest.main()
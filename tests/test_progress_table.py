@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import lmdb
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.bundle_io import BUNDLE_NAME, FolderBundle
+from libs.lmdb_io import LmdbAnnotationStore
+from libs.progressTable import START_END, ProgressTable, loadTable
+
+
+class TestProgressTable(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.results = os.path.join(self.dir, 'jester')
+        self.env = os.path.join(self.dir, 'jester_env')
+        os.makedirs(self.env)
+        with open(os.path.join(self.env, 'job_assign.json'), 'w') as f:
+            json.dump({'a': [['1', '2'], ['5']], 'b': [['3'], ['4']]}, f)
+        with open(os.path.join(self.env, 'a_01.txt'), 'w') as f:
+            f.write('1\n2\n')
+        env = lmdb.open(os.path.join(self.env, 'vdo_ver'), map_size=1 << 20)
+        with env.begin(write=True) as txn:
+            txn.put(b'2', b'1')
+        env.close()
+
+        os.makedirs(os.path.join(self.results, '1'))
+        self.writeStartEnd('1', '../data/1/00003.jpg', '../data/1/00020.jpg')
+        with open(os.path.join(self.results, '1', '00003.xml'), 'w') as f:
+            f.write('<annotation><object></object><object></object></annotation>')
+        bundle = FolderBundle(os.path.join(self.results, '3', BUNDLE_NAME))
+        bundle.put('00001.jpg', [('hand', 1, 2, 3, 4, 0)])
+        bundle.save()
+        store = LmdbAnnotationStore(os.path.join(self.env, 'annotations'), mapSize=1 << 20)
+        store.write([('4', '00001.jpg', {'objects': [['hand', 1, 2, 3, 4, 0]] * 3})])
+        store.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def writeStartEnd(self, folder, start, end):
+        with open(os.path.join(self.results, folder, START_END), 'w') as f:
+            f.write(start + '\n' + end + '\n')
+
+    def row(self, table, name):
+        i = table.names.index(name)
+        return (table.annotators[i], table.sessions[i], table.done[i], table.verified[i],
+                table.starts[i], table.ends[i], table.boxes[i])
+
+    def test_build_refresh(self):
+        table = ProgressTable.build(self.results, self.env, processes=2)
+        self.assertEqual(table.names, ['1', '2', '3', '4', '5'])
+        self.assertEqual(self.row(table, '1'), ('a', 1, True, False, 3, 20, 2))
+        self.assertEqual(self.row(table, '2'), ('a', 1, True, True, -1, -1, 0))
+        self.assertEqual(self.row(table, '3'), ('b', 1, False, False, -1, -1, 1))
+        self.assertEqual(self.row(table, '4'), ('b', 2, False, False, -1, -1, 3))
+        self.assertEqual(table.summary()['a'], {'folders': 3, 'done': 2, 'verified': 1, 'boxes': 2})
+
+        path = os.path.join(self.env, 'progress.json')
+        table.save(path)
+        self.assertEqual(loadTable(self.results, self.env, path).boxes, table.boxes)
+
+        table = ProgressTable.load(path)
+        self.assertEqual(table.refresh(processes=2), 0)
+        time.sleep(0.01)
+        self.writeStartEnd('1', '../data/1/00005.jpg', '')
+        self.assertEqual(table.refresh(processes=2), 1)
+        self.assertEqual(self.row(table, '1'), ('a', 1, True, False, 5, -1, 2))
+        self.assertEqual(self.row(table, '4')[-1], 3)
+
+    def test_converted_folder_counts_bundle_only(self):
+        # voc2bundle leaves the Pascal VOC files next to the bundle.
+        with open(os.path.join(self.results, '3', '00001.xml'), 'w') as f:
+            f.write('<annotation><object></object></annotation>')
+        table = ProgressTable.build(self.results, self.env, processes=1)
+        self.assertEqual(self.row(table, '3')[-1], 1)
+
+    def test_lmdb_folder_counts_store_only(self):
+        # vocToLmdb leaves the Pascal VOC files in place as well.
+        os.makedirs(os.path.join(self.results, '4'))
+        with open(os.path.join(self.results, '4', '00001.xml'), 'w') as f:
+            f.write('<annotation><object></object></annotation>')
+        table = ProgressTable.build(self.results, self.env, processes=1)
+        self.assertEqual(self.row(table, '4')[-1], 3)
+        self.assertEqual(self.row(table, '1')[-1], 2)
+
+        path = os.path.join(self.env, 'progress.json')
+        table.save(path)
+        table = ProgressTable.load(path)
+        time.sleep(0.01)
+        with open(os.path.join(self.results, '4', '00002.xml'), 'w') as f:
+            f.write('<annotation><object></object></annotation>')
+        self.assertEqual(table.refresh(processes=1), 1)
+        self.assertEqual(self.row(table, '4')[-1], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+try:
+    from PyQt5.QtCore import QPointF
+    from PyQt5.QtGui import QImage, QPainter
+except ImportError:
+    from PyQt4.QtCore import QPointF
+    from PyQt4.QtGui import QImage, QPainter
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.shape import Shape
+from libs.shapeCore import ShapeCore
+from libs.shapeIndex import ShapeGrid
+from helpers import makeBox
+
+class TestShapeCache(unittest.TestCase):
+
+    def paint(self, shape):
+        image = QImage(200, 200, QImage.Format_ARGB32)
+        painter = QPainter(image)
+        shape.paint(painter)
+        painter.end()
+
+    def test_paths_invalidated_by_edits(self):
+        shape = makeBox(10, 20, 30, 40)
+        path, linePath = shape.makePath(), shape.linePath()
+        self.assertIs(shape.makePath(), path)
+        self.assertEqual(shape.bounds(), (10, 20, 40, 60))
+
+        shape.moveBy(QPointF(5, 5))
+        self.assertIsNot(shape.linePath(), linePath)
+        self.assertEqual(shape.boundingRect().topLeft(), QPointF(15, 25))
+
+        for edit in (lambda: shape.moveVertexBy(2, QPointF(10, 0)),
+                     lambda: shape.__setitem__(2, QPointF(60, 70))):
+            path = shape.makePath()
+            edit()
+            self.assertIsNot(shape.makePath(), path)
+        self.assertEqual(shape.bounds(), (15, 25, 60, 70))
+        self.assertTrue(shape.containsPoint(QPointF(40, 50)))
+
+    def test_vertex_path_follows_scale_and_highlight(self):
+        shape = makeBox(10, 10, 50, 50)
+        self.paint(shape)
+        vertexPath = shape.vertexPath()
+        self.paint(shape)
+        self.assertIs(shape.vertexPath(), vertexPath)
+
+        shape.highlightVertex(0, Shape.MOVE_VERTEX)
+        self.assertIsNot(shape.vertexPath(), vertexPath)
+        self.assertEqual(shape.vertex_fill_color, Shape.hvertex_fill_color)
+        shape.highlightClear()
+        vertexPath = shape.vertexPath()
+        try:
+            Shape.scale = 2.0
+            self.assertIsNot(shape.vertexPath(), vertexPath)
+            self.assertLess(shape.vertexPath().boundingRect().width(), vertexPath.boundingRect().width())
+        finally:
+            Shape.scale = 1.0
+
+    def test_points_built_lazily_and_moved_in_place(self):
+        shape = Shape.fromCore(ShapeCore('hand', (10, 20, 40, 20, 40, 60, 10, 60)))
+        self.assertIsNone(shape._points)
+        self.assertEqual(len(shape), 4)
+        self.assertEqual(shape.bounds(), (10, 20, 40, 60))
+        ShapeGrid(11.0).add(shape)
+        self.assertIsNone(shape._points)
+
+        points = shape.points
+        copy = shape.copy()
+        shape.moveBy(QPointF(1, 2))
+        self.assertIs(shape.points, points)
+        self.assertEqual(shape[2], QPointF(41, 62))
+        self.assertEqual(copy[2], QPointF(40, 60))
+        self.assertEqual(list(shape.coords), [11, 22, 41, 22, 41, 62, 11, 62])
+
+        point = QPointF(0, 0)
+        shape[0] = point
+        shape.moveBy(QPointF(1, 1))
+        self.assertEqual(point, QPointF(0, 0))
+        self.assertEqual(shape.popPoint(), QPointF(12, 63))
+        self.assertEqual(len(shape.points), 3)
+        self.assertEqual(list(shape.coords), [1, 1, 42, 23, 42, 63])
+
+
+if __name__ == '__main__':
+    unittest.main()
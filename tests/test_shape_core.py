@@ -0,0 +1,32 @@
+import os
+import sys
+import unittest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.shapeCore import FrameShapes, ShapeCore
+
+
+class TestShapeCore(unittest.TestCase):
+
+    def test_round_trips(self):
+        reader = ('hand', [(10, 20), (40, 20), (40, 60), (10, 60)], None, None, True)
+        core = ShapeCore.fromReaderShape(reader)
+        self.assertEqual(len(core), 4)
+        self.assertEqual(core.toReaderShape(), reader)
+        self.assertEqual(ShapeCore.fromObject(['hand', 10, 20, 40, 60, 1]).toReaderShape(), reader)
+
+        core.moveBy(5, -5)
+        self.assertEqual(core.bounds(), (15, 15, 45, 55))
+        self.assertFalse(hasattr(core, '__dict__'))
+
+    def test_frame_block(self):
+        readers = [('hand', [(1, 2), (3, 2), (3, 4), (1, 4)], None, None, False),
+                   ('face', [(10.5, 20), (30, 20), (30, 40), (10.5, 40)], None, None, True)]
+        frame = FrameShapes.fromReaderShapes(readers)
+        self.assertEqual(frame.corners.shape, (2, 4, 2))
+        self.assertEqual(frame.toObjects(), [['hand', 1, 2, 3, 4, 0], ['face', 10, 20, 30, 40, 1]])
+        self.assertEqual(FrameShapes.fromReaderShapes([]).toObjects(), [])
+
+if __name__ == '__main__':
+    unittest.main()
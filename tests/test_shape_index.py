@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+import unittest
+
+try:
+    from PyQt5.QtCore import QPointF
+except ImportError:
+    from PyQt4.QtCore import QPointF
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root_path)
+from libs.lib import distance
+from libs.shapeIndex import ShapeGrid
+from helpers import makeBox
+
+
+class TestShapeGrid(unittest.TestCase):
+
+    def bruteForce(self, shapes, pos, epsilon):
+        return [shape for shape in reversed(shapes)
+                if shape.nearestVertex(pos, epsilon) is not None or shape.containsPoint(pos)]
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        shapes = [makeBox(rng.uniform(0, 600), rng.uniform(0, 400), rng.uniform(1, 200), rng.uniform(1, 200))
+                  for _ in range(60)]
+        grid = ShapeGrid(11.0, cellSize=32.0)
+        grid.rebuild(shapes)
+        for _ in range(500):
+            pos = QPointF(rng.uniform(-20, 820), rng.uniform(-20, 620))
+            hits = [shape for shape in grid.at(pos)
+                    if shape.nearestVertex(pos, 11.0) is not None or shape.containsPoint(pos)]
+            self.assertEqual(hits, self.bruteForce(shapes, pos, 11.0))
+
+    def test_add_refresh_discard(self):
+        bottom, top = makeBox(0, 0, 100, 100), makeBox(50, 50, 100, 100)
+        grid = ShapeGrid(5.0)
+        grid.add(bottom)
+        grid.add(top)
+        self.assertEqual(grid.at(QPointF(75, 75)), [top, bottom])
+
+        bottom.moveBy(QPointF(300, 0))
+        grid.refresh(bottom)
+        self.assertEqual(grid.at(QPointF(75, 75)), [top])
+        self.assertEqual(grid.at(QPointF(350, 50)), [bottom])
+        self.assertEqual(grid.at(QPointF(297, 50)), [bottom])
+
+        grid.refresh(makeBox(0, 0, 10, 10))
+        self.assertEqual(len(grid), 2)
+        grid.discard(top)
+        self.assertEqual(grid.at(QPointF(75, 75)), [])
+        self.assertNotIn(top, grid)
+
+
+if __name__ == '__main__':
+    unittest.main()
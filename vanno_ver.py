@@ -1,17 +1,18 @@
 from libs.mainwindow import *
+from libs.lmdb_io import existingKeys
 
 __appname__ = 'vanno_ver' if sys.argv[0].split('/')[-1] == 'vanno_ver.py' else 'vanno'
 
 class MainWindow_ver(MainWindow):
-    def diritemChanged(self, item=None):
-        with self.lmdb.begin(write=True) as txn:
-            flag = txn.put(item.text().encode('ascii'), '1'.encode('ascii'), overwrite=False)
-            if flag:
-                self.checknum += 1
-            else:
-                txn.delete(item.text().encode('ascii'))
-                self.checknum -= 1
-            self.savebtncnt_label.setText('{0}/{1}'.format(self.checknum, self.job_list_total_no))
+    def diritemChanged(self, index=None):
+        folder = ustr(index.data())
+        if folder in self.checkList:
+            self.lmdbBatch.put(folder.encode('ascii'), '1'.encode('ascii'))
+            self.checknum += 1
+        else:
+            self.lmdbBatch.delete(folder.encode('ascii'))
+            self.checknum -= 1
+        self.savebtncnt_label.setText('{0}/{1}'.format(self.checknum, self.job_list_total_no))
 
 
     def importDirs(self):
@@ -24,31 +25,26 @@ class MainWindow_ver(MainWindow):
         if not self.mayContinue():
             return
 
-        self.checkList = []
-        with self.lmdb.begin() as txn:
-            cursor = txn.cursor()
-            for key, value in cursor:
-                insort(self.checkList, key.decode('ascii'))
-            self.checknum = len(self.checkList)
-
         if int(self.curSessLineEdit.text()) > self.sess_no or int(self.curSessLineEdit.text()) <= 0:
             return QMessageBox.warning(self, 'Error', '<p><b>IndexError:</b></p>list index out of range')
 
+        if not self.lmdbBatch.flush():
+            # The unwritten changes would be missing from the check list read below.
+            return QMessageBox.warning(self, 'Error', '<p><b>Check list not saved:</b></p>%s'
+                                       % self.lmdbBatch.lastError)
+
         ###
         self.lastOpenDir = os.path.join(self.imageDirPath, str(self.curSession))
         self.curSession = int(self.curSessLineEdit.text())
-        self.folderListWidget.clear()
         self.job_list_per_sess = self.job_list[self.curSession - 1]
-        for folder_path in self.job_list_per_sess:
-            item = QListWidgetItem(folder_path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            if item.text() in self.checkList:
-                item.setCheckState(Qt.Checked)
-            else:
-                item.setCheckState(Qt.Unchecked)
-            self.folderListWidget.addItem(item)
-
-        self.savebtncnt_label.setText('{0}/{1}'.format(len(self.checkList), self.job_list_total_no))
+        # Only look up this session's folders; the total comes from the database statistics.
+        with self.lmdb.begin() as txn:
+            verified = existingKeys(txn, [folder.encode('ascii') for folder in self.job_list_per_sess])
+            self.checkList = set(key.decode('ascii') for key in verified)
+            self.checknum = txn.stat()['entries']
+        self.folderListModel.setItems(self.job_list_per_sess, self.checkList)
+
+        self.savebtncnt_label.setText('{0}/{1}'.format(self.checknum, self.job_list_total_no))
         self.edit_label.setText('Image DIR: ' + self.imageDirPath)
 
 
@@ -70,20 +66,16 @@ class MainWindow_ver(MainWindow):
         self.imageDirPath = ustr(QFileDialog.getExistingDirectory(self, '%s - Open Directory' % __appname__, defaultOpenDirPath,
                                                  QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks))
         if self.imageDirPath == '':
-            self.folderListWidget.clear()
+            self.folderListModel.clear()
         else:
             self.lastOpenDir = self.imageDirPath
             self.job_list_dict = self.importJobs()
             self.curSessLineEdit.setText(str(self.curSession))
 
             self.sess_no = len(self.job_list_dict[self.ids[0]])
-            self.job_list = [[] for i in range(self.sess_no)]
-
-            for i in range(self.sess_no):
-                for id in self.ids:
-                    self.job_list[i] += self.job_list_dict[id][i]
-                self.job_list_total += self.job_list[i]
-            self.job_list_total_no = len(self.job_list_total)
+            # Every id's folders of a session, built when that session is opened.
+            self.job_list = self.job_list_dict.sessionsOf(self.ids)
+            self.job_list_total_no = self.job_list_dict.total(self.ids)
 
             self.importDirs()
 